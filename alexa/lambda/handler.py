@@ -1,5 +1,6 @@
 import json
 import os
+import urllib.error
 import urllib.parse
 import urllib.request
 
@@ -48,27 +49,22 @@ class TaskIntentHandler(AbstractRequestHandler):
             speech = f"Added task: {title}."
         elif lower.startswith("complete "):
             name = spoken[9:].strip()
-            tasks = _api(f"/v1/tasks?user_id={FIXED_USER_ID}&is_completed=false")
-            items = tasks.get("items") if isinstance(tasks, dict) else tasks
-            items = items or []
-            task_id = None
-            for task in items:
-                desc = task.get("description", "").lower()
-                if desc.startswith(name.lower()):
-                    task_id = task.get("_id")
-                    break
-            if not task_id:
-                for task in items:
-                    if name.lower() in task.get("description", "").lower():
-                        task_id = task.get("_id")
-                        break
-            if task_id:
-                _api(
-                    f"/v1/tasks/{urllib.parse.quote(task_id)}",
+            if name.lower().startswith("task "):
+                name = name[5:].strip()
+            # The API ranks open tasks with its trigram index, so the skill no
+            # longer downloads and scans the whole list itself.
+            try:
+                task = _api(
+                    "/v1/tasks/complete-by-name",
                     "PATCH",
-                    {"is_completed": True},
+                    {"user_id": FIXED_USER_ID, "name": name},
                 )
-                speech = f"Completed task: {name}."
+            except urllib.error.HTTPError as exc:
+                if exc.code != 404:
+                    raise
+                task = None
+            if task:
+                speech = f"Completed task: {task.get('description') or name}."
             else:
                 speech = f"I couldn't find an open task named {name}."
         else:
@@ -60,16 +60,10 @@ MOCK_SCENARIOS: dict[str, list[tuple[str, str, dict | list | None]]] = {
     "task_add": [("/v1/tasks", "POST", {"_id": "task1"})],
     "task_complete": [
         (
-            "/v1/tasks?user_id=wendy&is_completed=false",
-            "GET",
-            {
-                "items": [
-                    {"_id": "task1", "description": "buy milk"},
-                    {"_id": "task2", "description": "write report"},
-                ]
-            },
+            "/v1/tasks/complete-by-name",
+            "PATCH",
+            {"_id": "task1", "description": "buy milk", "is_completed": True},
         ),
-        ("/v1/tasks/task1", "PATCH", {"_id": "task1", "is_completed": True}),
     ],
     "task_list": [
         (
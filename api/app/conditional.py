@@ -0,0 +1,75 @@
+"""ETag / If-None-Match handling for polled per-user GET endpoints."""
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .db import get_db
+from .services.local_time import local_date, user_timezones
+from .utils.responses import wants_ndjson
+from .utils.object_ids import InvalidObjectId, resolve_object_id
+from .versions import etag_matches, get_versions, make_etag
+
+# Collections each endpoint reads, and whether its body depends on "today".
+CONDITIONAL_ROUTES: Dict[str, Tuple[Tuple[str, ...], bool]] = {
+    "/tasks": (("tasks",), False),
+    "/habits": (("habits",), False),
+    "/habit-logs": (("habit_logs",), False),
+    "/habit_logs": (("habit_logs",), False),
+    "/schedule-events": (("schedule_events",), False),
+    "/schedule-events.ics": (("schedule_events",), False),
+    "/schedule": (("schedule_events",), True),
+    "/summary": (("tasks", "schedule_events", "habit_logs"), True),
+}
+
+
+def _route_for(path: str) -> Optional[Tuple[Tuple[str, ...], bool]]:
+    if path.startswith("/v1/"):
+        path = path[3:]
+    return CONDITIONAL_ROUTES.get(path.rstrip("/") or "/")
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """Answer ``304 Not Modified`` from version stamps before the handler runs.
+
+    The ETag is computed before the handler reads any documents, so a write
+    racing with the request can only make the tag older than the body, which
+    costs the client one extra download rather than a stale cache.
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        route = _route_for(request.url.path) if request.method == "GET" else None
+        user_id = request.query_params.get("user_id")
+        if route is None or not user_id:
+            return await call_next(request)
+
+        try:
+            user_oid = resolve_object_id(user_id, "user_id")
+        except InvalidObjectId:
+            return await call_next(request)
+
+        collections, daily = route
+        versions = await get_versions(get_db(), user_oid, collections)
+        variant = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        if daily:
+            # "Today" rolls over at the user's local midnight and moves with their zone.
+            tz = await user_timezones.get(get_db(), user_oid)
+            variant += f"|{tz}|{local_date(tz).isoformat()}"
+        if wants_ndjson(request.headers.get("accept")):
+            variant += "|ndjson"
+        etag = make_etag(versions, variant)
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers["ETag"] = etag
+            response.headers["Vary"] = "Accept"
+        return response
+
+
+__all__ = ["CONDITIONAL_ROUTES", "ConditionalGetMiddleware"]
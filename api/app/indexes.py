@@ -1,9 +1,11 @@
 import logging
 
-from pymongo import ASCENDING
+from pymongo import ASCENDING, DESCENDING
 from pymongo.errors import AutoReconnect, ConnectionFailure, PyMongoError, ServerSelectionTimeoutError
 
+from .changes import CHANGE_RETENTION
 from .db import get_db
+from .services.due_tasks import OPEN_DUE_FILTER, OPEN_DUE_INDEX, OPEN_DUE_KEYS
 
 _logger = logging.getLogger(__name__)
 
@@ -20,20 +22,69 @@ async def ensure_indexes() -> None:
     try:
         await db.users.create_index([("email", ASCENDING)], unique=True)
 
-        # tasks: query by user, completion, and sort/filter by due_date
-        await db.tasks.create_index([("user_id", ASCENDING), ("is_completed", ASCENDING), ("due_date", ASCENDING)])
+        # tasks: due-soon/overdue lookups, partial over open tasks that have a due date
+        await db.tasks.create_index(
+            OPEN_DUE_KEYS,
+            name=OPEN_DUE_INDEX,
+            partialFilterExpression=OPEN_DUE_FILTER,
+        )
+
+        # tasks: keyset pagination over (created_at, _id), with and without the completion filter
+        await db.tasks.create_index([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+        await db.tasks.create_index(
+            [
+                ("user_id", ASCENDING),
+                ("is_completed", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ]
+        )
+
+        # tasks: trigram lookups for complete-by-name (multikey on search_grams)
+        await db.tasks.create_index(
+            [("user_id", ASCENDING), ("is_completed", ASCENDING), ("search_grams", ASCENDING)]
+        )
+
+        # tasks: insight facts (completions by updated_at, open tasks ranked by priority)
+        await db.tasks.create_index([("user_id", ASCENDING), ("is_completed", ASCENDING), ("updated_at", ASCENDING)])
+        await db.tasks.create_index(
+            [
+                ("user_id", ASCENDING),
+                ("is_completed", ASCENDING),
+                ("priority", ASCENDING),
+                ("due_date", ASCENDING),
+                ("created_at", ASCENDING),
+            ]
+        )
 
         # habits: list by user + name
         await db.habits.create_index([("user_id", ASCENDING), ("name", ASCENDING)])
+        # habits: list newest first
+        await db.habits.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
 
         # habit_logs: prevent duplicate logs per (user, habit, date)
         await db.habit_logs.create_index(
             [("user_id", ASCENDING), ("habit_id", ASCENDING), ("date", ASCENDING)],
             unique=True,
         )
+        # habit_logs: list by user newest first and count per day without a habit filter
+        await db.habit_logs.create_index([("user_id", ASCENDING), ("date", DESCENDING)])
 
-        # schedule_events: list by user + start time
-        await db.schedule_events.create_index([("user_id", ASCENDING), ("start_time", ASCENDING)])
+        # schedule_events: list by user + start time; end_time makes the free/busy overlap scan index-only
+        await db.schedule_events.create_index(
+            [("user_id", ASCENDING), ("start_time", ASCENDING), ("end_time", ASCENDING)]
+        )
+        # schedule_events: recurring masters still running after a given time
+        await db.schedule_events.create_index(
+            [("user_id", ASCENDING), ("series_end", ASCENDING)],
+            partialFilterExpression={"rrule": {"$exists": True}},
+        )
+
+        # changes: delta sync replays a user's log in _id order; entries expire with the retention window
+        await db.changes.create_index([("user_id", ASCENDING), ("_id", ASCENDING)])
+        await db.changes.create_index(
+            [("ts", ASCENDING)], expireAfterSeconds=int(CHANGE_RETENTION.total_seconds())
+        )
 
         # ai_feedback: query recent feedback per entity and signal
         await db.ai_feedback.create_index(
@@ -0,0 +1,355 @@
+"""Rewrite legacy documents into the canonical shape the handlers write today.
+
+Run against the configured database (uses ``MONGO_URI``/``DATABASE_NAME``)::
+
+    cd api
+    python -m app.migrations                      # every collection
+    python -m app.migrations tasks --batch-size 200
+
+Each collection is scanned in ``_id`` order, a batch at a time. Documents
+not yet stamped with their collection's entry in ``SCHEMA_VERSIONS`` are
+normalised (integer priorities, ``duration_min`` subtasks, legacy schedule
+times, habit-log status spellings), validated against their response model
+and stamped with one unordered ``bulk_write`` per batch. Schedule events longer than
+``MAX_EVENT_DURATION`` do not validate and stay unstamped, which keeps
+free/busy on its unbounded overlap query until they are shortened. Progress is checkpointed in
+``schema_migrations`` after every batch, so an interrupted run resumes where
+it stopped. ``users`` holds no stamp; its migration re-keys string ``_id``
+values as ObjectIds. ``users.email`` is unique, so each user is copied into
+the checkpoint, deleted and re-inserted under its ObjectId; a run that stops
+in between restores the copy when it resumes.
+
+A collection whose run finished without skipping anything is recorded as
+complete. ``schema_state`` mirrors those records in-process (loaded at
+startup and updated by the runner) and the routers consult it to skip their
+per-document legacy fallbacks. Migrated bodies render exactly as before, so
+collection version stamps are left alone.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from .db import close_client, get_db
+from .schemas.common import SCHEMA_VERSIONS, STATE_COLLECTION, SchemaState, schema_state
+from .schemas.habit import Habit
+from .schemas.habit_log import HabitLog, normalize_status
+from .schemas.schedule_event import StoredScheduleEvent, with_legacy_times
+from .schemas.task import LEGACY_PRIORITIES, Task
+from .services.task_search import search_fields
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+# (fields to $set, fields to $unset) for one document.
+Changes = Tuple[Dict[str, Any], List[str]]
+
+
+def _normalize_task(doc: Dict[str, Any]) -> Changes:
+    changes: Dict[str, Any] = {}
+    if isinstance(doc.get("priority"), int):
+        changes["priority"] = LEGACY_PRIORITIES.get(doc["priority"], "medium")
+    if "is_completed" not in doc:
+        changes["is_completed"] = False
+    if not isinstance(doc.get("created_at"), datetime):
+        changes["created_at"] = doc["_id"].generation_time.replace(tzinfo=None)
+    if "search_grams" not in doc and isinstance(doc.get("description"), str):
+        changes.update(search_fields(doc["description"]))
+
+    subtasks = doc.get("subtasks")
+    if subtasks is None:
+        changes["subtasks"] = []
+    elif any("duration_min" in subtask for subtask in subtasks):
+        renamed = []
+        for subtask in subtasks:
+            subtask = dict(subtask)
+            legacy = subtask.pop("duration_min", None)
+            if subtask.get("duration_minutes") is None and legacy is not None:
+                subtask["duration_minutes"] = legacy
+            renamed.append(subtask)
+        changes["subtasks"] = renamed
+    return changes, []
+
+
+def _normalize_schedule_event(doc: Dict[str, Any]) -> Changes:
+    derived = with_legacy_times(doc)
+    changes = {
+        key: derived[key]
+        for key in ("start_time", "end_time")
+        if key in derived and doc.get(key) != derived[key]
+    }
+    return changes, []
+
+
+def _normalize_habit_log(doc: Dict[str, Any]) -> Changes:
+    status = normalize_status(doc.get("status", "completed"))
+    return ({"status": status} if status != doc.get("status") else {}), []
+
+
+def _normalize_habit(doc: Dict[str, Any]) -> Changes:
+    return {}, []
+
+
+@dataclass(frozen=True)
+class CollectionMigration:
+    name: str
+    model: Type[BaseModel]
+    normalize: Callable[[Dict[str, Any]], Changes]
+
+
+MIGRATIONS: Dict[str, CollectionMigration] = {
+    migration.name: migration
+    for migration in (
+        CollectionMigration("tasks", Task, _normalize_task),
+        CollectionMigration("habits", Habit, _normalize_habit),
+        CollectionMigration("habit_logs", HabitLog, _normalize_habit_log),
+        CollectionMigration("schedule_events", StoredScheduleEvent, _normalize_schedule_event),
+    )
+}
+COLLECTIONS = (*MIGRATIONS, "users")
+
+
+@dataclass
+class MigrationReport:
+    collection: str
+    scanned: int = 0
+    migrated: int = 0
+    skipped: int = 0
+    batches: int = 0
+    resumed: bool = False
+    complete: bool = False
+
+
+async def load_schema_state() -> None:
+    """Populate ``schema_state`` at startup; if the database is unreachable every shim stays on."""
+
+    try:
+        await schema_state.load(get_db())
+    except PyMongoError as exc:
+        _logger.warning("Keeping legacy read paths because migration state could not be read: %s", exc)
+
+
+def canonical_changes(migration: CollectionMigration, doc: Dict[str, Any]) -> Optional[Changes]:
+    """Return the update that makes ``doc`` canonical, or ``None`` if it cannot be."""
+
+    changes, unset = migration.normalize(doc)
+    candidate = {key: value for key, value in doc.items() if key not in unset}
+    candidate.update(changes)
+    try:
+        migration.model.model_validate(candidate)
+    except ValidationError:
+        return None
+    return changes, unset
+
+
+async def _load_checkpoint(db: AsyncIOMotorDatabase, collection: str) -> Dict[str, Any]:
+    version = SCHEMA_VERSIONS[collection]
+    state = await db[STATE_COLLECTION].find_one({"_id": collection})
+    if state and state.get("schema_version") == version and not state.get("finished"):
+        return state
+    # Nothing to resume: a finished run (or one for an older version) starts over.
+    return {
+        "_id": collection,
+        "schema_version": version,
+        "last_id": None,
+        "skipped": 0,
+        "finished": False,
+        "complete": False,
+        "pending": None,
+    }
+
+
+async def _save_checkpoint(db: AsyncIOMotorDatabase, state: Dict[str, Any]) -> None:
+    fields = {key: value for key, value in state.items() if key != "_id"}
+    fields["updated_at"] = datetime.utcnow()
+    await db[STATE_COLLECTION].update_one({"_id": state["_id"]}, {"$set": fields}, upsert=True)
+
+
+async def migrate_collection(
+    db: AsyncIOMotorDatabase, collection: str, *, batch_size: int = DEFAULT_BATCH_SIZE
+) -> MigrationReport:
+    """Normalise and stamp every legacy document in ``collection``, resuming if interrupted."""
+
+    if collection == "users":
+        return await _migrate_users(db, batch_size=batch_size)
+    migration = MIGRATIONS[collection]
+    version = SCHEMA_VERSIONS[collection]
+    documents = db[collection]
+    state = await _load_checkpoint(db, collection)
+    report = MigrationReport(collection, resumed=state["last_id"] is not None)
+
+    while True:
+        query: Dict[str, Any] = {"schema_version": {"$ne": version}}
+        if state["last_id"] is not None:
+            query["_id"] = {"$gt": state["last_id"]}
+        batch = [doc async for doc in documents.find(query).sort("_id", 1).limit(batch_size)]
+        if not batch:
+            break
+
+        requests: List[UpdateOne] = []
+        for doc in batch:
+            planned = canonical_changes(migration, doc)
+            if planned is None:
+                state["skipped"] += 1
+                report.skipped += 1
+                _logger.warning("Leaving %s %s unstamped: it does not validate", collection, doc["_id"])
+                continue
+            changes, unset = planned
+            update: Dict[str, Any] = {"$set": {**changes, "schema_version": version}}
+            if unset:
+                update["$unset"] = {key: "" for key in unset}
+            # The stamp guard keeps a concurrent handler write from being overwritten.
+            requests.append(
+                UpdateOne({"_id": doc["_id"], "schema_version": {"$ne": version}}, update)
+            )
+
+        if requests:
+            try:
+                await documents.bulk_write(requests, ordered=False)
+            except BulkWriteError as exc:
+                failed = len((exc.details or {}).get("writeErrors", []))
+                state["skipped"] += failed
+                report.skipped += failed
+                report.migrated -= failed
+            report.migrated += len(requests)
+        report.scanned += len(batch)
+        report.batches += 1
+        state["last_id"] = batch[-1]["_id"]
+        await _save_checkpoint(db, state)
+        if len(batch) < batch_size:
+            break
+
+    return await _finish(db, state, report)
+
+
+async def _migrate_users(db: AsyncIOMotorDatabase, *, batch_size: int) -> MigrationReport:
+    """Re-key users stored with a string ``_id`` so lookups need a single ObjectId query."""
+
+    users = db.users
+    state = await _load_checkpoint(db, "users")
+    report = MigrationReport("users", resumed=state["last_id"] is not None)
+    pending = state.get("pending")
+    if pending is not None:
+        # Stopped between deleting a user and re-inserting it: finish the move.
+        report.resumed = True
+        rekeyed = {**pending, "_id": ObjectId(pending["_id"])}
+        if not await users.find_one({"_id": {"$in": [pending["_id"], rekeyed["_id"]]}}, {"_id": 1}):
+            await users.insert_one(rekeyed)
+        state["pending"] = None
+        await _save_checkpoint(db, state)
+
+    while True:
+        query: Dict[str, Any] = {"_id": {"$type": "string"}}
+        if state["last_id"] is not None:
+            query["_id"]["$gt"] = state["last_id"]
+        batch = [doc async for doc in users.find(query).sort("_id", 1).limit(batch_size)]
+        if not batch:
+            break
+
+        for doc in batch:
+            if not ObjectId.is_valid(doc["_id"]):
+                state["skipped"] += 1
+                report.skipped += 1
+                _logger.warning("Leaving user %r: its _id is not an ObjectId string", doc["_id"])
+                continue
+            rekeyed = {**doc, "_id": ObjectId(doc["_id"])}
+            if await users.find_one({"_id": rekeyed["_id"]}, {"_id": 1}) is None:
+                # The unique email index rejects the copy while the original
+                # exists, so the original goes first; the checkpoint keeps it.
+                state["pending"] = doc
+                await _save_checkpoint(db, state)
+                await users.delete_one({"_id": doc["_id"]})
+                await users.insert_one(rekeyed)
+                state["pending"] = None
+            else:
+                # Already copied under its ObjectId; only the original is left.
+                await users.delete_one({"_id": doc["_id"]})
+            report.migrated += 1
+        report.scanned += len(batch)
+        report.batches += 1
+        state["last_id"] = batch[-1]["_id"]
+        await _save_checkpoint(db, state)
+        if len(batch) < batch_size:
+            break
+
+    return await _finish(db, state, report)
+
+
+async def _finish(db: AsyncIOMotorDatabase, state: Dict[str, Any], report: MigrationReport) -> MigrationReport:
+    report.complete = state["skipped"] == 0
+    state.update(finished=True, complete=report.complete)
+    await _save_checkpoint(db, state)
+    schema_state.mark(report.collection, report.complete)
+    return report
+
+
+async def migrate(
+    db: AsyncIOMotorDatabase,
+    collections: Iterable[str] = COLLECTIONS,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[MigrationReport]:
+    return [await migrate_collection(db, name, batch_size=batch_size) for name in collections]
+
+
+def format_report(reports: Sequence[MigrationReport]) -> str:
+    lines = []
+    for report in reports:
+        status = "complete" if report.complete else f"incomplete ({report.skipped} skipped)"
+        resumed = ", resumed" if report.resumed else ""
+        lines.append(
+            f"{report.collection}: {report.migrated} migrated of {report.scanned} scanned "
+            f"in {report.batches} batch(es){resumed} - {status}"
+        )
+    return "\n".join(lines)
+
+
+async def _run(collections: Sequence[str], batch_size: int) -> int:
+    try:
+        reports = await migrate(get_db(), collections, batch_size=batch_size)
+    except PyMongoError as exc:
+        print(f"Migration stopped: {exc}; re-run to resume.", file=sys.stderr)
+        return 2
+    finally:
+        close_client()
+    print(format_report(reports))
+    return 0 if all(report.complete for report in reports) else 1
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("collections", nargs="*", choices=COLLECTIONS, help="collections to migrate (default: all)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="documents per batch")
+    args = parser.parse_args(argv)
+    return asyncio.run(_run(args.collections or COLLECTIONS, args.batch_size))
+
+
+__all__ = [
+    "COLLECTIONS",
+    "MIGRATIONS",
+    "MigrationReport",
+    "SchemaState",
+    "canonical_changes",
+    "format_report",
+    "load_schema_state",
+    "main",
+    "migrate",
+    "migrate_collection",
+    "schema_state",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - manual execution
+    sys.exit(main())
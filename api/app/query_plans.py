@@ -0,0 +1,449 @@
+"""Verify that every query shape the API issues is served by an index.
+
+Run against a local ``mongod`` (uses ``MONGO_URI``/``DATABASE_NAME``)::
+
+    cd api
+    python -m app.query_plans            # report only
+    python -m app.query_plans --create   # also create the proposed indexes
+
+Each shape returned by ``build_catalog`` mirrors a ``find``/``count_documents`` call in
+the routers or ``services/insight_facts.py``. The winning plan from
+``explain()`` is flagged when it contains a ``COLLSCAN`` (no usable index) or
+a blocking ``SORT`` stage (the index does not provide the requested order).
+Shapes marked ``covered`` must also be answered from the index alone, so a
+``FETCH`` stage flags them too.
+For flagged shapes an index is proposed using the equality, sort, range rule.
+Keep the catalog in step with the queries when handlers change.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from .db import close_client, get_db
+from .indexes import ensure_indexes
+from .services.due_tasks import open_due_query
+from .services.freebusy import busy_filters
+from .services.recurrence import window_filter
+
+FLAGGED_STAGES = ("COLLSCAN", "SORT")
+COVERED_FLAGGED_STAGES = (*FLAGGED_STAGES, "FETCH")
+
+IndexSpec = List[Tuple[str, int]]
+
+_RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$exists"}
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """One query issued by the API, with representative values."""
+
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Sequence[Tuple[str, int]] = ()
+    projection: Optional[Dict[str, Any]] = None
+    limit: int = 0
+    covered: bool = False
+
+
+@dataclass
+class PlanReport:
+    shape: QueryShape
+    stages: List[str] = field(default_factory=list)
+    index_names: List[str] = field(default_factory=list)
+    proposed_index: Optional[IndexSpec] = None
+    error: Optional[str] = None
+
+    @property
+    def flagged(self) -> List[str]:
+        flagged = COVERED_FLAGGED_STAGES if self.shape.covered else FLAGGED_STAGES
+        return [stage for stage in self.stages if stage in flagged]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.flagged
+
+
+def build_catalog(now: Optional[datetime] = None) -> List[QueryShape]:
+    """Return the query shapes issued by the routers and insight builders."""
+
+    now = now or datetime.utcnow()
+    user = ObjectId()
+    day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    next_day = day + timedelta(days=1)
+    in_day = {"$gte": day, "$lt": next_day}
+    newest_first = [("created_at", -1), ("_id", -1)]
+    group = [user, ObjectId(), ObjectId()]
+    busy_rows, busy_series = busy_filters(day, next_day)
+
+    return [
+        # tasks.py
+        QueryShape("tasks.list", "tasks", {"user_id": user}, newest_first, limit=101),
+        QueryShape(
+            "tasks.list.is_completed",
+            "tasks",
+            {"user_id": user, "is_completed": False},
+            newest_first,
+            limit=101,
+        ),
+        # The $match stage of the complete-by-name aggregation.
+        QueryShape(
+            "tasks.complete_by_name",
+            "tasks",
+            {"user_id": user, "is_completed": False, "search_grams": {"$in": ["  b", " bu", "buy"]}},
+            projection={"description": 1, "created_at": 1, "search_grams": 1},
+        ),
+        QueryShape(
+            "tasks.due",
+            "tasks",
+            open_due_query(user, after=now, before=now + timedelta(hours=24)),
+            [("due_date", 1)],
+            projection={"search_grams": 0},
+            limit=100,
+        ),
+        QueryShape(
+            "tasks.batch.targets",
+            "tasks",
+            {"_id": {"$in": [ObjectId(), ObjectId()]}, "user_id": user},
+            projection={"_id": 1},
+        ),
+        # routes/scheduler.py
+        QueryShape(
+            "scheduler.plan_deadlines",
+            "tasks",
+            {"_id": {"$in": [ObjectId(), ObjectId()]}, "user_id": user},
+            projection={"due_date": 1, "priority": 1},
+        ),
+        # summary.py
+        QueryShape(
+            "summary.open_tasks",
+            "tasks",
+            {"user_id": user, "is_completed": False},
+            [("created_at", 1)],
+            limit=5,
+        ),
+        QueryShape(
+            "summary.events_today",
+            "schedule_events",
+            {"user_id": user, "start_time": in_day},
+            [("start_time", 1)],
+            limit=5,
+        ),
+        QueryShape("summary.logs_today", "habit_logs", {"user_id": user, "date": in_day}),
+        # habits.py / habit_logs.py
+        QueryShape("habits.list", "habits", {"user_id": user}, [("created_at", -1)]),
+        QueryShape("habit_logs.list", "habit_logs", {"user_id": user}, [("date", -1)]),
+        QueryShape(
+            "habit_logs.list.habit",
+            "habit_logs",
+            {"user_id": user, "habit_id": ObjectId()},
+            [("date", -1)],
+        ),
+        # schedule.py / services/freebusy.py
+        QueryShape(
+            "schedule.list_events",
+            "schedule_events",
+            {
+                "user_id": user,
+                "$or": [
+                    {"rrule": {"$exists": False}, "start_time": {"$gte": day, "$lte": next_day}},
+                    {
+                        "rrule": {"$exists": True},
+                        "start_time": {"$lte": next_day},
+                        "series_end": {"$gt": day},
+                    },
+                ],
+            },
+            [("start_time", 1)],
+        ),
+        QueryShape(
+            "freebusy.busy",
+            "schedule_events",
+            {"user_id": user, **busy_rows},
+            [("start_time", 1)],
+            projection={"start_time": 1, "end_time": 1, "_id": 0},
+            covered=True,
+        ),
+        QueryShape(
+            "freebusy.series",
+            "schedule_events",
+            {"user_id": user, **busy_series},
+            projection={"start_time": 1, "end_time": 1, "rrule": 1, "exceptions": 1, "_id": 0},
+        ),
+        QueryShape(
+            "freebusy.group_busy",
+            "schedule_events",
+            {"user_id": {"$in": group}, **busy_rows},
+            [("user_id", 1), ("start_time", 1)],
+            projection={"user_id": 1, "start_time": 1, "end_time": 1, "_id": 0},
+            covered=True,
+        ),
+        QueryShape(
+            "freebusy.group_series",
+            "schedule_events",
+            {"user_id": {"$in": group}, **busy_series},
+            projection={
+                "user_id": 1,
+                "start_time": 1,
+                "end_time": 1,
+                "rrule": 1,
+                "exceptions": 1,
+                "_id": 0,
+            },
+        ),
+        # services/freebusy.py, until schedule_events is migrated
+        QueryShape(
+            "freebusy.busy.unmigrated",
+            "schedule_events",
+            {"user_id": user, **window_filter(day, next_day)},
+            [("start_time", 1)],
+            projection={"start_time": 1, "end_time": 1, "rrule": 1, "exceptions": 1, "_id": 0},
+        ),
+        QueryShape(
+            "freebusy.group_busy.unmigrated",
+            "schedule_events",
+            {"user_id": {"$in": group}, **window_filter(day, next_day)},
+            [("user_id", 1), ("start_time", 1)],
+            projection={
+                "user_id": 1,
+                "start_time": 1,
+                "end_time": 1,
+                "rrule": 1,
+                "exceptions": 1,
+                "_id": 0,
+            },
+        ),
+        # services/conflicts.py
+        QueryShape(
+            "conflicts.load_days",
+            "schedule_events",
+            {"user_id": user, **window_filter(day, next_day)},
+            projection={
+                "title": 1,
+                "summary": 1,
+                "start_time": 1,
+                "end_time": 1,
+                "rrule": 1,
+                "exceptions": 1,
+            },
+        ),
+        # services/insight_facts.py
+        QueryShape(
+            "insights.top_open",
+            "tasks",
+            {"user_id": user, "is_completed": False},
+            [("priority", 1), ("due_date", 1), ("created_at", 1)],
+            projection={"description": 1, "priority": 1, "due_date": 1, "created_at": 1},
+            limit=5,
+        ),
+        QueryShape(
+            "insights.completed_in_range",
+            "tasks",
+            {"user_id": user, "is_completed": True, "updated_at": in_day},
+            projection={"created_at": 1, "updated_at": 1},
+        ),
+        QueryShape("insights.created_in_range", "tasks", {"user_id": user, "created_at": in_day}),
+        QueryShape("insights.overdue", "tasks", open_due_query(user, before=day)),
+        QueryShape(
+            "insights.logs_in_range",
+            "habit_logs",
+            {"user_id": user, "date": in_day},
+            projection={"habit_id": 1, "status": 1},
+        ),
+        QueryShape(
+            "insights.next_event",
+            "schedule_events",
+            {"user_id": user, "start_time": {"$gte": now}},
+            [("start_time", 1)],
+            limit=1,
+        ),
+        # sync.py
+        QueryShape(
+            "sync.changes",
+            "changes",
+            {"user_id": user, "_id": {"$gt": ObjectId.from_datetime(day), "$lt": ObjectId()}},
+            [("_id", 1)],
+            limit=501,
+        ),
+    ]
+
+
+def collect_stages(plan: Any) -> List[str]:
+    """Return every ``stage`` name in an explain plan tree, outermost first."""
+
+    stages: List[str] = []
+    if isinstance(plan, dict):
+        stage = plan.get("stage")
+        if isinstance(stage, str):
+            stages.append(stage)
+        for key in ("queryPlan", "inputStage", "inputStages", "shards", "winningPlan"):
+            if key in plan:
+                stages.extend(collect_stages(plan[key]))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(collect_stages(item))
+    return stages
+
+
+def collect_index_names(plan: Any) -> List[str]:
+    names: List[str] = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("indexName"), str):
+            names.append(plan["indexName"])
+        for value in plan.values():
+            if isinstance(value, (dict, list)):
+                names.extend(collect_index_names(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            names.extend(collect_index_names(item))
+    return names
+
+
+def propose_index(shape: QueryShape) -> Optional[IndexSpec]:
+    """Propose a compound index for ``shape`` ordered equality, sort, range."""
+
+    equality: IndexSpec = []
+    ranges: IndexSpec = []
+    for key, value in shape.filter.items():
+        if key.startswith("$") or key == "_id":
+            continue
+        operators = set(value) if isinstance(value, dict) else set()
+        if operators & _RANGE_OPERATORS:
+            ranges.append((key, 1))
+        else:
+            equality.append((key, 1))
+
+    sort_keys = [(key, direction) for key, direction in shape.sort]
+    seen = {key for key, _ in equality}
+    spec = list(equality)
+    spec.extend(item for item in sort_keys if item[0] not in seen)
+    seen.update(key for key, _ in sort_keys)
+    spec.extend(item for item in ranges if item[0] not in seen)
+    return spec or None
+
+
+def _winning_plan(explain: Dict[str, Any]) -> Any:
+    planner = explain.get("queryPlanner") or {}
+    return planner.get("winningPlan", explain)
+
+
+async def explain_shape(db: AsyncIOMotorDatabase, shape: QueryShape) -> PlanReport:
+    report = PlanReport(shape=shape)
+    cursor = db[shape.collection].find(shape.filter, shape.projection)
+    if shape.sort:
+        cursor = cursor.sort(list(shape.sort))
+    if shape.limit:
+        cursor = cursor.limit(shape.limit)
+    try:
+        explain = await cursor.explain()
+    except Exception as exc:  # pragma: no cover - depends on the server
+        report.error = str(exc)
+        return report
+
+    plan = _winning_plan(explain)
+    report.stages = collect_stages(plan)
+    report.index_names = collect_index_names(plan)
+    if report.flagged:
+        report.proposed_index = propose_index(shape)
+    return report
+
+
+async def verify(
+    db: AsyncIOMotorDatabase,
+    shapes: Iterable[QueryShape],
+    *,
+    create: bool = False,
+) -> List[PlanReport]:
+    """Explain every shape; optionally create the proposed indexes and re-check."""
+
+    reports = [await explain_shape(db, shape) for shape in shapes]
+    if not create:
+        return reports
+
+    created = False
+    for report in reports:
+        if report.proposed_index:
+            await db[report.shape.collection].create_index(report.proposed_index)
+            created = True
+    if not created:
+        return reports
+    return [await explain_shape(db, report.shape) for report in reports]
+
+
+def format_report(reports: Sequence[PlanReport]) -> str:
+    lines: List[str] = []
+    for report in reports:
+        shape = report.shape
+        if report.error:
+            lines.append(f"ERROR {shape.name}: {report.error}")
+            continue
+        status = "OK   " if report.ok else "FLAG "
+        indexes = ", ".join(dict.fromkeys(report.index_names)) or "-"
+        lines.append(
+            f"{status}{shape.name} [{shape.collection}] stages={' > '.join(report.stages)} index={indexes}"
+        )
+        if report.proposed_index:
+            lines.append(f"      propose {shape.collection}.create_index({report.proposed_index!r})")
+    flagged = sum(1 for report in reports if not report.ok)
+    lines.append(f"{len(reports)} query shapes checked, {flagged} flagged")
+    return "\n".join(lines)
+
+
+async def _run(create: bool, as_json: bool) -> int:
+    db = get_db()
+    try:
+        await ensure_indexes()
+        reports = await verify(db, build_catalog(), create=create)
+    finally:
+        close_client()
+
+    if as_json:
+        payload = [
+            {
+                "name": report.shape.name,
+                "collection": report.shape.collection,
+                "stages": report.stages,
+                "indexes": report.index_names,
+                "flagged": report.flagged,
+                "proposed_index": report.proposed_index,
+                "error": report.error,
+            }
+            for report in reports
+        ]
+        print(json.dumps(payload, indent=2))
+    else:
+        print(format_report(reports))
+    return 0 if all(report.ok for report in reports) else 1
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--create", action="store_true", help="create proposed indexes, then re-check")
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args(argv)
+    return asyncio.run(_run(args.create, args.json))
+
+
+__all__ = [
+    "PlanReport",
+    "QueryShape",
+    "build_catalog",
+    "collect_stages",
+    "explain_shape",
+    "main",
+    "propose_index",
+    "verify",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - manual execution
+    sys.exit(main())
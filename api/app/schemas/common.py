@@ -1,6 +1,7 @@
 from __future__ import annotations
-from typing import Generic, List, Optional, TypeVar
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from typing import Any, Dict, Generic, Iterable, List, NamedTuple, Optional, Set, Tuple, Type, TypeVar, get_args, get_origin
+from pydantic import BaseModel, Field, create_model
 
 # Detect Pydantic v2
 try:
@@ -68,9 +69,187 @@ T = TypeVar("T")
 
 class ListResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    # On cursor-paginated lists this is the page length, not the number of
+    # matching documents. Offset-paged subtask lists report the array size.
+    total: int = Field(
+        ...,
+        description=(
+            "Number of items in this response (the page length on cursor-paginated lists; "
+            "the full subtask count on subtask pages)"
+        ),
+    )
     page: Optional[int] = None
     page_size: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class ItemResponse(BaseModel, Generic[T]):
     item: T
+
+
+# ---- Sparse field selection ----
+class FieldSelection(NamedTuple):
+    model: Type[BaseModel]
+    projection: Dict[str, int]
+
+
+@lru_cache(maxsize=256)
+def _partial_model(model: Type[BaseModel], selected: Tuple[str, ...]) -> Type[BaseModel]:
+    # Unselected fields stay readable on the instance (e.g. sort keys needed for
+    # cursors) but become optional and are never serialised.
+    overrides: Dict[str, Any] = {
+        name: (Optional[Any], Field(default=None, exclude=True))
+        for name in model.model_fields
+        if name not in selected
+    }
+    return create_model(f"{model.__name__}Fields", __base__=model, **overrides)
+
+
+def select_fields(
+    model: Type[BaseModel], raw: str, *, always: Iterable[str] = ()
+) -> FieldSelection:
+    """Resolve a comma-separated ``fields`` parameter against ``model``.
+
+    Field names or their aliases are accepted; ``_id`` is always returned. The
+    result holds a Mongo projection (which also fetches the ``always`` keys the
+    handler needs internally) and a response model that serialises only the
+    requested fields. Raises ``ValueError`` listing unknown fields.
+    """
+
+    by_key: Dict[str, str] = {}
+    for name, info in model.model_fields.items():
+        by_key[name] = name
+        if info.alias:
+            by_key[info.alias] = name
+
+    requested = [chunk.strip() for chunk in raw.split(",") if chunk.strip()]
+    unknown = [key for key in requested if key not in by_key]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+    selected = {by_key[key] for key in requested} | {"id"}
+    projection: Dict[str, int] = {}
+    for name in selected:
+        info = model.model_fields[name]
+        projection[info.alias or name] = 1
+    for key in always:
+        projection[key] = 1
+
+    return FieldSelection(_partial_model(model, tuple(sorted(selected))), projection)
+
+
+# ---- Trusted reads ----
+# Documents written by the current handlers are stamped with their
+# collection's entry in ``SCHEMA_VERSIONS``. They already hold exactly what the
+# response models would produce, so list endpoints can encode them straight to
+# JSON instead of building a model per document; anything unstamped, or
+# stamped with an older version, still goes through full validation. Bump only
+# the collection whose canonical shape changed.
+SCHEMA_VERSIONS: Dict[str, int] = {
+    "tasks": 1,
+    "habits": 1,
+    "habit_logs": 1,
+    # Version 2: schedule events fit within ``MAX_EVENT_DURATION``.
+    "schedule_events": 2,
+    # ``users`` documents hold no stamp; the version keys its migration record.
+    "users": 1,
+}
+
+
+def stamp_schema(collection: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+    doc["schema_version"] = SCHEMA_VERSIONS[collection]
+    return doc
+
+
+def is_trusted(collection: str, doc: Dict[str, Any]) -> bool:
+    return doc.get("schema_version") == SCHEMA_VERSIONS[collection]
+
+
+# Completed runs of ``app.migrations`` are recorded here, one document per collection.
+STATE_COLLECTION = "schema_migrations"
+
+
+class SchemaState:
+    """Collections known to hold only canonical, stamped documents.
+
+    Everything the current handlers write is canonical, so once a migration
+    has completed the set only changes when a collection is migrated again.
+    """
+
+    def __init__(self) -> None:
+        self._ready: Set[str] = set()
+
+    def is_ready(self, collection: str) -> bool:
+        return collection in self._ready
+
+    def mark(self, collection: str, ready: bool = True) -> None:
+        if ready:
+            self._ready.add(collection)
+        else:
+            self._ready.discard(collection)
+
+    async def load(self, db: Any) -> None:
+        """Replace the in-process view with the completed migration records."""
+
+        cursor = db[STATE_COLLECTION].find({"complete": True})
+        self._ready = {
+            doc["_id"]
+            async for doc in cursor
+            if doc.get("schema_version") == SCHEMA_VERSIONS.get(doc["_id"])
+        }
+
+    def all_trusted(self, collection: str, docs: Iterable[Dict[str, Any]]) -> bool:
+        """Whether ``docs`` can be encoded without validation."""
+
+        return collection in self._ready or all(is_trusted(collection, doc) for doc in docs)
+
+    def clear(self) -> None:
+        self._ready.clear()
+
+
+schema_state = SchemaState()
+
+
+_OBJECT_ID = "oid"
+_MODEL_LIST = "models"
+
+
+def _field_kind(annotation: Any) -> Tuple[Optional[str], Optional[Type[BaseModel]]]:
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    if isinstance(annotation, type) and issubclass(annotation, ObjectId):
+        return _OBJECT_ID, None
+    if get_origin(annotation) in (list, List) and args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+        return _MODEL_LIST, args[0]
+    if len(args) == 1:  # Optional[X]
+        return _field_kind(args[0])
+    return None, None
+
+
+@lru_cache(maxsize=None)
+def _trusted_plan(model: Type[BaseModel]) -> Tuple[Tuple[str, Any, Optional[str], Optional[Type[BaseModel]]], ...]:
+    plan = []
+    for name, info in model.model_fields.items():
+        default = None if info.is_required() or info.default_factory is not None else info.default
+        plan.append((info.alias or name, default, *_field_kind(info.annotation)))
+    return tuple(plan)
+
+
+def dump_trusted(model: Type[BaseModel], doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stamped document like ``model.model_dump(by_alias=True)`` without validating it.
+
+    ObjectIds are rendered as strings, missing optional fields get their
+    defaults and keys the model does not declare are dropped.
+    """
+
+    out: Dict[str, Any] = {}
+    for key, default, kind, item_model in _trusted_plan(model):
+        value = doc.get(key, default)
+        if value is not None:
+            if kind == _OBJECT_ID:
+                value = str(value)
+            elif kind == _MODEL_LIST:
+                value = [dump_trusted(item_model, item) for item in value]
+        elif kind == _MODEL_LIST:
+            value = []
+        out[key] = value
+    return out
+
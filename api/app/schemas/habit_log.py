@@ -1,10 +1,24 @@
 from datetime import datetime
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import Field, field_validator
 from .common import MongoModel, PyObjectId
 
 Status = Literal["completed", "missed"]
+# Spellings accepted from older clients and documents.
+LEGACY_STATUSES = {
+    "done": "completed",
+    "complete": "completed",
+    "skipped": "missed",
+    "miss": "missed",
+}
+
+
+def normalize_status(value: Any) -> Any:
+    if isinstance(value, str):
+        normalized = value.strip().lower()
+        return LEGACY_STATUSES.get(normalized, normalized)
+    return value
 
 
 class HabitLog(MongoModel):
@@ -18,16 +32,7 @@ class HabitLog(MongoModel):
     @field_validator("status", mode="before")
     @classmethod
     def _normalize_status(cls, value: str) -> str:
-        if isinstance(value, str):
-            normalized = value.strip().lower()
-            mapping = {
-                "done": "completed",
-                "complete": "completed",
-                "skipped": "missed",
-                "miss": "missed",
-            }
-            return mapping.get(normalized, normalized)
-        return value
+        return normalize_status(value)
 
 
 class HabitLogCreate(MongoModel):
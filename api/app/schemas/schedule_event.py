@@ -1,10 +1,34 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from .common import MongoModel, PyObjectId
 
+# No stored event runs longer than this, so overlap queries can bound
+# ``start_time`` from below as well as above and stay index-only.
+MAX_EVENT_DURATION = timedelta(days=14)
+
+
+def with_legacy_times(doc: dict) -> dict:
+    """Copy of ``doc`` with start/end times derived from legacy keys where missing."""
+
+    data = dict(doc)
+    start = data.get("start_time")
+    if not start:
+        fallback = (
+            data.get("date")
+            or data.get("timestamp")
+            or data.get("created_at")
+            or data.get("updated_at")
+        )
+        if isinstance(fallback, datetime):
+            data["start_time"] = fallback
+    end = data.get("end_time")
+    if not end and data.get("start_time"):
+        data["end_time"] = data["start_time"] + timedelta(hours=1)
+    return data
+
 
 class ScheduleEvent(MongoModel):
     id: PyObjectId = Field(alias="_id")
@@ -16,24 +40,40 @@ class ScheduleEvent(MongoModel):
     location: Optional[str] = None
     summary: Optional[str] = None
     updated_at: Optional[datetime] = None
+    rrule: Optional[str] = None
+    recurring_event_id: Optional[PyObjectId] = None
+    original_start_time: Optional[datetime] = None
 
     @classmethod
     def from_mongo(cls, doc: dict) -> "ScheduleEvent":
-        data = dict(doc)
-        start = data.get("start_time")
-        if not start:
-            fallback = (
-                data.get("date")
-                or data.get("timestamp")
-                or data.get("created_at")
-                or data.get("updated_at")
-            )
-            if isinstance(fallback, datetime):
-                data["start_time"] = fallback
-        end = data.get("end_time")
-        if not end and data.get("start_time"):
-            data["end_time"] = data["start_time"] + timedelta(hours=1)
-        return cls.model_validate(data)
+        return cls.model_validate(with_legacy_times(doc))
+
+
+class StoredScheduleEvent(ScheduleEvent):
+    """A canonical stored event, whose times fit within ``MAX_EVENT_DURATION``."""
+
+    @model_validator(mode="after")
+    def _within_max_duration(self) -> "StoredScheduleEvent":
+        if self.end_time - self.start_time > MAX_EVENT_DURATION:
+            raise ValueError(f"Events cannot run longer than {MAX_EVENT_DURATION.days} days")
+        return self
+
+
+class ScheduleConflict(MongoModel):
+    id: PyObjectId = Field(alias="_id")
+    title: Optional[str] = None
+    start_time: datetime
+    end_time: datetime
+    original_start_time: Optional[datetime] = None
+
+
+class ScheduleEventCreated(ScheduleEvent):
+    conflicts: List[ScheduleConflict] = Field(default_factory=list)
+
+
+class ScheduleEventConflicts(MongoModel):
+    event: ScheduleConflict
+    conflicts: List[ScheduleConflict]
 
 
 class ScheduleEventCreate(MongoModel):
@@ -44,6 +84,7 @@ class ScheduleEventCreate(MongoModel):
     description: Optional[str] = None
     location: Optional[str] = None
     summary: Optional[str] = None
+    rrule: Optional[str] = None
 
 
 class ScheduleEventUpdate(MongoModel):
@@ -53,3 +94,14 @@ class ScheduleEventUpdate(MongoModel):
     description: Optional[str] = None
     location: Optional[str] = None
     summary: Optional[str] = None
+    rrule: Optional[str] = None
+
+
+class ScheduleOccurrenceUpdate(MongoModel):
+    original_start_time: datetime
+    title: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    summary: Optional[str] = None
@@ -1,11 +1,13 @@
 from datetime import datetime
 from typing import List, Literal, Optional
 
-from pydantic import Field, field_validator
+from pydantic import Field, field_validator, model_validator
 
 from .common import MongoModel, PyObjectId
 
 Priority = Literal["high", "medium", "low"]
+# Older documents stored priority as an integer.
+LEGACY_PRIORITIES = {0: "low", 1: "medium", 2: "high"}
 
 
 class TaskSubtask(MongoModel):
@@ -17,13 +19,13 @@ class TaskSubtask(MongoModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
-    @field_validator('duration_minutes', mode='before')
+    @model_validator(mode='before')
     @classmethod
-    def fix_duration_field_name(cls, v, info):
+    def fix_duration_field_name(cls, data):
         # Handle legacy field name 'duration_min' from database
-        if 'duration_min' in info.data:
-            return info.data['duration_min']
-        return v
+        if isinstance(data, dict) and 'duration_min' in data and data.get('duration_minutes') is None:
+            data = {**data, 'duration_minutes': data['duration_min']}
+        return data
 
 
 class Task(MongoModel):
@@ -42,8 +44,7 @@ class Task(MongoModel):
     def convert_priority_int_to_str(cls, v):
         """Convert integer priority values to string literals."""
         if isinstance(v, int):
-            priority_map = {0: "low", 1: "medium", 2: "high"}
-            return priority_map.get(v, "medium")
+            return LEGACY_PRIORITIES.get(v, "medium")
         return v
 
 
@@ -2,11 +2,13 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 
 from bson import ObjectId
 from pydantic import BaseModel, Field, EmailStr, field_validator
 
+from ..services.local_time import DEFAULT_TIMEZONE, is_valid_timezone
+
 
 def _to_str_oid(v: Any) -> str:
     # Accept ObjectId or str; always serialize as string
@@ -15,9 +17,22 @@ def _to_str_oid(v: Any) -> str:
     return str(v)
 
 
+def _check_timezone(v: Optional[str]) -> Optional[str]:
+    if v is not None and not is_valid_timezone(v):
+        raise ValueError("Unknown IANA time zone")
+    return v
+
+
 class UserBase(BaseModel):
     email: EmailStr
     name: str
+    # IANA zone used for "today" and month boundaries, e.g. "America/Chicago".
+    timezone: str = DEFAULT_TIMEZONE
+
+    @field_validator("timezone")
+    @classmethod
+    def _valid_timezone(cls, v):
+        return _check_timezone(v)
 
 
 class User(UserBase):
@@ -36,6 +51,16 @@ class UserCreate(UserBase):
     pass
 
 
+class UserUpdate(BaseModel):
+    name: Optional[str] = None
+    timezone: Optional[str] = None
+
+    @field_validator("timezone")
+    @classmethod
+    def _valid_timezone(cls, v):
+        return _check_timezone(v)
+
+
 class UserPublic(UserBase):
     id: str = Field(alias="_id")
 
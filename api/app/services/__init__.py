@@ -1,5 +1,5 @@
 """Service helpers for AI-generated insights and scheduling utilities."""
 
-from .freebusy import get_free_intervals
+from .freebusy import busy_cache, get_free_intervals, get_group_free_intervals
 
-__all__ = ["get_free_intervals"]
+__all__ = ["busy_cache", "get_free_intervals", "get_group_free_intervals"]
@@ -0,0 +1,242 @@
+"""Per-user interval trees answering "what overlaps this slot?" for schedule writes.
+
+Each user's calendar is loaded lazily, one UTC day at a time: the first
+overlap query touching an unloaded day fetches every event overlapping the
+missing days with a single range query and inserts them into the user's
+:class:`~.interval_tree.IntervalTree`. Create, update and delete handlers
+then keep the tree current, so later conflict checks are answered from
+memory instead of another ``schedule_events`` scan. Recurring series are
+expanded into one interval per occurrence, keyed by ``(series id, original
+start)``; writes to a series simply drop the user's calendar.
+
+A write that lands while a day is being fetched bumps the calendar's
+generation and records the event key, and the load skips documents for keys
+written since it started, so a delete is not undone by the stale read.
+
+The index only sees writes made by this process. Calendars are therefore
+dropped after ``STALE_AFTER`` so changes made through other workers are
+picked up on the next load, and only the ``MAX_USERS`` most recently used
+calendars are kept.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as day_time, timedelta, timezone
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set
+
+from bson import ObjectId
+
+if __package__:
+    from .interval_tree import Interval, IntervalTree
+    from .recurrence import expand_documents, window_filter
+else:  # pragma: no cover
+    from app.services.interval_tree import Interval, IntervalTree
+    from app.services.recurrence import expand_documents, window_filter
+
+STALE_AFTER = timedelta(minutes=5)
+MAX_USERS = 1024
+
+_PROJECTION = {
+    "title": 1,
+    "summary": 1,
+    "start_time": 1,
+    "end_time": 1,
+    "rrule": 1,
+    "exceptions": 1,
+}
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _days(start: datetime, end: datetime) -> List[date]:
+    """Return the UTC days touched by ``[start, end)``."""
+
+    first, last = start.date(), (end - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, day_time.min)
+
+
+@dataclass
+class _Calendar:
+    tree: IntervalTree[Optional[str]] = field(default_factory=IntervalTree)
+    days: Set[date] = field(default_factory=set)
+    loaded_at: float = field(default_factory=time.monotonic)
+    # Bumped by every record/forget; ``written`` maps each key touched while a
+    # load was in flight to the generation of its last write.
+    generation: int = 0
+    written: Dict[Hashable, int] = field(default_factory=dict)
+    loading: int = 0
+
+    def touch(self, key: Hashable) -> None:
+        self.generation += 1
+        if self.loading:
+            self.written[key] = self.generation
+
+
+class ConflictIndex:
+    """Lazily built overlap index over ``schedule_events``, one tree per user."""
+
+    def __init__(self, *, stale_after: timedelta = STALE_AFTER, max_users: int = MAX_USERS) -> None:
+        self._stale_after = stale_after.total_seconds()
+        self._max_users = max_users
+        self._calendars: "OrderedDict[ObjectId, _Calendar]" = OrderedDict()
+
+    def clear(self) -> None:
+        self._calendars.clear()
+
+    def invalidate(self, user_id: ObjectId) -> None:
+        self._calendars.pop(user_id, None)
+
+    def _calendar(self, user_id: ObjectId, *, create: bool) -> Optional[_Calendar]:
+        calendar = self._calendars.get(user_id)
+        if calendar is not None and time.monotonic() - calendar.loaded_at > self._stale_after:
+            del self._calendars[user_id]
+            calendar = None
+        if calendar is None:
+            if not create:
+                return None
+            calendar = self._calendars[user_id] = _Calendar()
+            while len(self._calendars) > self._max_users:
+                self._calendars.popitem(last=False)
+        else:
+            self._calendars.move_to_end(user_id)
+        return calendar
+
+    async def _ensure(self, db: Any, user_id: ObjectId, start: datetime, end: datetime) -> _Calendar:
+        calendar = self._calendar(user_id, create=True)
+        missing = [day for day in _days(start, end) if day not in calendar.days]
+        if missing:
+            window_start, window_end = _midnight(missing[0]), _midnight(missing[-1] + timedelta(days=1))
+            started = calendar.generation
+            calendar.loading += 1
+            try:
+                cursor = db.schedule_events.find(
+                    {"user_id": user_id, **window_filter(window_start, window_end)},
+                    _PROJECTION,
+                )
+                docs = [doc async for doc in cursor]
+                for doc in expand_documents(docs, window_start, window_end):
+                    # Written (or deleted) after the read began: the tree is newer.
+                    if calendar.written.get(event_key(doc), started) <= started:
+                        _insert(calendar.tree, doc)
+                calendar.days.update(missing)
+            finally:
+                calendar.loading -= 1
+                if not calendar.loading:
+                    calendar.written.clear()
+        return calendar
+
+    async def overlapping(
+        self, db: Any, user_id: ObjectId, start: datetime, end: datetime
+    ) -> List[Interval[Optional[str]]]:
+        """Return events of ``user_id`` overlapping ``[start, end)``."""
+
+        start, end = _naive_utc(start), _naive_utc(end)
+        calendar = await self._ensure(db, user_id, start, end)
+        return calendar.tree.overlapping(start, end)
+
+    async def conflicts_in(
+        self, db: Any, user_id: ObjectId, start: datetime, end: datetime
+    ) -> List[tuple[Interval[Optional[str]], List[Interval[Optional[str]]]]]:
+        """Pair every event in ``[start, end)`` with the other events it overlaps."""
+
+        start, end = _naive_utc(start), _naive_utc(end)
+        calendar = await self._ensure(db, user_id, start, end)
+        events = calendar.tree.overlapping(start, end)
+        if not events:
+            return []
+        # Partners of an event near the window edge may sit on unloaded days.
+        calendar = await self._ensure(
+            db, user_id, min(event.start for event in events), max(event.end for event in events)
+        )
+        pairs = []
+        for event in events:
+            others = [
+                other
+                for other in calendar.tree.overlapping(event.start, event.end)
+                if other.key != event.key
+            ]
+            if others:
+                pairs.append((event, others))
+        return pairs
+
+    async def register(
+        self, db: Any, user_id: ObjectId, docs: Iterable[dict]
+    ) -> Dict[Hashable, List[Interval[Optional[str]]]]:
+        """Add freshly written ``docs`` and return each one's conflicts by :func:`event_key`."""
+
+        docs = list(docs)
+        bounds = {event_key(doc): _bounds(doc) for doc in docs}
+        docs = [doc for doc in docs if bounds[event_key(doc)] is not None]
+        if not docs:
+            return {}
+        calendar = await self._ensure(
+            db,
+            user_id,
+            min(bounds[event_key(doc)][0] for doc in docs),
+            max(bounds[event_key(doc)][1] for doc in docs),
+        )
+        for doc in docs:
+            _insert(calendar.tree, doc)
+        return {
+            event_key(doc): [
+                other
+                for other in calendar.tree.overlapping(*bounds[event_key(doc)])
+                if other.key != event_key(doc)
+            ]
+            for doc in docs
+        }
+
+    def record(self, user_id: ObjectId, doc: dict) -> None:
+        """Reflect an updated event in the user's tree if it is loaded."""
+
+        calendar = self._calendar(user_id, create=False)
+        if calendar is None:
+            return
+        calendar.touch(event_key(doc))
+        if _bounds(doc) is None:
+            calendar.tree.remove(event_key(doc))
+        else:
+            _insert(calendar.tree, doc)
+
+    def forget(self, user_id: ObjectId, event_id: ObjectId) -> None:
+        calendar = self._calendar(user_id, create=False)
+        if calendar is not None:
+            calendar.touch(event_id)
+            calendar.tree.remove(event_id)
+
+
+def event_key(doc: dict) -> Hashable:
+    """Tree key of an event: its ``_id``, or ``(series id, original start)`` for occurrences."""
+
+    if doc.get("original_start_time") is not None:
+        return doc["recurring_event_id"], doc["original_start_time"]
+    return doc["_id"]
+
+
+def _bounds(doc: dict) -> Optional[tuple[datetime, datetime]]:
+    start, end = doc.get("start_time"), doc.get("end_time")
+    if not isinstance(start, datetime) or not isinstance(end, datetime):
+        return None
+    start, end = _naive_utc(start), _naive_utc(end)
+    return (start, end) if start < end else None
+
+
+def _insert(tree: IntervalTree[Optional[str]], doc: dict) -> None:
+    bounds = _bounds(doc)
+    if bounds is not None:
+        tree.insert(bounds[0], bounds[1], event_key(doc), doc.get("title") or doc.get("summary"))
+
+
+conflict_index = ConflictIndex()
+
+__all__ = ["ConflictIndex", "MAX_USERS", "STALE_AFTER", "conflict_index", "event_key"]
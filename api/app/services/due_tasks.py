@@ -0,0 +1,52 @@
+"""Queries over open tasks that have a due date.
+
+A partial index on ``(user_id, due_date)`` covers only open tasks with a due
+date, which is a small slice of most users' task history. Every query built
+here repeats the index's filter expression, which lets the planner pick it
+for the due-soon endpoint and the insight facts builder. The queries carry
+no ``hint``: databases where ``ensure_indexes`` never created the index
+still answer them from the broader task indexes.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+OPEN_DUE_INDEX = "open_tasks_by_due_date"
+OPEN_DUE_KEYS: List[Tuple[str, int]] = [("user_id", ASCENDING), ("due_date", ASCENDING)]
+OPEN_DUE_FILTER: Dict[str, Any] = {"is_completed": False, "due_date": {"$exists": True}}
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def open_due_query(
+    user_id: ObjectId,
+    *,
+    after: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Return a filter for open tasks of ``user_id`` due in ``[after, before)``.
+
+    Raises ``ValueError`` when the window is empty.
+    """
+
+    after, before = _naive_utc(after), _naive_utc(before)
+    if after is not None and before is not None and after >= before:
+        raise ValueError("after must be earlier than before")
+
+    due: Dict[str, Any] = {"$exists": True}
+    if after is not None:
+        due["$gte"] = after
+    if before is not None:
+        due["$lt"] = before
+    return {"user_id": user_id, "is_completed": False, "due_date": due}
+
+
+__all__ = ["OPEN_DUE_FILTER", "OPEN_DUE_INDEX", "OPEN_DUE_KEYS", "open_due_query"]
@@ -1,15 +1,58 @@
-"""Utilities for computing free time windows for scheduling."""
+"""Utilities for computing free time windows for scheduling.
+
+Single-user lookups read busy time through :data:`busy_cache`, which keeps
+each user's merged busy ranges per UTC day. A planner re-planning the same
+window over an unchanged calendar is then answered without touching Mongo.
+Schedule writes in ``api/schedule.py`` drop the writer's cached days, and
+entries also expire after ``STALE_AFTER`` so writes made through other
+workers are picked up.
+
+Once ``schedule_events`` is migrated, every event fits within
+``MAX_EVENT_DURATION``, so one-off events are read with an index-only scan
+of ``(user_id, start_time, end_time)`` bounded on both sides, and recurring
+masters with a second query on the partial ``(user_id, series_end)`` index.
+
+Free time is cut into block-aligned slots by one of two ``ENGINES``: the
+default ``"intervals"`` sweep over merged ranges, or ``"bitmap"``, which
+paints busy time onto one cell per block and reads the free runs back out.
+The bitmap is vectorised with NumPy, which ``requirements.txt`` installs; a
+``bytearray`` fallback keeps it working where NumPy is missing. It pays off
+for long horizons at small blocks.
+"""
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import List
+import heapq
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time as day_time, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+try:  # Optional: vectorised painting for the bitmap engine.
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is absent
+    np = None
+
 if __package__:
+    from ..schemas.common import schema_state
+    from ..schemas.schedule_event import MAX_EVENT_DURATION
     from ..utils.object_ids import resolve_object_id
+    from .recurrence import expand_documents, window_filter
 else:  # pragma: no cover
+    from app.schemas.common import schema_state
+    from app.schemas.schedule_event import MAX_EVENT_DURATION
     from app.utils.object_ids import resolve_object_id
+    from app.services.recurrence import expand_documents, window_filter
+
+STALE_AFTER = timedelta(minutes=5)
+MAX_USERS = 1024
+
+Range = tuple[datetime, datetime]
+
+ENGINES = ("intervals", "bitmap")
 
 
 def _normalize_datetime(value: datetime) -> datetime:
@@ -58,45 +101,14 @@ def _merge_ranges(ranges: List[tuple[datetime, datetime]]) -> List[tuple[datetim
     return merged
 
 
-async def get_free_intervals(
-    db: AsyncIOMotorDatabase,
-    user_id: str,
-    start: datetime,
-    end: datetime,
-    *,
-    block_minutes: int = 30,
-) -> List[dict[str, datetime]]:
-    """Return free intervals within ``[start, end]`` aligned to ``block_minutes``.
-
-    Busy periods are derived from ``schedule_events``. Returned intervals are
-    clamped to the input range and rounded to the nearest block boundary so
-    callers can allocate fixed-size blocks without overlapping existing events.
-    """
-
-    if block_minutes <= 0:
-        raise ValueError("block_minutes must be positive")
-
-    window_start = _normalize_datetime(start)
-    window_end = _normalize_datetime(end)
-    if window_start >= window_end:
-        return []
-
-    user_object_id = resolve_object_id(user_id, "user_id")
-
-    cursor = (
-        db.schedule_events.find(
-            {
-                "user_id": user_object_id,
-                "start_time": {"$lt": window_end},
-                "end_time": {"$gt": window_start},
-            },
-            {"start_time": 1, "end_time": 1, "_id": 0},
-        )
-        .sort("start_time", 1)
-    )
+def _busy_ranges(
+    docs: Iterable[Dict[str, Any]], window_start: datetime, window_end: datetime
+) -> List[tuple[datetime, datetime]]:
+    """Return the ``(start, end)`` ranges of ``docs``, expanding series inside the window."""
 
     busy: List[tuple[datetime, datetime]] = []
-    async for doc in cursor:
+    # Recurring series are expanded lazily, only across the requested window.
+    for doc in expand_documents(docs, window_start, window_end):
         start_time = doc.get("start_time")
         end_time = doc.get("end_time")
         if not isinstance(start_time, datetime) or not isinstance(end_time, datetime):
@@ -106,9 +118,16 @@ async def get_free_intervals(
         if normalized_end <= normalized_start:
             continue
         busy.append((normalized_start, normalized_end))
+    return busy
 
-    busy.sort(key=lambda item: item[0])
-    merged_busy = _merge_ranges(busy)
+
+def _aligned_free(
+    merged_busy: Iterable[tuple[datetime, datetime]],
+    window_start: datetime,
+    window_end: datetime,
+    block_minutes: int,
+) -> List[dict[str, datetime]]:
+    """Complement sorted, non-overlapping ``merged_busy`` within the window, on block boundaries."""
 
     raw_free: List[tuple[datetime, datetime]] = []
     cursor_time = window_start
@@ -132,3 +151,352 @@ async def get_free_intervals(
         aligned.append({"start": slot_start, "end": slot_end})
 
     return aligned
+
+
+def _bitmap_supported(block_minutes: int) -> bool:
+    # _round_up/_round_down measure remainders within the hour, so they only
+    # snap to one regular grid when the block divides an hour evenly.
+    return 60 % block_minutes == 0
+
+
+def _slot_runs_numpy(
+    busy: Sequence[Range], origin: datetime, block: timedelta, count: int
+) -> List[tuple[int, int]]:
+    step = np.timedelta64(block // timedelta(microseconds=1), "us")
+    base = np.datetime64(origin, "us")
+    starts = np.array([start for start, _ in busy], dtype="datetime64[us]")
+    ends = np.array([end for _, end in busy], dtype="datetime64[us]")
+    first = np.clip((starts - base) // step, 0, count)
+    last = np.clip(-((base - ends) // step), 0, count)
+
+    # Paint every range at once: +1 where it starts, -1 past its last slot.
+    cover = np.zeros(count + 1, dtype=np.int64)
+    np.add.at(cover, first, 1)
+    np.add.at(cover, last, -1)
+    free = np.zeros(count + 2, dtype=np.int8)
+    free[1:-1] = np.cumsum(cover[:-1]) == 0
+    edges = np.flatnonzero(np.diff(free)).tolist()
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def _slot_runs_bytes(
+    busy: Sequence[Range], origin: datetime, block: timedelta, count: int
+) -> List[tuple[int, int]]:
+    slots = bytearray(count)
+    filled = memoryview(b"\x01" * count)
+    for start, end in busy:
+        first = max(0, (start - origin) // block)
+        last = min(count, -((origin - end) // block))
+        if last > first:
+            slots[first:last] = filled[: last - first]
+
+    runs: List[tuple[int, int]] = []
+    position = slots.find(0)
+    while position != -1:
+        stop = slots.find(1, position)
+        if stop == -1:
+            stop = count
+        runs.append((position, stop))
+        position = slots.find(0, stop)
+    return runs
+
+
+def _bitmap_free(
+    merged_busy: Iterable[Range],
+    window_start: datetime,
+    window_end: datetime,
+    block_minutes: int,
+) -> List[dict[str, datetime]]:
+    """:func:`_aligned_free` computed on a bitmap with one cell per block.
+
+    Cells start at the first block boundary of the window and stop at the
+    last one; a cell is free when no busy range touches it. Blocks that do
+    not divide an hour fall back to :func:`_aligned_free`.
+    """
+
+    if not _bitmap_supported(block_minutes):
+        return _aligned_free(merged_busy, window_start, window_end, block_minutes)
+
+    block = timedelta(minutes=block_minutes)
+    origin = _round_up(window_start, block_minutes)
+    count = (window_end - origin) // block if window_end > origin else 0
+    if count <= 0:
+        return []
+
+    horizon = origin + count * block
+    busy = [(start, end) for start, end in merged_busy if start < horizon and end > origin]
+    slot_runs = _slot_runs_numpy if np is not None else _slot_runs_bytes
+    return [
+        {"start": origin + first * block, "end": origin + last * block}
+        for first, last in slot_runs(busy, origin, block, count)
+    ]
+
+
+def _merge_ranges_iter(ranges: Iterable[tuple[datetime, datetime]]) -> Iterator[tuple[datetime, datetime]]:
+    """Streaming :func:`_merge_ranges` for ranges arriving in start order."""
+
+    current: Optional[tuple[datetime, datetime]] = None
+    for start, end in ranges:
+        if current is None:
+            current = (start, end)
+        elif start <= current[1]:
+            if end > current[1]:
+                current = (current[0], end)
+        else:
+            yield current
+            current = (start, end)
+    if current is not None:
+        yield current
+
+
+def common_free_intervals(
+    busy_by_user: Iterable[List[tuple[datetime, datetime]]],
+    window_start: datetime,
+    window_end: datetime,
+    *,
+    block_minutes: int = 30,
+) -> List[dict[str, datetime]]:
+    """Return the slots in which nobody in ``busy_by_user`` is busy.
+
+    Each user's ranges must already be sorted by start. They are combined
+    with a heap-based k-way merge, so N users with E ranges in total cost
+    O(E log N) rather than re-sorting everything, and the union is swept
+    once while it streams out of the heap.
+    """
+
+    merged = _merge_ranges_iter(heapq.merge(*busy_by_user))
+    return _aligned_free(merged, window_start, window_end, block_minutes)
+
+
+def busy_filters(start: datetime, end: datetime) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """Filters for the one-off rows and the recurring masters overlapping ``[start, end)``.
+
+    The first only touches indexed fields, so with a projection of
+    ``start_time``/``end_time`` it is answered from the covering index.
+    """
+
+    rows = {"start_time": {"$gte": start - MAX_EVENT_DURATION, "$lt": end}, "end_time": {"$gt": start}}
+    series = {"rrule": {"$exists": True}, "start_time": {"$lt": end}, "series_end": {"$gt": start}}
+    return rows, series
+
+
+async def _window_docs(
+    db: AsyncIOMotorDatabase,
+    owner: Dict[str, Any],
+    start: datetime,
+    end: datetime,
+    *,
+    keys: Sequence[str] = (),
+) -> List[Dict[str, Any]]:
+    """Events matching ``owner`` that may overlap ``[start, end)``.
+
+    One-off rows come back in ``(*keys, start_time)`` order; recurring masters,
+    when read separately, follow them. ``keys`` are extra indexed fields to
+    project, such as ``user_id`` for group lookups.
+    """
+
+    sort = [(key, 1) for key in (*keys, "start_time")]
+    times = (*keys, "start_time", "end_time")
+    projection: Dict[str, Any] = {key: 1 for key in (*times, "rrule", "exceptions")}
+    projection["_id"] = 0
+    events = db.schedule_events
+    if not schema_state.is_ready("schedule_events"):
+        cursor = events.find({**owner, **window_filter(start, end)}, projection).sort(sort)
+        return [doc async for doc in cursor]
+
+    rows_filter, series_filter = busy_filters(start, end)
+    masters = [doc async for doc in events.find({**owner, **series_filter}, projection)]
+    # A master's own times match the covered scan too. Drop one such row per
+    # master so only its expansion, which honours cancellations, counts.
+    pending = Counter(
+        tuple(doc[key] for key in times)
+        for doc in masters
+        if doc["start_time"] >= rows_filter["start_time"]["$gte"] and doc["end_time"] > start
+    )
+    covered: Dict[str, Any] = {key: 1 for key in times}
+    covered["_id"] = 0
+    rows = []
+    async for row in events.find({**owner, **rows_filter}, covered).sort(sort):
+        key = tuple(row[name] for name in times)
+        if pending[key]:
+            pending[key] -= 1
+            continue
+        rows.append(row)
+    return rows + masters
+
+
+@dataclass
+class BusyCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class _UserBusy:
+    # Merged busy ranges clipped to each loaded UTC day.
+    days: Dict[date, List[Range]] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+def _days(start: datetime, end: datetime) -> List[date]:
+    first, last = start.date(), (end - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, day_time.min)
+
+
+class BusyCache:
+    """Per-user merged busy ranges, bucketed by UTC day, with LRU eviction.
+
+    A lookup that finds every day of its window loaded counts as a hit and
+    issues no query; otherwise the missing span is loaded with one range
+    query and the lookup counts as a miss.
+    """
+
+    def __init__(self, *, stale_after: timedelta = STALE_AFTER, max_users: int = MAX_USERS) -> None:
+        self._stale_after = stale_after.total_seconds()
+        self._max_users = max_users
+        self._users: "OrderedDict[ObjectId, _UserBusy]" = OrderedDict()
+        self.stats = BusyCacheStats()
+
+    def clear(self) -> None:
+        self._users.clear()
+        self.stats = BusyCacheStats()
+
+    def invalidate(self, user_id: ObjectId) -> None:
+        if self._users.pop(user_id, None) is not None:
+            self.stats.invalidations += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**asdict(self.stats), "users": len(self._users)}
+
+    def _entry(self, user_id: ObjectId) -> _UserBusy:
+        entry = self._users.get(user_id)
+        if entry is not None and time.monotonic() - entry.loaded_at > self._stale_after:
+            del self._users[user_id]
+            entry = None
+        if entry is None:
+            entry = self._users[user_id] = _UserBusy()
+            while len(self._users) > self._max_users:
+                self._users.popitem(last=False)
+                self.stats.evictions += 1
+        else:
+            self._users.move_to_end(user_id)
+        return entry
+
+    async def busy(
+        self, db: AsyncIOMotorDatabase, user_id: ObjectId, start: datetime, end: datetime
+    ) -> List[Range]:
+        """Return ``user_id``'s merged busy ranges over the UTC days covering ``[start, end)``."""
+
+        entry = self._entry(user_id)
+        days = _days(start, end)
+        missing = [day for day in days if day not in entry.days]
+        if not missing:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+            await self._load(db, user_id, entry, missing[0], missing[-1])
+        return list(_merge_ranges_iter(item for day in days for item in entry.days[day]))
+
+    async def _load(
+        self, db: AsyncIOMotorDatabase, user_id: ObjectId, entry: _UserBusy, first: date, last: date
+    ) -> None:
+        span_start, span_end = _midnight(first), _midnight(last + timedelta(days=1))
+        docs = await _window_docs(db, {"user_id": user_id}, span_start, span_end)
+
+        buckets: Dict[date, List[Range]] = {day: [] for day in _days(span_start, span_end)}
+        for busy_start, busy_end in _busy_ranges(docs, span_start, span_end):
+            for day in _days(max(busy_start, span_start), min(busy_end, span_end)):
+                midnight = _midnight(day)
+                buckets[day].append(
+                    (max(busy_start, midnight), min(busy_end, midnight + timedelta(days=1)))
+                )
+        for day, ranges in buckets.items():
+            ranges.sort()
+            entry.days[day] = _merge_ranges(ranges)
+
+
+busy_cache = BusyCache()
+
+
+async def get_free_intervals(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    start: datetime,
+    end: datetime,
+    *,
+    block_minutes: int = 30,
+    engine: str = "intervals",
+) -> List[dict[str, datetime]]:
+    """Return free intervals within ``[start, end]`` aligned to ``block_minutes``.
+
+    Busy periods are derived from ``schedule_events`` via :data:`busy_cache`,
+    with recurring series expanded to their occurrences. Returned intervals are
+    clamped to the input range and rounded to the nearest block boundary so
+    callers can allocate fixed-size blocks without overlapping existing events.
+    ``engine`` picks how the slots are cut; every engine returns the same list.
+    """
+
+    if block_minutes <= 0:
+        raise ValueError("block_minutes must be positive")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown free/busy engine: {engine}")
+
+    window_start = _normalize_datetime(start)
+    window_end = _normalize_datetime(end)
+    if window_start >= window_end:
+        return []
+
+    user_object_id = resolve_object_id(user_id, "user_id")
+    busy = await busy_cache.busy(db, user_object_id, window_start, window_end)
+    free = _bitmap_free if engine == "bitmap" else _aligned_free
+    return free(busy, window_start, window_end, block_minutes)
+
+
+async def get_group_free_intervals(
+    db: AsyncIOMotorDatabase,
+    user_ids: Sequence[str],
+    start: datetime,
+    end: datetime,
+    *,
+    block_minutes: int = 30,
+) -> List[dict[str, datetime]]:
+    """Return the intervals within ``[start, end]`` in which every user is free.
+
+    All calendars are read with one ``$in`` query on the
+    ``(user_id, start_time, end_time)`` index, which returns each user's
+    events already in start order; only users with recurring series need
+    their expanded ranges re-sorted. The per-user lists are then intersected by
+    :func:`common_free_intervals`.
+    """
+
+    if block_minutes <= 0:
+        raise ValueError("block_minutes must be positive")
+
+    window_start = _normalize_datetime(start)
+    window_end = _normalize_datetime(end)
+    if window_start >= window_end:
+        return []
+
+    user_object_ids = list(dict.fromkeys(resolve_object_id(user_id, "user_id") for user_id in user_ids))
+
+    docs = await _window_docs(
+        db, {"user_id": {"$in": user_object_ids}}, window_start, window_end, keys=("user_id",)
+    )
+    docs_by_user: Dict[Any, List[Dict[str, Any]]] = {}
+    for doc in docs:
+        docs_by_user.setdefault(doc["user_id"], []).append(doc)
+
+    busy_by_user = []
+    for docs in docs_by_user.values():
+        busy = _busy_ranges(docs, window_start, window_end)
+        if any(doc.get("rrule") for doc in docs):
+            busy.sort()
+        busy_by_user.append(busy)
+
+    return common_free_intervals(busy_by_user, window_start, window_end, block_minutes=block_minutes)
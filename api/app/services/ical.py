@@ -0,0 +1,359 @@
+"""Streaming iCalendar (RFC 5545) encoding and decoding for schedule events.
+
+Both directions work one event at a time so memory does not grow with the
+calendar: :func:`calendar_chunks` renders VEVENTs while documents come off a
+cursor, and :func:`read_vevents` turns an async stream of bytes into one
+property map per VEVENT without holding the whole file.
+"""
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+if __package__:
+    from .recurrence import occurrence_key, parse_rrule
+else:  # pragma: no cover
+    from app.services.recurrence import occurrence_key, parse_rrule
+
+PRODID = "-//DailyRoutine//Schedule Events//EN"
+UID_DOMAIN = "dailyroutine"
+MEDIA_TYPE = "text/calendar; charset=utf-8"
+# A logical (unfolded) line longer than this is treated as a corrupt upload.
+MAX_LINE_BYTES = 1024 * 1024
+
+_CHUNK_BYTES = 16 * 1024
+_FOLD_OCTETS = 75
+_DURATION = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+# ---- Export ----
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold ``line`` into CRLF-terminated chunks of at most 75 octets."""
+
+    encoded = line.encode("utf-8")
+    if len(encoded) <= _FOLD_OCTETS:
+        return line + "\r\n"
+    parts: List[str] = []
+    current: List[str] = []
+    size = 0
+    limit = _FOLD_OCTETS
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > limit:
+            parts.append("".join(current))
+            current, size = [], 0
+            limit = _FOLD_OCTETS - 1  # continuation lines start with a space
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _vevent(doc: Dict[str, Any], uid: str, stamp: datetime, recurrence_id: Optional[datetime] = None) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{_escape(uid)}",
+        f"DTSTAMP:{_utc(stamp)}",
+        f"DTSTART:{_utc(doc['start_time'])}",
+        f"DTEND:{_utc(doc['end_time'])}",
+    ]
+    if recurrence_id is not None:
+        lines.append(f"RECURRENCE-ID:{_utc(recurrence_id)}")
+    summary = doc.get("title") or doc.get("summary")
+    if summary:
+        lines.append(f"SUMMARY:{_escape(summary)}")
+    for key, name in (("description", "DESCRIPTION"), ("location", "LOCATION")):
+        if doc.get(key):
+            lines.append(f"{name}:{_escape(doc[key])}")
+    if recurrence_id is None and doc.get("rrule"):
+        rrule = doc["rrule"]
+        lines.append(rrule if rrule.upper().startswith("RRULE:") else f"RRULE:{rrule}")
+        for exception in (doc.get("exceptions") or {}).values():
+            if exception.get("cancelled"):
+                lines.append(f"EXDATE:{_utc(exception['original_start_time'])}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def serialize_event(doc: Dict[str, Any], *, now: Optional[datetime] = None) -> str:
+    """Render a ``schedule_events`` document, plus any occurrence overrides, as VEVENTs."""
+
+    if not all(isinstance(doc.get(key), datetime) for key in ("start_time", "end_time")):
+        return ""
+    uid = doc.get("ical_uid") or f"{doc['_id']}@{UID_DOMAIN}"
+    stamp = doc.get("updated_at") or now or datetime.utcnow()
+    rendered = [_vevent(doc, uid, stamp)]
+    if doc.get("rrule"):
+        for exception in (doc.get("exceptions") or {}).values():
+            if exception.get("cancelled"):
+                continue
+            override = {**doc, **exception}
+            rendered.append(
+                _vevent(
+                    override,
+                    uid,
+                    exception.get("updated_at") or stamp,
+                    exception["original_start_time"],
+                )
+            )
+    return "".join(rendered)
+
+
+async def calendar_chunks(docs: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Yield a VCALENDAR wrapping every document in ``docs``, in ~16 KiB chunks."""
+
+    now = datetime.utcnow()
+    header = ("BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN")
+    # Send the header straight away so the download starts before the first batch.
+    yield "".join(_fold(line) for line in header).encode("utf-8")
+    buffer = ""
+    async for doc in docs:
+        buffer += serialize_event(doc, now=now)
+        if len(buffer) >= _CHUNK_BYTES:
+            yield buffer.encode("utf-8")
+            buffer = ""
+    yield (buffer + _fold("END:VCALENDAR")).encode("utf-8")
+
+
+# ---- Import ----
+
+
+@dataclass
+class Property:
+    value: str
+    params: Dict[str, str]
+
+
+def _split_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    """Split ``NAME;PARAM=x:VALUE`` honouring quoted parameter values."""
+
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            head, value = line[:index], line[index + 1 :]
+            break
+    else:
+        raise ValueError(f"Malformed content line: {line[:40]!r}")
+
+    name, *raw_params = head.split(";")
+    params: Dict[str, str] = {}
+    for raw in raw_params:
+        key, _, param_value = raw.partition("=")
+        params[key.strip().upper()] = param_value.strip().strip('"')
+    return name.strip().upper(), params, value
+
+
+async def _logical_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Decode ``chunks`` incrementally and yield unfolded lines with their line number."""
+
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    current: Optional[str] = None
+    started = 0
+    number = 0
+
+    def physical(text: str):
+        nonlocal current, started, number
+        for raw in text.split("\n"):
+            number += 1
+            raw = raw.rstrip("\r")
+            if raw[:1] in (" ", "\t") and current is not None:
+                current += raw[1:]
+                if len(current) > MAX_LINE_BYTES:
+                    raise ValueError(f"Line {started} is longer than {MAX_LINE_BYTES} bytes")
+                continue
+            if current is not None:
+                yield started, current
+            current, started = raw, number
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        if len(pending) > MAX_LINE_BYTES and "\n" not in pending:
+            raise ValueError(f"Line {number + 1} is longer than {MAX_LINE_BYTES} bytes")
+        text, sep, pending = pending.rpartition("\n")
+        if sep:
+            for item in physical(text):
+                yield item
+    pending += decoder.decode(b"", final=True)
+    for item in physical(pending):
+        yield item
+    if current:
+        yield started, current
+
+
+async def read_vevents(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, Dict[str, List[Property]]]]:
+    """Yield ``(line number, properties)`` for every VEVENT in an .ics byte stream.
+
+    Components nested inside a VEVENT (such as VALARM) are skipped, and only
+    the current event's properties are held in memory.
+    """
+
+    event: Optional[Dict[str, List[Property]]] = None
+    started = 0
+    nested = 0
+    async for number, line in _logical_lines(chunks):
+        if not line.strip():
+            continue
+        name, params, value = _split_property(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and event is None:
+                event, started, nested = {}, number, 0
+            elif event is not None:
+                nested += 1
+        elif name == "END":
+            if event is not None and nested:
+                nested -= 1
+            elif event is not None and value.upper() == "VEVENT":
+                yield started, event
+                event = None
+        elif event is not None and not nested:
+            event.setdefault(name, []).append(Property(value, params))
+
+
+def _unescape(text: str) -> str:
+    out: List[str] = []
+    chars = iter(text)
+    for char in chars:
+        if char == "\\":
+            following = next(chars, "")
+            out.append("\n" if following in ("n", "N") else following)
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def _parse_datetime(value: str, params: Dict[str, str]) -> Tuple[datetime, bool]:
+    """Return a naive UTC datetime and whether ``value`` was a whole-day DATE."""
+
+    value = value.strip()
+    if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+        parsed = datetime.strptime(value, "%Y%m%d")
+        return parsed, True
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ"), False
+    parsed = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    tzid = params.get("TZID")
+    if tzid:
+        try:
+            zone = ZoneInfo(tzid)
+        except (ZoneInfoNotFoundError, ValueError):
+            # Unknown (e.g. Windows-style) zone names are read as UTC.
+            return parsed, False
+        return parsed.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None), False
+    # Floating times carry no zone; read them as UTC like the rest of the API.
+    return parsed, False
+
+
+def _parse_duration(value: str) -> timedelta:
+    match = _DURATION.match(value.strip().upper())
+    if match is None or value.strip().upper() in ("P", "PT"):
+        raise ValueError(f"Invalid DURATION: {value}")
+    parts = {key: int(amount) for key, amount in match.groupdict().items() if key != "sign" and amount}
+    duration = timedelta(**parts)
+    return -duration if match.group("sign") == "-" else duration
+
+
+def _first(props: Dict[str, List[Property]], name: str) -> Optional[Property]:
+    values = props.get(name)
+    return values[0] if values else None
+
+
+def event_fields(props: Dict[str, List[Property]]) -> Dict[str, Any]:
+    """Map one VEVENT's properties onto ``schedule_events`` fields.
+
+    Raises ``ValueError`` for events that cannot be stored. Recurring events
+    keep their ``rrule`` and turn EXDATEs into cancelled ``exceptions``;
+    overrides carry ``recurrence_id`` for the caller to attach to their series.
+    """
+
+    start_prop = _first(props, "DTSTART")
+    if start_prop is None:
+        raise ValueError("VEVENT has no DTSTART")
+    start, all_day = _parse_datetime(start_prop.value, start_prop.params)
+
+    end_prop = _first(props, "DTEND")
+    duration_prop = _first(props, "DURATION")
+    if end_prop is not None:
+        end, _ = _parse_datetime(end_prop.value, end_prop.params)
+    elif duration_prop is not None:
+        end = start + _parse_duration(duration_prop.value)
+    else:
+        end = start + timedelta(days=1) if all_day else start
+    if end < start:
+        raise ValueError("VEVENT ends before it starts")
+
+    summary_prop = _first(props, "SUMMARY")
+    title = _unescape(summary_prop.value).strip() if summary_prop else ""
+    fields: Dict[str, Any] = {
+        "title": title or "Untitled event",
+        "summary": title or "Untitled event",
+        "start_time": start,
+        "end_time": end,
+    }
+    for name, key in (("DESCRIPTION", "description"), ("LOCATION", "location")):
+        prop = _first(props, name)
+        if prop is not None and prop.value:
+            fields[key] = _unescape(prop.value)
+    uid_prop = _first(props, "UID")
+    if uid_prop is not None and uid_prop.value.strip():
+        fields["ical_uid"] = uid_prop.value.strip()
+
+    recurrence_prop = _first(props, "RECURRENCE-ID")
+    if recurrence_prop is not None:
+        fields["recurrence_id"], _ = _parse_datetime(recurrence_prop.value, recurrence_prop.params)
+        return fields
+
+    rrule_prop = _first(props, "RRULE")
+    if rrule_prop is not None:
+        parse_rrule(rrule_prop.value)
+        fields["rrule"] = rrule_prop.value.strip()
+        exceptions: Dict[str, Dict[str, Any]] = {}
+        for prop in props.get("EXDATE", []):
+            for raw in prop.value.split(","):
+                original, _ = _parse_datetime(raw, prop.params)
+                exceptions[occurrence_key(original)] = {
+                    "original_start_time": original,
+                    "cancelled": True,
+                }
+        if exceptions:
+            fields["exceptions"] = exceptions
+    return fields
+
+
+__all__ = [
+    "MAX_LINE_BYTES",
+    "MEDIA_TYPE",
+    "PRODID",
+    "Property",
+    "calendar_chunks",
+    "event_fields",
+    "read_vevents",
+    "serialize_event",
+]
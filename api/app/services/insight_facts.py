@@ -7,6 +7,9 @@ from typing import Any, Dict, List
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from .due_tasks import open_due_query
+from .local_time import DEFAULT_TIMEZONE, day_bounds, local_date, month_bounds, to_local
+
 
 def _normalize_datetime(value: datetime | None) -> datetime | None:
     if value is None:
@@ -16,22 +19,6 @@ def _normalize_datetime(value: datetime | None) -> datetime | None:
     return value
 
 
-def _start_end_for_day(moment: datetime) -> tuple[datetime, datetime]:
-    normalized = _normalize_datetime(moment) or datetime.utcnow()
-    start = normalized.replace(hour=0, minute=0, second=0, microsecond=0)
-    return start, start + timedelta(days=1)
-
-
-def _start_end_for_month(moment: datetime) -> tuple[datetime, datetime]:
-    normalized = _normalize_datetime(moment) or datetime.utcnow()
-    start = normalized.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    if start.month == 12:
-        end = start.replace(year=start.year + 1, month=1)
-    else:
-        end = start.replace(month=start.month + 1)
-    return start, end
-
-
 def _iso(dt: datetime | None) -> str | None:
     if not isinstance(dt, datetime):
         return None
@@ -45,9 +32,13 @@ async def build_daily_facts(
     db: AsyncIOMotorDatabase,
     user_id: ObjectId,
     reference: datetime,
+    tz: str = DEFAULT_TIMEZONE,
 ) -> Dict[str, Any]:
-    start, end = _start_end_for_day(reference)
-    y_start, y_end = _start_end_for_day(reference - timedelta(days=1))
+    """Facts for the calendar day in ``tz`` that contains the instant ``reference``."""
+
+    day = local_date(tz, reference)
+    start, end = day_bounds(tz, day)
+    y_start, y_end = day_bounds(tz, day - timedelta(days=1))
     now = _normalize_datetime(reference) or datetime.utcnow()
 
     tasks = db.tasks
@@ -109,13 +100,7 @@ async def build_daily_facts(
         }
     )
 
-    overdue_count = await tasks.count_documents(
-        {
-            "user_id": user_id,
-            "is_completed": False,
-            "due_date": {"$lt": start},
-        }
-    )
+    overdue_count = await tasks.count_documents(open_due_query(user_id, before=start))
 
     logs_cursor = habits.find(
         {"user_id": user_id, "date": {"$gte": start, "$lt": end}},
@@ -172,7 +157,7 @@ async def build_daily_facts(
     return {
         "period": "daily",
         "generated_at": _iso(now),
-        "day": start.date().isoformat(),
+        "day": day.isoformat(),
         "tasks": {
             "open_count": open_count,
             "completed_today": completed_today,
@@ -199,8 +184,15 @@ async def build_monthly_facts(
     db: AsyncIOMotorDatabase,
     user_id: ObjectId,
     reference: datetime,
+    tz: str = DEFAULT_TIMEZONE,
 ) -> Dict[str, Any]:
-    start, end = _start_end_for_month(reference)
+    """Facts for the calendar month in ``tz`` that contains the instant ``reference``.
+
+    Weekday and hour histograms use local wall-clock time.
+    """
+
+    day = local_date(tz, reference)
+    start, end = month_bounds(tz, day.year, day.month)
 
     tasks = db.tasks
     habits = db.habit_logs
@@ -226,7 +218,7 @@ async def build_monthly_facts(
     for doc in completed_docs:
         updated = doc.get("updated_at")
         if isinstance(updated, datetime):
-            weekday_counter[updated.weekday()] += 1
+            weekday_counter[to_local(tz, updated).weekday()] += 1
 
     open_count = await tasks.count_documents({"user_id": user_id, "is_completed": False})
 
@@ -265,12 +257,13 @@ async def build_monthly_facts(
     for doc in schedule_docs:
         start_time = doc.get("start_time")
         if isinstance(start_time, datetime):
-            schedule_weekdays[start_time.weekday()] += 1
-            schedule_hours[start_time.hour] += 1
+            local_start = to_local(tz, start_time)
+            schedule_weekdays[local_start.weekday()] += 1
+            schedule_hours[local_start.hour] += 1
 
     return {
         "period": "monthly",
-        "month": start.strftime("%Y-%m"),
+        "month": day.strftime("%Y-%m"),
         "tasks": {
             "created": created_count,
             "completed": completed_count,
@@ -0,0 +1,153 @@
+"""Dynamic interval tree for overlap queries on half-open ``[start, end)`` ranges.
+
+The tree is a treap ordered by ``(start, insertion sequence)``, so keys only
+need to be hashable, and every node also stores
+the largest ``end`` in its subtree. Inserts and removals are ``O(log n)``
+expected. An overlap query skips any subtree whose ``max_end`` is at or
+before the query start, and stops descending right once ``start`` reaches
+the query end, so it reports ``k`` matches after visiting ``O(log n + k)``
+nodes in the typical case (``O(k log n)`` worst case).
+"""
+from __future__ import annotations
+
+import itertools
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, Hashable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Interval(Generic[T]):
+    start: Any
+    end: Any
+    key: Hashable
+    value: T
+
+    def overlaps(self, start: Any, end: Any) -> bool:
+        return self.start < end and start < self.end
+
+
+class _Node:
+    __slots__ = ("interval", "order", "priority", "left", "right", "max_end")
+
+    def __init__(self, interval: Interval, sequence: int) -> None:
+        self.interval = interval
+        self.order = (interval.start, sequence)
+        self.priority = random.random()
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+        self.max_end = interval.end
+
+    def refresh(self) -> "_Node":
+        max_end = self.interval.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+        return self
+
+
+def _split(node: Optional[_Node], order: Tuple[Any, int]) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split into nodes ordered before ``order`` and nodes at or after it."""
+
+    if node is None:
+        return None, None
+    if node.order < order:
+        node.right, right = _split(node.right, order)
+        return node.refresh(), right
+    left, node.left = _split(node.left, order)
+    return left, node.refresh()
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return left.refresh()
+    right.left = _merge(left, right.left)
+    return right.refresh()
+
+
+def _remove(node: Optional[_Node], order: Tuple[Any, int]) -> Optional[_Node]:
+    if node is None:
+        return None
+    if order == node.order:
+        return _merge(node.left, node.right)
+    if order < node.order:
+        node.left = _remove(node.left, order)
+    else:
+        node.right = _remove(node.right, order)
+    return node.refresh()
+
+
+class IntervalTree(Generic[T]):
+    """Intervals keyed by a unique ``key``; inserting an existing key replaces it."""
+
+    def __init__(self) -> None:
+        self._root: Optional[_Node] = None
+        self._by_key: Dict[Hashable, _Node] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._by_key
+
+    def __iter__(self) -> Iterator[Interval[T]]:
+        stack: List[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.interval
+            node = node.right
+
+    def get(self, key: Hashable) -> Optional[Interval[T]]:
+        node = self._by_key.get(key)
+        return node.interval if node is not None else None
+
+    def insert(self, start: Any, end: Any, key: Hashable, value: T = None) -> Interval[T]:
+        if not start < end:
+            raise ValueError("interval end must be after its start")
+        self.remove(key)
+        interval = Interval(start, end, key, value)
+        node = _Node(interval, next(self._sequence))
+        left, right = _split(self._root, node.order)
+        self._root = _merge(_merge(left, node), right)
+        self._by_key[key] = node
+        return interval
+
+    def remove(self, key: Hashable) -> bool:
+        node = self._by_key.pop(key, None)
+        if node is None:
+            return False
+        self._root = _remove(self._root, node.order)
+        return True
+
+    def overlapping(self, start: Any, end: Any) -> List[Interval[T]]:
+        """Return intervals overlapping ``[start, end)`` ordered by start."""
+
+        found: List[Interval[T]] = []
+        self._collect(self._root, start, end, found)
+        return found
+
+    def _collect(self, node: Optional[_Node], start: Any, end: Any, found: List[Interval[T]]) -> None:
+        while node is not None and node.max_end > start:
+            self._collect(node.left, start, end, found)
+            if not node.interval.start < end:
+                return
+            if node.interval.end > start:
+                found.append(node.interval)
+            node = node.right
+
+
+__all__ = ["Interval", "IntervalTree"]
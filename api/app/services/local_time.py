@@ -0,0 +1,138 @@
+"""Local day and month boundaries for users' stored time zones.
+
+Documents keep naive UTC datetimes, so "today" for a user in
+America/Chicago is the UTC range between two local midnights. The
+boundaries are pure functions of ``(zone, date)`` and are memoised, so the
+zoneinfo arithmetic (including 23- and 25-hour DST days) runs once per zone
+and day per process; day-scoped handlers then issue one indexed range query
+over ``[start, end)``.
+
+Each user's zone lives on their ``users`` document. :data:`user_timezones`
+caches it per process for ``STALE_AFTER`` so day-scoped reads do not pay an
+extra lookup on every request. The users router refreshes the entry when the
+zone changes; other workers pick the change up when their entry expires.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as day_time, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from bson import ObjectId
+
+DEFAULT_TIMEZONE = "UTC"
+STALE_AFTER = timedelta(minutes=5)
+MAX_USERS = 4096
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def is_valid_timezone(name: str) -> bool:
+    try:
+        _zone(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def zone(name: Optional[str]) -> ZoneInfo:
+    """Return the ``ZoneInfo`` for ``name``, falling back to UTC for unknown names."""
+
+    if name and is_valid_timezone(name):
+        return _zone(name)
+    return _zone(DEFAULT_TIMEZONE)
+
+
+def _utc_instant(tz: str, local: datetime) -> datetime:
+    return local.replace(tzinfo=zone(tz)).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_local(tz: str, moment: datetime) -> datetime:
+    """Convert a (naive UTC or aware) ``moment`` to naive wall-clock time in ``tz``."""
+
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(zone(tz)).replace(tzinfo=None)
+
+
+def local_date(tz: str, moment: Optional[datetime] = None) -> date:
+    """The calendar date in ``tz`` at ``moment`` (default: now)."""
+
+    return to_local(tz, moment or datetime.utcnow()).date()
+
+
+@lru_cache(maxsize=8192)
+def day_bounds(tz: str, day: date) -> Tuple[datetime, datetime]:
+    """Naive UTC ``[start, end)`` of the local calendar ``day`` in ``tz``."""
+
+    start = _utc_instant(tz, datetime.combine(day, day_time.min))
+    end = _utc_instant(tz, datetime.combine(day + timedelta(days=1), day_time.min))
+    return start, end
+
+
+@lru_cache(maxsize=2048)
+def month_bounds(tz: str, year: int, month: int) -> Tuple[datetime, datetime]:
+    """Naive UTC ``[start, end)`` of the local calendar month in ``tz``."""
+
+    following = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return day_bounds(tz, date(year, month, 1))[0], day_bounds(tz, following)[0]
+
+
+def today_bounds(tz: str, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    return day_bounds(tz, local_date(tz, now))
+
+
+class UserTimezones:
+    """Per-process cache of each user's stored time zone."""
+
+    def __init__(self, *, stale_after: timedelta = STALE_AFTER, max_users: int = MAX_USERS) -> None:
+        self._stale_after = stale_after.total_seconds()
+        self._max_users = max_users
+        self._zones: "OrderedDict[ObjectId, Tuple[str, float]]" = OrderedDict()
+
+    async def get(self, db, user_id: ObjectId) -> str:
+        cached = self._zones.get(user_id)
+        if cached is not None and time.monotonic() - cached[1] < self._stale_after:
+            self._zones.move_to_end(user_id)
+            return cached[0]
+
+        # Older user documents may still be keyed by the id's string form.
+        doc = await db.users.find_one({"_id": {"$in": [user_id, str(user_id)]}}, {"timezone": 1})
+        tz = (doc or {}).get("timezone")
+        self.set(user_id, tz if tz and is_valid_timezone(tz) else DEFAULT_TIMEZONE)
+        return self._zones[user_id][0]
+
+    def set(self, user_id: ObjectId, tz: str) -> None:
+        self._zones[user_id] = (tz, time.monotonic())
+        self._zones.move_to_end(user_id)
+        while len(self._zones) > self._max_users:
+            self._zones.popitem(last=False)
+
+    def invalidate(self, user_id: ObjectId) -> None:
+        self._zones.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._zones.clear()
+
+
+user_timezones = UserTimezones()
+
+
+__all__ = [
+    "DEFAULT_TIMEZONE",
+    "UserTimezones",
+    "day_bounds",
+    "is_valid_timezone",
+    "local_date",
+    "month_bounds",
+    "to_local",
+    "today_bounds",
+    "user_timezones",
+    "zone",
+]
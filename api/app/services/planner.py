@@ -0,0 +1,359 @@
+"""Strategies that place planner tasks into free intervals.
+
+``first_fit`` takes tasks in request order and scans the intervals for the
+first one long enough, which is ``O(tasks x intervals)``. The other two keep
+an index over the remaining interval lengths:
+
+* ``best_fit`` takes tasks in request order and picks the shortest interval
+  that still fits, earliest first on ties. Intervals live in a treap keyed by
+  ``(length, start)``, so finding, removing and re-inserting the rest of an
+  interval are ``O(log n)`` expected and a plan is ``O(n log n)``.
+* ``edf`` (earliest deadline first) orders tasks by their stored
+  ``due_date``, then by ``priority``. Tasks without a due date go last. Each
+  task gets the earliest interval that fits, found by descending a max-tree
+  over the interval lengths in ``O(log n)``.
+
+Every strategy places a task at the start of its interval and keeps the rest
+of that interval for later tasks.
+
+:func:`chunked` places tasks whole exactly as ``first_fit`` would, using the
+``edf`` max-tree, so it never places fewer tasks. The tasks that fit no
+single interval are then split, in order, across the time that is left in
+pieces of at least ``min_chunk``, in one forward sweep. Prefix sums over the
+usable time (intervals at least ``min_chunk`` long) and a suffix maximum of
+interval lengths decide with a ``bisect`` whether a task can be completed
+before anything is taken, so a task that cannot finish overflows without
+touching the intervals. A plan is ``O((intervals + tasks) log intervals)``.
+"""
+from __future__ import annotations
+
+import math
+import random
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+STRATEGIES = ("first_fit", "best_fit", "edf")
+
+# Lower ranks are scheduled first among tasks due at the same time.
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+# Older task documents stored priority as an integer (0 low .. 2 high).
+_LEGACY_RANK = {2: 0, 1: 1, 0: 2}
+
+_SECOND = timedelta(seconds=1)
+
+
+@dataclass(frozen=True)
+class PlanItem:
+    task_id: str
+    duration: timedelta
+    due_date: Optional[datetime] = None
+    priority: object = None
+
+
+@dataclass(frozen=True)
+class Placement:
+    task_id: str
+    start: datetime
+    end: datetime
+
+
+def required_duration(duration_minutes: int, block_minutes: int) -> timedelta:
+    """Round ``duration_minutes`` up to whole blocks, at least one."""
+
+    slots = max(1, math.ceil(duration_minutes / block_minutes))
+    return timedelta(minutes=slots * block_minutes)
+
+
+def priority_rank(priority: object) -> int:
+    if isinstance(priority, int):
+        return _LEGACY_RANK.get(priority, PRIORITY_RANK["medium"])
+    return PRIORITY_RANK.get(priority, PRIORITY_RANK["medium"])  # type: ignore[arg-type]
+
+
+def deadline_order(items: Sequence[PlanItem]) -> List[PlanItem]:
+    """``items`` by due date, then priority, then request order; undated tasks last."""
+
+    return sorted(
+        items,
+        key=lambda item: (
+            item.due_date is None,
+            item.due_date or datetime.max,
+            priority_rank(item.priority),
+        ),
+    )
+
+
+def first_fit(
+    intervals: Sequence[Dict[str, datetime]], items: Sequence[PlanItem]
+) -> Tuple[List[Placement], List[str]]:
+    # Copy so we can mutate as we consume availability.
+    remaining = [interval.copy() for interval in intervals]
+    placements: List[Placement] = []
+    overflow: List[str] = []
+    for item in items:
+        for interval in remaining:
+            if interval["end"] - interval["start"] >= item.duration:
+                start_at = interval["start"]
+                placements.append(Placement(item.task_id, start_at, start_at + item.duration))
+                interval["start"] = start_at + item.duration
+                break
+        else:
+            overflow.append(item.task_id)
+    return placements, overflow
+
+
+class _FitNode:
+    __slots__ = ("entry", "priority", "left", "right")
+
+    def __init__(self, entry: Tuple[int, datetime, datetime]) -> None:
+        self.entry = entry
+        self.priority = random.random()
+        self.left: Optional[_FitNode] = None
+        self.right: Optional[_FitNode] = None
+
+
+def _split(node: Optional[_FitNode], key: tuple) -> Tuple[Optional[_FitNode], Optional[_FitNode]]:
+    """Split into entries ordered before ``key`` and entries at or after it."""
+
+    if node is None:
+        return None, None
+    if node.entry < key:
+        node.right, right = _split(node.right, key)
+        return node, right
+    left, node.left = _split(node.left, key)
+    return left, node
+
+
+def _merge(left: Optional[_FitNode], right: Optional[_FitNode]) -> Optional[_FitNode]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return left
+    right.left = _merge(left, right.left)
+    return right
+
+
+class _ShortestFit:
+    """Treap of ``(length, start, end)`` entries that pops the shortest one at least ``needed`` long."""
+
+    def __init__(self) -> None:
+        self._root: Optional[_FitNode] = None
+
+    def insert(self, entry: Tuple[int, datetime, datetime]) -> None:
+        left, right = _split(self._root, entry)
+        self._root = _merge(_merge(left, _FitNode(entry)), right)
+
+    def pop(self, needed: int) -> Optional[Tuple[int, datetime, datetime]]:
+        left, right = _split(self._root, (needed,))
+        if right is None:
+            self._root = left
+            return None
+        # Unlink the smallest entry of ``right``; its right child takes its place.
+        parent, node = None, right
+        while node.left is not None:
+            parent, node = node, node.left
+        if parent is None:
+            right = node.right
+        else:
+            parent.left = node.right
+        self._root = _merge(left, right)
+        return node.entry
+
+
+def best_fit(
+    intervals: Sequence[Dict[str, datetime]], items: Sequence[PlanItem]
+) -> Tuple[List[Placement], List[str]]:
+    fit = _ShortestFit()
+    for interval in intervals:
+        fit.insert(((interval["end"] - interval["start"]) // _SECOND, interval["start"], interval["end"]))
+    placements: List[Placement] = []
+    overflow: List[str] = []
+    for item in items:
+        needed = item.duration // _SECOND
+        entry = fit.pop(needed)
+        if entry is None:
+            overflow.append(item.task_id)
+            continue
+        length, start_at, end_at = entry
+        placements.append(Placement(item.task_id, start_at, start_at + item.duration))
+        if length > needed:
+            fit.insert((length - needed, start_at + item.duration, end_at))
+    return placements, overflow
+
+
+class _LeftmostFit:
+    """Max-tree over interval lengths that finds the leftmost one at least ``needed`` long."""
+
+    def __init__(self, lengths: Sequence[int]) -> None:
+        size = 1
+        while size < len(lengths):
+            size *= 2
+        self._size = size
+        self._tree = [0] * (2 * size)
+        self._tree[size : size + len(lengths)] = lengths
+        for node in range(size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def find(self, needed: int) -> int:
+        tree = self._tree
+        if tree[1] < needed:
+            return -1
+        node = 1
+        while node < self._size:
+            node = 2 * node if tree[2 * node] >= needed else 2 * node + 1
+        return node - self._size
+
+    def update(self, index: int, length: int) -> None:
+        tree = self._tree
+        node = index + self._size
+        tree[node] = length
+        node //= 2
+        while node:
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+
+
+def edf(
+    intervals: Sequence[Dict[str, datetime]], items: Sequence[PlanItem]
+) -> Tuple[List[Placement], List[str]]:
+    starts = [interval["start"] for interval in intervals]
+    lengths = [(interval["end"] - interval["start"]) // _SECOND for interval in intervals]
+    fit = _LeftmostFit(lengths)
+    placements: List[Placement] = []
+    overflow: List[str] = []
+    for item in deadline_order(items):
+        needed = item.duration // _SECOND
+        index = fit.find(needed)
+        if index < 0:
+            overflow.append(item.task_id)
+            continue
+        start_at = starts[index]
+        placements.append(Placement(item.task_id, start_at, start_at + item.duration))
+        starts[index] = start_at + item.duration
+        lengths[index] -= needed
+        fit.update(index, lengths[index])
+    return placements, overflow
+
+
+def chunked(
+    intervals: Sequence[Dict[str, datetime]], items: Sequence[PlanItem], min_chunk: timedelta
+) -> Tuple[List[Placement], List[str]]:
+    """Place ``items`` whole like ``first_fit``, then split the rest across ``intervals``.
+
+    Split tasks are taken in the given order, in chunks of at least
+    ``min_chunk``; no chunk, including a task's last one, is shorter. A task
+    shorter than ``min_chunk`` is only ever placed whole. Placements come
+    back whole tasks first, then the chunks of split tasks.
+    """
+
+    starts = [interval["start"] for interval in intervals]
+    ends = [interval["end"] for interval in intervals]
+    lengths = [(end - start) // _SECOND for start, end in zip(starts, ends)]
+
+    # Whole placements: the leftmost interval that fits is first_fit's choice.
+    fit = _LeftmostFit(lengths)
+    placements: List[Placement] = []
+    deferred: List[PlanItem] = []
+    for item in items:
+        needed = item.duration // _SECOND
+        index = fit.find(needed)
+        if index < 0:
+            deferred.append(item)
+            continue
+        placements.append(Placement(item.task_id, starts[index], starts[index] + item.duration))
+        starts[index] += item.duration
+        lengths[index] -= needed
+        fit.update(index, lengths[index])
+
+    smallest = min_chunk // _SECOND
+    count = len(lengths)
+    # usable[k]: time in intervals before k that can hold a chunk;
+    # longest[k]: the longest interval from k on.
+    usable = [0] * (count + 1)
+    for index, length in enumerate(lengths):
+        usable[index + 1] = usable[index] + (length if length >= smallest else 0)
+    longest = [0] * (count + 1)
+    for index in range(count - 1, -1, -1):
+        longest[index] = max(longest[index + 1], lengths[index])
+
+    overflow: List[str] = []
+    index = 0
+    for item in deferred:
+        needed = item.duration // _SECOND
+        # Time left in the current interval replaces its entry in ``usable``.
+        current = lengths[index] if index < count and lengths[index] >= smallest else 0
+        offset = usable[index + 1] - current if index < count else usable[count]
+        if needed < smallest or needed > usable[count] - offset:
+            overflow.append(item.task_id)
+            continue
+
+        # ``last`` is the first interval that cannot be taken whole without
+        # leaving less than a chunk; every usable interval before it is.
+        last = bisect_right(usable, needed - smallest + offset, index + 1) - 1
+        remaining = needed - (usable[last] - offset if last > index else 0)
+        if lengths[last] >= remaining:
+            tail = []
+        elif remaining >= 2 * smallest:
+            # Stop a whole chunk short; the next usable interval takes it (one
+            # exists, as the usable time up to ``last`` is short of ``needed``).
+            following = bisect_right(usable, usable[last + 1]) - 1
+            tail = [(following, smallest)]
+            remaining -= smallest
+        else:
+            # Less than two chunks left: it must end in one interval that fits it.
+            if longest[last + 1] < remaining:
+                overflow.append(item.task_id)
+                continue
+            following = last + 1
+            while lengths[following] < remaining:
+                following += 1
+            tail = [(following, remaining)]
+            remaining = 0
+
+        pieces = [(k, lengths[k]) for k in range(index, last) if lengths[k] >= smallest]
+        if remaining:
+            pieces.append((last, remaining))
+        for k, seconds in pieces + tail:
+            taken = timedelta(seconds=seconds)
+            placements.append(Placement(item.task_id, starts[k], starts[k] + taken))
+            starts[k] += taken
+            lengths[k] -= seconds
+        index = (pieces + tail)[-1][0]
+    return placements, overflow
+
+
+_STRATEGY_FUNCTIONS = {"first_fit": first_fit, "best_fit": best_fit, "edf": edf}
+
+
+def plan(
+    strategy: str, intervals: Sequence[Dict[str, datetime]], items: Sequence[PlanItem]
+) -> Tuple[List[Placement], List[str]]:
+    """Place ``items`` into the block-aligned free ``intervals`` with ``strategy``.
+
+    Returns the placements, in the order the strategy made them, and the
+    ids of tasks that did not fit.
+    """
+
+    try:
+        place = _STRATEGY_FUNCTIONS[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown planning strategy: {strategy}") from None
+    return place(intervals, items)
+
+
+__all__ = [
+    "PRIORITY_RANK",
+    "PlanItem",
+    "Placement",
+    "STRATEGIES",
+    "chunked",
+    "deadline_order",
+    "plan",
+    "priority_rank",
+    "required_duration",
+]
@@ -0,0 +1,407 @@
+"""Recurring schedule events: RRULE parsing and lazy occurrence expansion.
+
+A recurring event is stored once, as a master ``schedule_events`` document
+holding an ``rrule`` plus the first occurrence's ``start_time`` and
+``end_time``. Edited or cancelled occurrences are kept in the master's
+``exceptions`` map keyed by :func:`occurrence_key` of their original start,
+and ``series_end`` bounds the last occurrence so range queries can skip
+finished series. Occurrences are never stored; readers expand masters with
+generators bounded to the window they were asked for.
+
+Only the RFC 5545 subset the clients emit is supported: ``FREQ`` of DAILY,
+WEEKLY, MONTHLY or YEARLY with ``INTERVAL``, ``COUNT``, ``UNTIL``, plain
+``BYDAY`` weekdays (DAILY/WEEKLY) and ``BYMONTHDAY`` (MONTHLY). Times are
+naive UTC, so a series does not follow daylight-saving shifts.
+"""
+from __future__ import annotations
+
+import calendar
+import heapq
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+MAX_COUNT = 5000
+SERIES_OPEN_END = datetime(9999, 12, 31)
+
+# Master-only keys that never appear on an expanded occurrence.
+_SERIES_ONLY = ("exceptions", "series_end")
+# Occurrence fields an exception may override.
+OVERRIDABLE_FIELDS = ("title", "summary", "description", "location", "start_time", "end_time")
+
+_SUPPORTED_PARTS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "BYMONTHDAY", "WKST"}
+# Bounds the scan for rules whose periods never produce a date (e.g. the 31st
+# every twelve months starting in April).
+_MAX_EMPTY_PERIODS = 1000
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    by_weekday: Tuple[int, ...] = ()
+    by_month_day: Tuple[int, ...] = ()
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _positive_int(value: str, part: str) -> int:
+    try:
+        number = int(value)
+    except ValueError as exc:
+        raise ValueError(f"RRULE {part} must be an integer") from exc
+    if number < 1:
+        raise ValueError(f"RRULE {part} must be positive")
+    return number
+
+
+def _parse_until(value: str) -> datetime:
+    for fmt, whole_day in (("%Y%m%dT%H%M%SZ", False), ("%Y%m%dT%H%M%S", False), ("%Y%m%d", True)):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        # A date-only UNTIL includes occurrences on that day.
+        return parsed + timedelta(days=1, microseconds=-1) if whole_day else parsed
+    raise ValueError("RRULE UNTIL must look like 20301231 or 20301231T235959Z")
+
+
+def parse_rrule(text: str) -> RecurrenceRule:
+    """Parse an ``RRULE`` value, raising ``ValueError`` for anything unsupported."""
+
+    body = text.strip()
+    if body.upper().startswith("RRULE:"):
+        body = body[len("RRULE:"):]
+
+    parts: Dict[str, str] = {}
+    for chunk in filter(None, body.split(";")):
+        name, sep, value = chunk.partition("=")
+        name = name.strip().upper()
+        if not sep or not value.strip():
+            raise ValueError(f"Malformed RRULE part: {chunk}")
+        if name in parts:
+            raise ValueError(f"Duplicate RRULE part: {name}")
+        parts[name] = value.strip().upper()
+
+    unsupported = sorted(set(parts) - _SUPPORTED_PARTS)
+    if unsupported:
+        raise ValueError(f"Unsupported RRULE part(s): {', '.join(unsupported)}")
+    if parts.get("WKST", "MO") != "MO":
+        raise ValueError("Only WKST=MO is supported")
+
+    freq = parts.get("FREQ")
+    if freq not in FREQUENCIES:
+        raise ValueError(f"RRULE FREQ must be one of {', '.join(FREQUENCIES)}")
+
+    interval = _positive_int(parts.get("INTERVAL", "1"), "INTERVAL")
+    count = _positive_int(parts["COUNT"], "COUNT") if "COUNT" in parts else None
+    if count is not None and count > MAX_COUNT:
+        raise ValueError(f"RRULE COUNT is limited to {MAX_COUNT}")
+    until = _parse_until(parts["UNTIL"]) if "UNTIL" in parts else None
+    if count is not None and until is not None:
+        raise ValueError("RRULE COUNT and UNTIL are mutually exclusive")
+
+    by_weekday: Tuple[int, ...] = ()
+    if "BYDAY" in parts:
+        if freq not in ("DAILY", "WEEKLY"):
+            raise ValueError("RRULE BYDAY is only supported with DAILY or WEEKLY")
+        days = parts["BYDAY"].split(",")
+        unknown = [day for day in days if day not in WEEKDAYS]
+        if unknown:
+            raise ValueError(f"Unsupported RRULE BYDAY value(s): {', '.join(unknown)}")
+        by_weekday = tuple(sorted({WEEKDAYS[day] for day in days}))
+
+    by_month_day: Tuple[int, ...] = ()
+    if "BYMONTHDAY" in parts:
+        if freq != "MONTHLY":
+            raise ValueError("RRULE BYMONTHDAY is only supported with MONTHLY")
+        try:
+            month_days = {int(day) for day in parts["BYMONTHDAY"].split(",")}
+        except ValueError as exc:
+            raise ValueError("RRULE BYMONTHDAY values must be integers") from exc
+        if any(not 1 <= abs(day) <= 31 for day in month_days):
+            raise ValueError("RRULE BYMONTHDAY values must be within 1..31 or -31..-1")
+        by_month_day = tuple(sorted(month_days))
+
+    return RecurrenceRule(freq, interval, count, until, by_weekday, by_month_day)
+
+
+def _periods_before(rule: RecurrenceRule, dtstart: datetime, moment: datetime) -> int:
+    """Whole periods between the one containing ``dtstart`` and the one containing ``moment``."""
+
+    if rule.freq == "DAILY":
+        elapsed = (moment.date() - dtstart.date()).days
+    elif rule.freq == "WEEKLY":
+        monday = dtstart.date() - timedelta(days=dtstart.weekday())
+        elapsed = (moment.date() - monday).days // 7
+    elif rule.freq == "MONTHLY":
+        elapsed = (moment.year - dtstart.year) * 12 + moment.month - dtstart.month
+    else:
+        elapsed = moment.year - dtstart.year
+    return max(0, elapsed // rule.interval)
+
+
+def _period_anchor(rule: RecurrenceRule, dtstart: datetime, period: int) -> datetime:
+    step = period * rule.interval
+    if rule.freq == "DAILY":
+        return dtstart + timedelta(days=step)
+    if rule.freq == "WEEKLY":
+        return dtstart - timedelta(days=dtstart.weekday()) + timedelta(weeks=step)
+    if rule.freq == "MONTHLY":
+        years, month = divmod(dtstart.month - 1 + step, 12)
+        return dtstart.replace(year=dtstart.year + years, month=month + 1, day=1)
+    return dtstart.replace(year=dtstart.year + step, month=1, day=1)
+
+
+def _candidates(rule: RecurrenceRule, dtstart: datetime, anchor: datetime) -> List[datetime]:
+    if rule.freq == "DAILY":
+        return [anchor] if not rule.by_weekday or anchor.weekday() in rule.by_weekday else []
+    if rule.freq == "WEEKLY":
+        return [anchor + timedelta(days=day) for day in rule.by_weekday or (dtstart.weekday(),)]
+    if rule.freq == "MONTHLY":
+        days_in_month = calendar.monthrange(anchor.year, anchor.month)[1]
+        days = sorted(
+            {
+                day if day > 0 else days_in_month + day + 1
+                for day in rule.by_month_day or (dtstart.day,)
+            }
+        )
+        return [anchor.replace(day=day) for day in days if 1 <= day <= days_in_month]
+    try:
+        return [anchor.replace(month=dtstart.month, day=dtstart.day)]
+    except ValueError:  # 29 February in a common year
+        return []
+
+
+def occurrences(
+    rule: RecurrenceRule,
+    dtstart: datetime,
+    *,
+    after: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+) -> Iterator[datetime]:
+    """Yield occurrence starts in ``[after, before)`` in order.
+
+    Rules without ``COUNT`` jump straight to the period containing ``after``;
+    counted rules are walked from ``dtstart`` since earlier occurrences use up
+    the count.
+    """
+
+    period = 0
+    if after is not None and rule.count is None and after > dtstart:
+        period = _periods_before(rule, dtstart, after)
+
+    emitted = 0
+    empty_periods = 0
+    while True:
+        try:
+            anchor = _period_anchor(rule, dtstart, period)
+        except (OverflowError, ValueError):  # ran past datetime.max
+            return
+        if before is not None and anchor >= before:
+            return
+        if rule.until is not None and anchor > rule.until:
+            return
+
+        produced = False
+        for candidate in _candidates(rule, dtstart, anchor):
+            if candidate < dtstart:
+                continue
+            if rule.until is not None and candidate > rule.until:
+                return
+            if before is not None and candidate >= before:
+                return
+            emitted += 1
+            if rule.count is not None and emitted > rule.count:
+                return
+            produced = True
+            if after is None or candidate >= after:
+                yield candidate
+
+        empty_periods = 0 if produced else empty_periods + 1
+        if empty_periods > _MAX_EMPTY_PERIODS:
+            return
+        period += 1
+
+
+def occurrence_key(original_start: datetime) -> str:
+    """Key of an occurrence inside a master's ``exceptions`` map."""
+
+    return _naive_utc(original_start).strftime("%Y%m%dT%H%M%S")
+
+
+def is_occurrence(master: Dict[str, Any], original_start: datetime) -> bool:
+    original_start = _naive_utc(original_start)
+    rule = parse_rrule(master["rrule"])
+    found = occurrences(
+        rule,
+        master["start_time"],
+        after=original_start,
+        before=original_start + timedelta(microseconds=1),
+    )
+    return next(found, None) == original_start
+
+
+def series_end(rule: RecurrenceRule, start: datetime, end: datetime) -> datetime:
+    """Upper bound on the end of the last occurrence of a series."""
+
+    if rule.count is not None:
+        last = start
+        for last in occurrences(rule, start):
+            pass
+        return last + (end - start)
+    if rule.until is not None:
+        return rule.until + (end - start)
+    return SERIES_OPEN_END
+
+
+def _occurrence(
+    base: Dict[str, Any],
+    original_start: datetime,
+    duration: timedelta,
+    override: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    if override is not None and override.get("cancelled"):
+        return None
+    doc = dict(base)
+    doc["start_time"] = original_start
+    doc["end_time"] = original_start + duration
+    doc["original_start_time"] = original_start
+    if override is not None:
+        doc.update({key: override[key] for key in OVERRIDABLE_FIELDS if override.get(key) is not None})
+    return doc
+
+
+def expand_series(
+    master: Dict[str, Any],
+    start: Optional[datetime],
+    end: datetime,
+    *,
+    overlapping: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """Lazily yield the occurrences of ``master`` within ``[start, end)``.
+
+    With ``overlapping`` an occurrence qualifies when any part of it falls in
+    the window; otherwise its start must. Occurrences an exception moved into
+    the window from outside the expanded range come last.
+    """
+
+    rule = parse_rrule(master["rrule"])
+    first_start = master["start_time"]
+    duration = master["end_time"] - first_start
+    exceptions: Dict[str, Dict[str, Any]] = master.get("exceptions") or {}
+    base = {key: value for key, value in master.items() if key not in _SERIES_ONLY}
+    base["recurring_event_id"] = master.get("_id")
+
+    def qualifies(doc: Dict[str, Any]) -> bool:
+        if overlapping:
+            return doc["start_time"] < end and (start is None or doc["end_time"] > start)
+        return doc["start_time"] < end and (start is None or doc["start_time"] >= start)
+
+    after = None if start is None else (start - duration if overlapping else start)
+    for original in occurrences(rule, first_start, after=after, before=end):
+        doc = _occurrence(base, original, duration, exceptions.get(occurrence_key(original)))
+        if doc is not None and qualifies(doc):
+            yield doc
+
+    for override in exceptions.values():
+        original = override.get("original_start_time")
+        if not isinstance(original, datetime) or override.get("cancelled"):
+            continue
+        if (after is None or original >= after) and original < end:
+            continue  # already handled above
+        doc = _occurrence(base, original, duration, override)
+        if doc is not None and qualifies(doc):
+            yield doc
+
+
+def expand_documents(
+    docs: Iterable[Dict[str, Any]],
+    start: Optional[datetime],
+    end: datetime,
+    *,
+    overlapping: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """Pass one-off events through and replace masters with their occurrences."""
+
+    for doc in docs:
+        if doc.get("rrule"):
+            yield from expand_series(doc, start, end, overlapping=overlapping)
+        else:
+            yield doc
+
+
+async def merge_expanded(
+    docs: AsyncIterable[Dict[str, Any]],
+    start: Optional[datetime],
+    end: datetime,
+    *,
+    overlapping: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Streaming :func:`expand_documents` for ``docs`` sorted by ``start_time``.
+
+    Pending occurrences wait in a heap holding one entry per open series and
+    are released as soon as the stream passes their start, so memory grows
+    with the number of series rather than occurrences. Occurrences an
+    exception moved before their series' next start may arrive late.
+    """
+
+    pending: List[Tuple[datetime, int, Dict[str, Any], Iterator[Dict[str, Any]]]] = []
+    sequence = itertools.count()
+
+    def push(series: Iterator[Dict[str, Any]]) -> None:
+        doc = next(series, None)
+        if doc is not None:
+            heapq.heappush(pending, (doc["start_time"], next(sequence), doc, series))
+
+    async for doc in docs:
+        if doc.get("rrule"):
+            push(expand_series(doc, start, end, overlapping=overlapping))
+            continue
+        position = doc.get("start_time") or datetime.min
+        while pending and pending[0][0] <= position:
+            _, _, occurrence, series = heapq.heappop(pending)
+            yield occurrence
+            push(series)
+        yield doc
+
+    while pending:
+        _, _, occurrence, series = heapq.heappop(pending)
+        yield occurrence
+        push(series)
+
+
+def window_filter(start: datetime, end: datetime) -> Dict[str, Any]:
+    """Match one-off events overlapping ``[start, end)`` and series that may."""
+
+    return {
+        "start_time": {"$lt": end},
+        "$or": [{"end_time": {"$gt": start}}, {"series_end": {"$gt": start}}],
+    }
+
+
+__all__ = [
+    "FREQUENCIES",
+    "MAX_COUNT",
+    "OVERRIDABLE_FIELDS",
+    "RecurrenceRule",
+    "SERIES_OPEN_END",
+    "expand_documents",
+    "expand_series",
+    "is_occurrence",
+    "merge_expanded",
+    "occurrence_key",
+    "occurrences",
+    "parse_rrule",
+    "series_end",
+    "window_filter",
+]
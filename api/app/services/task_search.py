@@ -0,0 +1,149 @@
+"""Trigram search over open-task descriptions.
+
+Each task stores the trigrams of its normalised description in
+``search_grams``. A multikey index on ``(user_id, is_completed, search_grams)``
+lets lookups touch only the open tasks that share at least one trigram with
+the query instead of scanning the user's whole backlog. The server orders
+those by how many trigrams they share before capping them at
+``MAX_CANDIDATES``, so common padded grams cannot crowd out the best match.
+The survivors are then ranked in Python with a typo-tolerant similarity
+score. Tasks written before ``search_grams`` existed get them from the
+schema migration (``python -m app.migrations tasks``).
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+
+# Upper bound on index hits scored per lookup so very common trigrams cannot
+# turn a search back into a full scan.
+MAX_CANDIDATES = 500
+MIN_SCORE = 0.35
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase ``text``, strip accents, and collapse punctuation to spaces."""
+
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    ascii_only = decomposed.encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM_RE.sub(" ", ascii_only.lower()).strip()
+
+
+def trigrams(text: str) -> List[str]:
+    """Return the sorted set of padded word trigrams for ``text``.
+
+    Words are padded with two leading and one trailing space (as pg_trgm
+    does) so short words and word boundaries still produce grams.
+    """
+
+    grams: set[str] = set()
+    for word in normalize_text(text).split():
+        padded = f"  {word} "
+        for idx in range(len(padded) - 2):
+            grams.add(padded[idx : idx + 3])
+    return sorted(grams)
+
+
+def score_match(query: str, description: str) -> float:
+    """Score how well ``description`` matches the ``query`` fragment in ``[0, 1]``.
+
+    Trigram containment (the share of the query's grams found in the
+    description) tolerates typos and missing words, Dice similarity prefers
+    descriptions that are not much longer than the query, and exact substring
+    or prefix hits get a small boost.
+    """
+
+    query_norm = normalize_text(query)
+    desc_norm = normalize_text(description)
+    if not query_norm or not desc_norm:
+        return 0.0
+
+    query_grams = set(trigrams(query_norm))
+    desc_grams = set(trigrams(desc_norm))
+    shared = len(query_grams & desc_grams)
+    if not shared:
+        return 0.0
+
+    containment = shared / len(query_grams)
+    dice = 2 * shared / (len(query_grams) + len(desc_grams))
+    score = 0.7 * containment + 0.3 * dice
+    if desc_norm.startswith(query_norm):
+        score += 0.15
+    elif query_norm in desc_norm:
+        score += 0.1
+    return round(min(score, 1.0), 4)
+
+
+def search_fields(description: str) -> Dict[str, Any]:
+    """Return the denormalised search fields to store alongside a task."""
+
+    return {"search_grams": trigrams(description)}
+
+
+async def rank_open_tasks(
+    tasks: AsyncIOMotorCollection,
+    user_id: ObjectId,
+    query: str,
+    *,
+    limit: int = 5,
+) -> List[Dict[str, Any]]:
+    """Return up to ``limit`` open tasks ranked by similarity to ``query``.
+
+    Each result is ``{"_id", "description", "created_at", "score"}``.
+    """
+
+    query_grams = trigrams(query)
+    if not query_grams:
+        return []
+
+    pipeline = [
+        {"$match": {"user_id": user_id, "is_completed": False, "search_grams": {"$in": query_grams}}},
+        {
+            "$project": {
+                "description": 1,
+                "created_at": 1,
+                "shared": {"$size": {"$setIntersection": ["$search_grams", query_grams]}},
+            }
+        },
+        {"$sort": {"shared": -1, "created_at": -1}},
+        {"$limit": MAX_CANDIDATES},
+    ]
+    candidates = [doc async for doc in tasks.aggregate(pipeline)]
+    return _rank(query, candidates, limit)
+
+
+def _rank(query: str, docs: Iterable[dict], limit: int) -> List[Dict[str, Any]]:
+    ranked: List[Dict[str, Any]] = []
+    for doc in docs:
+        score = score_match(query, doc.get("description") or "")
+        if score < MIN_SCORE:
+            continue
+        ranked.append(
+            {
+                "_id": doc["_id"],
+                "description": doc.get("description") or "",
+                "created_at": doc.get("created_at"),
+                "score": score,
+            }
+        )
+    # Highest score first; newer tasks win ties, matching the old scan order.
+    ranked.sort(key=lambda item: (item["score"], item["created_at"] or datetime.min), reverse=True)
+    return ranked[:limit]
+
+
+__all__ = [
+    "MAX_CANDIDATES",
+    "MIN_SCORE",
+    "normalize_text",
+    "rank_open_tasks",
+    "score_match",
+    "search_fields",
+    "trigrams",
+]
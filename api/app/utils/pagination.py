@@ -0,0 +1,51 @@
+"""Opaque keyset cursors for paginated list endpoints."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(sort_value: datetime, doc_id: ObjectId) -> str:
+    """Encode the ``(sort_value, _id)`` keyset position of the last item returned."""
+
+    raw = json.dumps({"v": sort_value.isoformat(), "i": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Return the ``(sort_value, _id)`` pair stored in ``cursor``."""
+
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        sort_value = datetime.fromisoformat(payload["v"])
+        doc_id = ObjectId(payload["i"])
+    except (binascii.Error, InvalidId, ValueError, KeyError, TypeError, UnicodeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+    return sort_value, doc_id
+
+
+def keyset_filter(field: str, cursor: str, direction: int = -1) -> Dict[str, Any]:
+    """Build the query clause that resumes a ``(field, _id)`` sort after ``cursor``."""
+
+    sort_value, doc_id = decode_cursor(cursor)
+    op = "$lt" if direction < 0 else "$gt"
+    return {
+        "$or": [
+            {field: {op: sort_value}},
+            {field: sort_value, "_id": {op: doc_id}},
+        ]
+    }
+
+
+__all__ = ["InvalidCursor", "decode_cursor", "encode_cursor", "keyset_filter"]
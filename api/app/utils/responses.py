@@ -0,0 +1,138 @@
+"""Response classes and helpers for handlers that bypass ``response_model`` validation."""
+from __future__ import annotations
+
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Type
+
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from ..schemas.common import dump_trusted, is_trusted
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Cursor batch size for streamed listings: large enough that a multi-year
+# calendar needs few getMore round trips, small enough that one batch of
+# typical documents stays well under a megabyte in memory.
+NDJSON_BATCH_SIZE = 1000
+# Lines are coalesced into chunks of about this size before being written;
+# the first line is always sent on its own so the first byte is not delayed.
+_NDJSON_CHUNK_BYTES = 16 * 1024
+
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class MongoJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    ObjectIds become strings and datetimes are encoded natively; the naive UTC
+    values stored in Mongo keep the same ISO format the Pydantic models emit.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_response(payload: BaseModel, status_code: int = 200) -> Response:
+    """Serialise ``payload`` as-is (by alias) into a JSON response.
+
+    Used when the handler returns a trimmed model, such as a sparse field
+    selection, that would not validate against the route's declared
+    ``response_model``.
+    """
+
+    return Response(
+        content=payload.model_dump_json(by_alias=True),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def trusted_list_response(model: Type[BaseModel], docs: List[Dict[str, Any]], **fields: Any) -> Response:
+    """Encode stamped ``docs`` as a ``ListResponse[model]`` body without building models.
+
+    Only for documents that pass ``is_trusted`` for their collection; ``fields`` fill the remaining
+    ``ListResponse`` attributes such as ``page_size`` and ``next_cursor``.
+    """
+
+    payload = {
+        "items": [dump_trusted(model, doc) for doc in docs],
+        "total": len(docs),
+        "page": None,
+        "page_size": None,
+        "next_cursor": None,
+    }
+    payload.update(fields)
+    return MongoJSONResponse(payload)
+
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    """Whether an ``Accept`` header asks for newline-delimited JSON."""
+
+    return accept is not None and NDJSON_MEDIA_TYPE in accept.lower()
+
+
+async def _ndjson_lines(
+    model: Type[BaseModel],
+    docs: AsyncIterable[Dict[str, Any]],
+    collection: str,
+    validate: Callable[[Dict[str, Any]], BaseModel],
+    trusted: bool,
+) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    first = True
+    async for doc in docs:
+        if trusted and is_trusted(collection, doc):
+            buffer += orjson.dumps(
+                dump_trusted(model, doc),
+                default=_encode_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+            )
+        else:
+            buffer += validate(doc).model_dump_json(by_alias=True).encode()
+            buffer += b"\n"
+        if first or len(buffer) >= _NDJSON_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+            first = False
+    if buffer:
+        yield bytes(buffer)
+
+
+def ndjson_response(
+    model: Type[BaseModel],
+    docs: AsyncIterable[Dict[str, Any]],
+    collection: str,
+    *,
+    validate: Optional[Callable[[Dict[str, Any]], BaseModel]] = None,
+    trusted: bool = True,
+) -> StreamingResponse:
+    """Stream ``docs`` as one JSON object per line while they are read.
+
+    Documents stamped with ``collection``'s current schema version are encoded
+    directly, like ``trusted_list_response``, unless ``trusted`` is off (e.g.
+    for sparse field selections); others go through ``validate``
+    (``model.model_validate`` by default).
+    """
+
+    return StreamingResponse(
+        _ndjson_lines(model, docs, collection, validate or model.model_validate, trusted),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Vary": "Accept"},
+    )
+
+
+__all__ = [
+    "MongoJSONResponse",
+    "NDJSON_BATCH_SIZE",
+    "NDJSON_MEDIA_TYPE",
+    "model_response",
+    "ndjson_response",
+    "trusted_list_response",
+    "wants_ndjson",
+]
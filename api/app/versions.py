@@ -0,0 +1,65 @@
+"""Per-user collection version stamps used for conditional GETs.
+
+Every write handler bumps ``collection_versions[<user_id>:<collection>]``.
+Read endpoints derive their ETag from those counters, so a poll whose data has
+not changed costs a single ``_id`` lookup instead of rebuilding the list.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, Iterable
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+def _key(user_id: ObjectId | str, collection: str) -> str:
+    return f"{user_id}:{collection}"
+
+
+async def bump_version(db: AsyncIOMotorDatabase, user_id: ObjectId | str, collection: str) -> None:
+    """Invalidate cached reads of ``collection`` for ``user_id``."""
+
+    await db.collection_versions.update_one(
+        {"_id": _key(user_id, collection)}, {"$inc": {"v": 1}}, upsert=True
+    )
+
+
+async def get_versions(
+    db: AsyncIOMotorDatabase, user_id: ObjectId | str, collections: Iterable[str]
+) -> Dict[str, int]:
+    """Return the current version of each collection (``0`` if never written)."""
+
+    names = list(collections)
+    versions = {name: 0 for name in names}
+    keys = {_key(user_id, name): name for name in names}
+    cursor = db.collection_versions.find({"_id": {"$in": list(keys)}})
+    async for doc in cursor:
+        versions[keys[doc["_id"]]] = int(doc.get("v", 0))
+    return versions
+
+
+def make_etag(versions: Dict[str, int], variant: str = "") -> str:
+    """Build a weak ETag from collection versions and a request ``variant``.
+
+    The variant carries whatever else changes the response body for the same
+    data, such as the query string or the current day for "today" views.
+    """
+
+    stamp = ",".join(f"{name}={versions[name]}" for name in sorted(versions))
+    digest = hashlib.sha1(f"{stamp}|{variant}".encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip() for value in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+    # Weak comparison: W/"x" and "x" refer to the same representation.
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return etag in candidates or bare in candidates
+
+
+__all__ = ["bump_version", "etag_matches", "get_versions", "make_etag"]
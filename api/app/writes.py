@@ -0,0 +1,61 @@
+"""Single-round-trip write helpers shared by the routers.
+
+Handlers used to write a document and then ``find_one`` it back to build the
+response, doubling Mongo latency on every mutation. These helpers return the
+stored document from the write itself instead.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument
+
+
+async def insert_and_return(collection: AsyncIOMotorCollection, doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Insert ``doc`` and return it as stored, without reading it back."""
+
+    res = await collection.insert_one(doc)
+    saved = dict(doc)
+    saved["_id"] = res.inserted_id
+    return saved
+
+
+async def update_and_return(
+    collection: AsyncIOMotorCollection,
+    selector: Mapping[str, Any],
+    update: Union[Mapping[str, Any], Sequence[Mapping[str, Any]]],
+    *,
+    projection: Optional[Mapping[str, Any]] = None,
+    array_filters: Optional[List[Mapping[str, Any]]] = None,
+    before: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """Apply ``update`` to the first match of ``selector`` and return the updated document.
+
+    ``update`` may be an operator document or an aggregation pipeline.
+    Pass ``before=True`` to get the document as it was prior to the update,
+    e.g. to return an element removed with ``$pull``. Returns ``None`` when
+    nothing matched, so callers can raise their own 404.
+    """
+
+    return await collection.find_one_and_update(
+        selector,
+        update,
+        projection=projection,
+        array_filters=array_filters,
+        return_document=ReturnDocument.BEFORE if before else ReturnDocument.AFTER,
+    )
+
+
+async def delete_and_return(
+    collection: AsyncIOMotorCollection,
+    selector: Mapping[str, Any],
+    *,
+    projection: Optional[Mapping[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Delete the first match of ``selector`` and return it (``None`` if nothing matched)."""
+
+    return await collection.find_one_and_delete(selector, projection=projection)
+
+
+__all__ = ["delete_and_return", "insert_and_return", "update_and_return"]
@@ -1,24 +1,44 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 
 if __package__:
     from .app.db import get_db
-    from .app.schemas.common import ListResponse
+    from .app.migrations import schema_state
+    from .app.schemas.common import ListResponse, select_fields, stamp_schema
     from .app.schemas.habit_log import HabitLog, HabitLogCreate
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
     from app.db import get_db
-    from app.schemas.common import ListResponse
+    from app.migrations import schema_state
+    from app.schemas.common import ListResponse, select_fields, stamp_schema
     from app.schemas.habit_log import HabitLog, HabitLogCreate
 
 if __package__:
     from .app.utils.object_ids import resolve_object_id
+    from .app.utils.responses import (
+        NDJSON_BATCH_SIZE,
+        model_response,
+        ndjson_response,
+        trusted_list_response,
+        wants_ndjson,
+    )
+    from .app.changes import record_change
+    from .app.writes import insert_and_return
 else:  # pragma: no cover
     from app.utils.object_ids import resolve_object_id
+    from app.utils.responses import (
+        NDJSON_BATCH_SIZE,
+        model_response,
+        ndjson_response,
+        trusted_list_response,
+        wants_ndjson,
+    )
+    from app.changes import record_change
+    from app.writes import insert_and_return
 
 
 router = APIRouter(prefix="/habit-logs", tags=["habit_logs"])
@@ -46,10 +66,10 @@ async def create_habit_log(payload: HabitLogCreate) -> HabitLog:
     doc = payload.model_dump(exclude_none=True)
     doc.setdefault("date", now)
     doc.update({"created_at": now, "updated_at": now})
+    stamp_schema("habit_logs", doc)
 
-    res = await logs.insert_one(doc)
-    saved = await logs.find_one({"_id": res.inserted_id})
-    assert saved is not None
+    saved = await insert_and_return(logs, doc)
+    await record_change(db, saved["user_id"], "habit_logs", "create", saved["_id"])
     return HabitLog.model_validate(saved)
 
 
@@ -58,10 +78,22 @@ async def list_habit_logs(
     user_id: str = Query(..., description="User ID"),
     habit_id: Optional[str] = Query(None, description="Filter by habit"),
     date: Optional[str] = Query(None, description="Filter by ISO date"),
-) -> ListResponse[HabitLog]:
+    fields: Optional[str] = Query(None, description="Comma-separated habit log fields to return"),
+    accept: Annotated[
+        Optional[str], Header(description="Send application/x-ndjson to stream one log per line")
+    ] = None,
+) -> ListResponse[HabitLog] | Response:
     db = get_db()
     logs = db.habit_logs
 
+    item_model = HabitLog
+    projection: Optional[dict[str, int]] = None
+    if fields:
+        try:
+            item_model, projection = select_fields(HabitLog, fields)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
     query: dict[str, object] = {"user_id": _parse_object_id(user_id, "user_id")}
     if habit_id:
         query["habit_id"] = _parse_object_id(habit_id, "habit_id")
@@ -71,11 +103,19 @@ async def list_habit_logs(
         except ValueError as exc:  # pragma: no cover - defensive guard
             raise HTTPException(status_code=400, detail="Invalid date format") from exc
 
-    cursor = logs.find(query).sort("date", -1)
-    items: list[HabitLog] = []
-    async for doc in cursor:
-        items.append(HabitLog.model_validate(doc))
-    return ListResponse[HabitLog](items=items, total=len(items))
+    cursor = logs.find(query, projection).sort("date", -1)
+    if wants_ndjson(accept):
+        return ndjson_response(
+            item_model, cursor.batch_size(NDJSON_BATCH_SIZE), "habit_logs", trusted=not fields
+        )
+
+    docs = [doc async for doc in cursor]
+    if not fields and schema_state.all_trusted("habit_logs", docs):
+        return trusted_list_response(HabitLog, docs)
+
+    items = [item_model.model_validate(doc) for doc in docs]
+    response = ListResponse[item_model](items=items, total=len(items))
+    return model_response(response) if fields else response
 
 
 alias_router.add_api_route(
@@ -1,26 +1,34 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Literal
+from typing import Literal, Optional
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel
 
 if __package__:
     from .app.db import get_db
-    from .app.schemas.common import ListResponse
+    from .app.migrations import schema_state
+    from .app.schemas.common import ListResponse, select_fields, stamp_schema
     from .app.schemas.habit import Habit, HabitCreate, HabitUpdate
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
     from app.db import get_db
-    from app.schemas.common import ListResponse
+    from app.migrations import schema_state
+    from app.schemas.common import ListResponse, select_fields, stamp_schema
     from app.schemas.habit import Habit, HabitCreate, HabitUpdate
 
 if __package__:
     from .app.utils.object_ids import resolve_object_id
+    from .app.utils.responses import model_response, trusted_list_response
     from .app.services.habit_coach import propose_adjustment
+    from .app.changes import record_change
+    from .app.writes import delete_and_return, insert_and_return, update_and_return
 else:  # pragma: no cover
     from app.utils.object_ids import resolve_object_id
+    from app.utils.responses import model_response, trusted_list_response
     from app.services.habit_coach import propose_adjustment
+    from app.changes import record_change
+    from app.writes import delete_and_return, insert_and_return, update_and_return
 
 
 router = APIRouter(prefix="/habits", tags=["habits"])
@@ -45,25 +53,39 @@ async def create_habit(payload: HabitCreate) -> Habit:
     now = datetime.utcnow()
     doc = payload.model_dump(exclude_none=True)
     doc.update({"created_at": now, "updated_at": now})
+    stamp_schema("habits", doc)
 
-    res = await habits.insert_one(doc)
-    saved = await habits.find_one({"_id": res.inserted_id})
-    assert saved is not None
+    saved = await insert_and_return(habits, doc)
+    await record_change(db, saved["user_id"], "habits", "create", saved["_id"])
     return Habit.model_validate(saved)
 
 
 @router.get("", response_model=ListResponse[Habit])
-async def list_habits(user_id: str = Query(..., description="User ID")) -> ListResponse[Habit]:
+async def list_habits(
+    user_id: str = Query(..., description="User ID"),
+    fields: Optional[str] = Query(None, description="Comma-separated habit fields to return"),
+) -> ListResponse[Habit] | Response:
     db = get_db()
     habits = db.habits
 
+    item_model = Habit
+    projection: Optional[dict[str, int]] = None
+    if fields:
+        try:
+            item_model, projection = select_fields(Habit, fields)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
     query = {"user_id": _parse_object_id(user_id, "user_id")}
-    cursor = habits.find(query).sort("created_at", -1)
+    cursor = habits.find(query, projection).sort("created_at", -1)
+
+    docs = [doc async for doc in cursor]
+    if not fields and schema_state.all_trusted("habits", docs):
+        return trusted_list_response(Habit, docs)
 
-    items: list[Habit] = []
-    async for doc in cursor:
-        items.append(Habit.model_validate(doc))
-    return ListResponse[Habit](items=items, total=len(items))
+    items = [item_model.model_validate(doc) for doc in docs]
+    response = ListResponse[item_model](items=items, total=len(items))
+    return model_response(response) if fields else response
 
 
 @router.patch("/{habit_id}", response_model=Habit)
@@ -77,13 +99,10 @@ async def update_habit(habit_id: str, payload: HabitUpdate) -> Habit:
         raise HTTPException(status_code=400, detail="No fields to update")
 
     update_data["updated_at"] = datetime.utcnow()
-    res = await habits.update_one({"_id": oid}, {"$set": update_data})
-    if res.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Habit not found")
-
-    saved = await habits.find_one({"_id": oid})
-    if not saved:
+    saved = await update_and_return(habits, {"_id": oid}, {"$set": update_data})
+    if saved is None:
         raise HTTPException(status_code=404, detail="Habit not found")
+    await record_change(db, saved["user_id"], "habits", "update", oid)
     return Habit.model_validate(saved)
 
 
@@ -100,11 +119,10 @@ async def apply_habit_coach(habit_id: str, payload: HabitCoachRequest) -> Habit:
     patch = propose_adjustment(habit_doc, payload.signal)
     patch["updated_at"] = datetime.utcnow()
 
-    await habits.update_one({"_id": oid}, {"$set": patch})
-
-    saved = await habits.find_one({"_id": oid})
-    if not saved:
+    saved = await update_and_return(habits, {"_id": oid}, {"$set": patch})
+    if saved is None:
         raise HTTPException(status_code=404, detail="Habit not found")
+    await record_change(db, saved["user_id"], "habits", "update", oid)
     return Habit.model_validate(saved)
 
 
@@ -114,6 +132,7 @@ async def delete_habit(habit_id: str) -> None:
     habits = db.habits
 
     oid = _parse_object_id(habit_id, "habit_id")
-    res = await habits.delete_one({"_id": oid})
-    if res.deleted_count == 0:
+    removed = await delete_and_return(habits, {"_id": oid}, projection={"user_id": 1})
+    if removed is None:
         raise HTTPException(status_code=404, detail="Habit not found")
+    await record_change(db, removed["user_id"], "habits", "delete", oid)
@@ -15,6 +15,7 @@ if __package__:
         generate_insight,
     )
     from .app.services.insight_facts import build_daily_facts, build_monthly_facts
+    from .app.services.local_time import day_bounds, user_timezones
     from .app.utils.broadcast import broadcast_event
     from .app.utils.object_ids import resolve_object_id
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
@@ -25,6 +26,7 @@ else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
         generate_insight,
     )
     from app.services.insight_facts import build_daily_facts, build_monthly_facts  # type: ignore
+    from app.services.local_time import day_bounds, user_timezones  # type: ignore
     from app.utils.broadcast import broadcast_event  # type: ignore
     from app.utils.object_ids import resolve_object_id  # type: ignore
 
@@ -61,16 +63,18 @@ async def daily_insight(
 ) -> Dict[str, Any]:
     db = get_db()
     user_oid = _parse_object_id(user_id, "user_id")
+    tz = await user_timezones.get(db, user_oid)
 
     if date:
         try:
-            reference = datetime.fromisoformat(date)
+            # ``date`` names a local calendar day; start from its first instant.
+            reference = day_bounds(tz, datetime.fromisoformat(date).date())[0]
         except ValueError as exc:  # pragma: no cover - defensive guard
             raise HTTPException(status_code=400, detail="Invalid date format") from exc
     else:
         reference = datetime.utcnow()
 
-    facts = await build_daily_facts(db, user_oid, reference)
+    facts = await build_daily_facts(db, user_oid, reference, tz)
     facts_hash = _hash_facts(facts)
     cache_key = facts.get("day") or reference.date().isoformat()
     cache_id = _cache_id(str(user_oid), "daily", cache_key)
@@ -121,16 +125,17 @@ async def monthly_insight(
 ) -> Dict[str, Any]:
     db = get_db()
     user_oid = _parse_object_id(user_id, "user_id")
+    tz = await user_timezones.get(db, user_oid)
 
     if month:
         try:
-            reference = datetime.fromisoformat(month + "-01")
+            reference = day_bounds(tz, datetime.fromisoformat(month + "-01").date())[0]
         except ValueError as exc:  # pragma: no cover - defensive guard
             raise HTTPException(status_code=400, detail="Invalid month format") from exc
     else:
         reference = datetime.utcnow()
 
-    facts = await build_monthly_facts(db, user_oid, reference)
+    facts = await build_monthly_facts(db, user_oid, reference, tz)
     facts_hash = _hash_facts(facts)
     cache_key = facts.get("month")
     if not isinstance(cache_key, str):
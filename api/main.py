@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, FastAPI
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
 
 if __package__:
+    from .app.conditional import ConditionalGetMiddleware
     from .app.config import API_CORS_ORIGINS
     from .app.db import close_client
     from .app.indexes import ensure_indexes
+    from .app.migrations import load_schema_state
+    from .app.utils.responses import MongoJSONResponse
     from .habit_logs import alias_router as habit_logs_alias_router
     from .habit_logs import router as habit_logs_router
     from .habits import router as habits_router
@@ -19,12 +23,16 @@ if __package__:
     from .routes.scheduler import router as scheduler_router
     from .routes.tasks_split import router as tasks_split_router
     from .summary import router as summary_router
+    from .sync import router as sync_router
     from .tasks import router as tasks_router
     from .users import router as users_router
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
+    from app.conditional import ConditionalGetMiddleware
     from app.config import API_CORS_ORIGINS
     from app.db import close_client
     from app.indexes import ensure_indexes
+    from app.migrations import load_schema_state
+    from app.utils.responses import MongoJSONResponse
     from habit_logs import alias_router as habit_logs_alias_router
     from habit_logs import router as habit_logs_router
     from habits import router as habits_router
@@ -37,6 +45,7 @@ else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
     from routes.scheduler import router as scheduler_router
     from routes.tasks_split import router as tasks_split_router
     from summary import router as summary_router
+    from sync import router as sync_router
     from tasks import router as tasks_router
     from users import router as users_router
 
@@ -48,6 +57,10 @@ def make_app() -> FastAPI:
         docs_url="/v1/docs",
         redoc_url="/v1/redoc",
         openapi_url="/v1/openapi.json",
+        # Wrapped in ``Default`` so routes with a ``response_model`` keep
+        # FastAPI's Rust ``dump_json`` path where available; everything else
+        # (plain dict handlers, older FastAPI releases) is rendered by orjson.
+        default_response_class=Default(MongoJSONResponse),
     )
 
     app.add_middleware(
@@ -56,7 +69,9 @@ def make_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag"],
     )
+    app.add_middleware(ConditionalGetMiddleware)
 
     routers = [
         users_router,
@@ -73,6 +88,7 @@ def make_app() -> FastAPI:
         ai_feedback_router,
         scheduler_router,
         tasks_split_router,
+        sync_router,
     ]
 
     # Legacy routes without versioning for compatibility
@@ -88,6 +104,7 @@ def make_app() -> FastAPI:
     @app.on_event("startup")
     async def _startup() -> None:
         await ensure_indexes()
+        await load_schema_state()
 
     @app.on_event("shutdown")
     async def _shutdown() -> None:
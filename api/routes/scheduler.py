@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import math
 from datetime import datetime, timedelta
-from typing import List, Literal
+from typing import Any, Dict, List, Literal, Optional
+
+from bson import ObjectId
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
@@ -14,13 +15,20 @@ except ImportError:  # pragma: no cover
 
 if __package__:
     from ..app.db import get_db
-    from ..app.services.freebusy import get_free_intervals
+    from ..app.services.freebusy import get_free_intervals, get_group_free_intervals
+    from ..app.services.planner import PlanItem, chunked, deadline_order, plan, required_duration
+    from ..app.utils.object_ids import resolve_object_id
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
     from app.db import get_db
-    from app.services.freebusy import get_free_intervals
+    from app.services.freebusy import get_free_intervals, get_group_free_intervals
+    from app.services.planner import PlanItem, chunked, deadline_order, plan, required_duration
+    from app.utils.object_ids import resolve_object_id
 
 router = APIRouter(prefix="/scheduler", tags=["scheduler"])
 
+MAX_GROUP_SIZE = 100
+MAX_GROUP_WINDOW = timedelta(days=31)
+
 
 class PlanTask(BaseModel):
     id: str = Field(alias="_id", description="Task identifier")
@@ -42,8 +50,23 @@ class PlanIn(BaseModel):
     user_id: str = Field(..., description="User identifier or alias")
     tasks: List[PlanTask] = Field(default_factory=list)
     window: PlanWindow
-    strategy: Literal["first_fit"] = "first_fit"
+    strategy: Literal["first_fit", "best_fit", "edf"] = Field(
+        "first_fit",
+        description=(
+            "`first_fit` fills the earliest interval that fits; `best_fit` the tightest one; "
+            "`edf` places tasks by their stored due date, then priority"
+        ),
+    )
     block_minutes: int = Field(30, gt=0, le=240, description="Granularity used for scheduling suggestions")
+    min_chunk_minutes: Optional[int] = Field(
+        None,
+        gt=0,
+        le=240,
+        description="Split tasks across free intervals in chunks of at least this many minutes",
+    )
+    engine: Literal["intervals", "bitmap"] = Field(
+        "intervals", description="Free/busy engine; `bitmap` is faster for long windows at small blocks"
+    )
 
 
 class PlanBlock(BaseModel):
@@ -57,12 +80,27 @@ class PlanOut(BaseModel):
     overflow: List[str] = Field(default_factory=list)
 
 
+async def _task_deadlines(db, user_id: str, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Stored ``due_date``/``priority`` of the planned tasks, keyed by id; one ``$in`` query."""
+
+    object_ids = [ObjectId(task_id) for task_id in dict.fromkeys(task_ids) if ObjectId.is_valid(task_id)]
+    if not object_ids:
+        return {}
+    cursor = db.tasks.find(
+        {"_id": {"$in": object_ids}, "user_id": resolve_object_id(user_id, "user_id")},
+        {"due_date": 1, "priority": 1},
+    )
+    return {str(doc["_id"]): doc async for doc in cursor}
+
+
 @router.post("/plan", response_model=PlanOut)
 async def scheduler_plan(payload: PlanIn) -> PlanOut:
-    """Propose schedule blocks for the supplied tasks using a greedy first-fit algorithm."""
+    """Propose schedule blocks for the supplied tasks using the requested greedy strategy."""
 
     if payload.window.start >= payload.window.end:
         raise HTTPException(status_code=400, detail="Invalid planning window")
+    if payload.min_chunk_minutes is not None and payload.strategy == "best_fit":
+        raise HTTPException(status_code=400, detail="Chunking supports the first_fit and edf strategies")
 
     if not payload.tasks:
         return PlanOut()
@@ -75,34 +113,75 @@ async def scheduler_plan(payload: PlanIn) -> PlanOut:
         payload.window.start,
         payload.window.end,
         block_minutes=payload.block_minutes,
+        engine=payload.engine,
     )
 
     if not free_intervals:
         return PlanOut(blocks=[], overflow=[task.id for task in payload.tasks])
 
-    # Copy so we can mutate as we consume availability.
-    intervals = [interval.copy() for interval in free_intervals]
-    blocks: List[PlanBlock] = []
-    overflow: List[str] = []
-
-    block_seconds = payload.block_minutes * 60
-
-    for task in payload.tasks:
-        required_slots = math.ceil((task.duration_minutes * 60) / block_seconds)
-        required_seconds = max(block_seconds, required_slots * block_seconds)
-        required_duration = timedelta(seconds=required_seconds)
-
-        assigned = False
-        for interval in intervals:
-            available = interval["end"] - interval["start"]
-            if available >= required_duration:
-                start_at = interval["start"]
-                end_at = start_at + required_duration
-                blocks.append(PlanBlock(task_id=task.id, start_time=start_at, end_time=end_at))
-                interval["start"] = end_at
-                assigned = True
-                break
-        if not assigned:
-            overflow.append(task.id)
-
+    stored: Dict[str, Dict[str, Any]] = {}
+    if payload.strategy == "edf":
+        stored = await _task_deadlines(db, payload.user_id, [task.id for task in payload.tasks])
+    items = [
+        PlanItem(
+            task.id,
+            required_duration(task.duration_minutes, payload.block_minutes),
+            stored.get(task.id, {}).get("due_date"),
+            stored.get(task.id, {}).get("priority"),
+        )
+        for task in payload.tasks
+    ]
+
+    if payload.min_chunk_minutes is not None:
+        # Whole tasks first, then the rest split in request or deadline order.
+        ordered = deadline_order(items) if payload.strategy == "edf" else items
+        min_chunk = required_duration(payload.min_chunk_minutes, payload.block_minutes)
+        placements, overflow = chunked(free_intervals, ordered, min_chunk)
+    else:
+        placements, overflow = plan(payload.strategy, free_intervals, items)
+    blocks = [
+        PlanBlock(task_id=placement.task_id, start_time=placement.start, end_time=placement.end)
+        for placement in placements
+    ]
     return PlanOut(blocks=blocks, overflow=overflow)
+
+
+class GroupFreeBusyIn(BaseModel):
+    user_ids: List[str] = Field(
+        ..., min_length=1, max_length=MAX_GROUP_SIZE, description="User identifiers or aliases"
+    )
+    window: PlanWindow
+    block_minutes: int = Field(30, gt=0, le=240, description="Granularity of the returned slots")
+
+
+class FreeSlot(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class GroupFreeBusyOut(BaseModel):
+    free: List[FreeSlot] = Field(default_factory=list)
+
+
+@router.post("/group-freebusy", response_model=GroupFreeBusyOut)
+async def group_freebusy(payload: GroupFreeBusyIn) -> GroupFreeBusyOut:
+    """Return the block-aligned slots in ``window`` when every listed user is free."""
+
+    if payload.window.start >= payload.window.end:
+        raise HTTPException(status_code=400, detail="Invalid window")
+    if payload.window.end - payload.window.start > MAX_GROUP_WINDOW:
+        raise HTTPException(
+            status_code=400, detail=f"Window may span at most {MAX_GROUP_WINDOW.days} days"
+        )
+
+    try:
+        free = await get_group_free_intervals(
+            get_db(),
+            payload.user_ids,
+            payload.window.start,
+            payload.window.end,
+            block_minutes=payload.block_minutes,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return GroupFreeBusyOut(free=[FreeSlot(**slot) for slot in free])
@@ -1,26 +1,40 @@
-"""Routes for generating and appending subtasks to existing tasks."""
+"""Routes for generating and editing the subtasks embedded in a task.
+
+Subtask edits target single array elements with ``arrayFilters``/``$pull``
+and project only the affected element back, so the cost of an edit does not
+grow with the length of the checklist.
+"""
 from __future__ import annotations
 
 from datetime import datetime
 from typing import List, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
 if __package__:
     from ..app.db import get_db
+    from ..app.schemas.common import ListResponse
     from ..app.schemas.task import TaskSubtask
     from ..app.utils.object_ids import resolve_object_id
     from ..app.services.nlp_stub import split_into_steps
+    from ..app.changes import record_change
+    from ..app.writes import update_and_return
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
     from app.db import get_db
+    from app.schemas.common import ListResponse
     from app.schemas.task import TaskSubtask
     from app.utils.object_ids import resolve_object_id
     from app.services.nlp_stub import split_into_steps
+    from app.changes import record_change
+    from app.writes import update_and_return
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+_DEFAULT_SUBTASK_PAGE = 50
+_MAX_SUBTASK_PAGE = 500
+
 
 class SubtaskItem(BaseModel):
     description: str = Field(..., min_length=1, max_length=240)
@@ -36,6 +50,18 @@ class SubtaskItem(BaseModel):
     )
 
 
+class SubtaskUpdate(BaseModel):
+    description: Optional[str] = Field(None, min_length=1, max_length=240)
+    duration_minutes: Optional[int] = Field(None, ge=5, le=480)
+    due_at: Optional[datetime] = None
+    is_completed: Optional[bool] = None
+
+
+class SubtaskMoveIn(BaseModel):
+    subtask_id: str
+    position: int = Field(..., ge=0, description="Zero-based index the subtask should end up at")
+
+
 class SubtaskBulkIn(BaseModel):
     items: List[SubtaskItem] = Field(default_factory=list)
 
@@ -82,31 +108,129 @@ async def create_subtasks_bulk(task_id: str, payload: SubtaskBulkIn) -> SubtaskB
             }
         )
 
-    result = await tasks.update_one(
+    task_doc = await update_and_return(
+        tasks,
         {"_id": oid},
         {
             "$push": {"subtasks": {"$each": documents}},
             "$set": {"updated_at": now},
         },
+        projection={"user_id": 1},
     )
-
-    if result.matched_count == 0:
+    if task_doc is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    await record_change(db, task_doc["user_id"], "tasks", "update", oid)
+
+    # The pushed documents are exactly what was stored; no need to read the array back.
+    subtasks = [TaskSubtask.model_validate(doc) for doc in documents]
+    return SubtaskBulkOut(inserted=len(subtasks), items=subtasks)
+
 
-    inserted_ids = {doc["_id"] for doc in documents}
-    task_doc = await tasks.find_one({"_id": oid}, {"subtasks": 1})
+@router.get("/{task_id}/subtasks", response_model=ListResponse[TaskSubtask])
+async def list_subtasks(
+    task_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(_DEFAULT_SUBTASK_PAGE, ge=1, le=_MAX_SUBTASK_PAGE),
+) -> ListResponse[TaskSubtask]:
+    db = get_db()
+    oid = _parse_object_id(task_id)
+
+    # The array size comes back with the slice, so ``total`` counts every
+    # subtask without reading them all.
+    task_doc = await db.tasks.find_one(
+        {"_id": oid},
+        {
+            "_id": 1,
+            "subtasks": {"$slice": [offset, limit]},
+            "subtask_count": {"$size": {"$ifNull": ["$subtasks", []]}},
+        },
+    )
     if task_doc is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    subtasks = [
-        TaskSubtask.model_validate(doc)
-        for doc in task_doc.get("subtasks", [])
-        if doc.get("_id") in inserted_ids
-    ]
+    items = [TaskSubtask.model_validate(doc) for doc in task_doc.get("subtasks", [])]
+    # No ``page``: offsets need not be multiples of ``limit``.
+    return ListResponse[TaskSubtask](
+        items=items,
+        total=task_doc.get("subtask_count", 0),
+        page_size=limit,
+    )
 
-    subtasks.sort(key=lambda item: item.created_at)
 
-    return SubtaskBulkOut(inserted=len(subtasks), items=subtasks)
+@router.patch("/{task_id}/subtasks/{subtask_id}", response_model=TaskSubtask)
+async def update_subtask(task_id: str, subtask_id: str, payload: SubtaskUpdate) -> TaskSubtask:
+    db = get_db()
+    oid = _parse_object_id(task_id)
+    sid = _parse_object_id(subtask_id, "subtask_id")
+
+    changes = payload.model_dump(exclude_none=True, exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    if "description" in changes:
+        changes["description"] = changes["description"].strip()
+
+    now = datetime.utcnow()
+    update = {f"subtasks.$[sub].{key}": value for key, value in changes.items()}
+    update.update({"subtasks.$[sub].updated_at": now, "updated_at": now})
+
+    task_doc = await update_and_return(
+        db.tasks,
+        {"_id": oid, "subtasks._id": sid},
+        {"$set": update},
+        projection={"user_id": 1, "subtasks": {"$elemMatch": {"_id": sid}}},
+        array_filters=[{"sub._id": sid}],
+    )
+    subtask = _pick_subtask(task_doc, sid)
+    await record_change(db, task_doc["user_id"], "tasks", "update", oid)
+    return TaskSubtask.model_validate(subtask)
+
+
+@router.delete("/{task_id}/subtasks/{subtask_id}", response_model=TaskSubtask)
+async def delete_subtask(task_id: str, subtask_id: str) -> TaskSubtask:
+    db = get_db()
+    oid = _parse_object_id(task_id)
+    sid = _parse_object_id(subtask_id, "subtask_id")
+
+    task_doc = await update_and_return(
+        db.tasks,
+        {"_id": oid, "subtasks._id": sid},
+        {"$pull": {"subtasks": {"_id": sid}}, "$set": {"updated_at": datetime.utcnow()}},
+        projection={"user_id": 1, "subtasks": {"$elemMatch": {"_id": sid}}},
+        before=True,
+    )
+    subtask = _pick_subtask(task_doc, sid)
+    await record_change(db, task_doc["user_id"], "tasks", "update", oid)
+    return TaskSubtask.model_validate(subtask)
+
+
+@router.post("/{task_id}/subtasks/reorder", response_model=TaskSubtask)
+async def reorder_subtask(task_id: str, payload: SubtaskMoveIn) -> TaskSubtask:
+    """Move one subtask to ``position`` in a single pipeline update.
+
+    The array is rebuilt server-side from the other subtasks around the moved
+    one, so a concurrent edit cannot land between removing and re-inserting it.
+    """
+
+    db = get_db()
+    oid = _parse_object_id(task_id)
+    sid = _parse_object_id(payload.subtask_id, "subtask_id")
+
+    others = {"$filter": {"input": "$subtasks", "cond": {"$ne": ["$$this._id", sid]}}}
+    moved = {"$filter": {"input": "$subtasks", "cond": {"$eq": ["$$this._id", sid]}}}
+    # The three-argument $slice needs a positive count; the array holds the
+    # moved subtask, so its size is at least one.
+    head = {"$slice": [others, payload.position]} if payload.position else []
+    tail = {"$slice": [others, payload.position, {"$size": "$subtasks"}]}
+
+    task_doc = await update_and_return(
+        db.tasks,
+        {"_id": oid, "subtasks._id": sid},
+        [{"$set": {"subtasks": {"$concatArrays": [head, moved, tail]}, "updated_at": datetime.utcnow()}}],
+        projection={"user_id": 1, "subtasks": {"$elemMatch": {"_id": sid}}},
+    )
+    subtask = _pick_subtask(task_doc, sid)
+    await record_change(db, task_doc["user_id"], "tasks", "update", oid)
+    return TaskSubtask.model_validate(subtask)
 
 
 @router.post("/ai/split", response_model=SplitOut)
@@ -115,11 +239,18 @@ async def split_text(body: SplitIn) -> SplitOut:
     return SplitOut(steps=steps)
 
 
-def _parse_object_id(value: str) -> ObjectId:
+def _parse_object_id(value: str, field: str = "task_id") -> ObjectId:
     try:
-        return resolve_object_id(value, "task_id")
+        return resolve_object_id(value, field)
     except ValueError as exc:  # pragma: no cover - defensive guard
-        raise HTTPException(status_code=400, detail="Invalid task_id") from exc
+        raise HTTPException(status_code=400, detail=f"Invalid {field}") from exc
+
+
+def _pick_subtask(task_doc: Optional[dict], subtask_id: ObjectId) -> dict:
+    for doc in (task_doc or {}).get("subtasks", []):
+        if doc.get("_id") == subtask_id:
+            return doc
+    raise HTTPException(status_code=404, detail="Subtask not found")
 
 
 __all__ = ["router"]
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from pydantic import AliasChoices, BaseModel, Field
 
 try:  # Pydantic v2
@@ -14,24 +18,84 @@ except ImportError:  # pragma: no cover
 
 if __package__:
     from .app.db import get_db
-    from .app.schemas.common import ListResponse
+    from .app.migrations import schema_state
+    from .app.schemas.common import ListResponse, select_fields, stamp_schema
     from .app.schemas.schedule_event import (
+        MAX_EVENT_DURATION,
+        ScheduleConflict,
         ScheduleEvent,
+        ScheduleEventConflicts,
         ScheduleEventCreate,
+        ScheduleEventCreated,
         ScheduleEventUpdate,
+        ScheduleOccurrenceUpdate,
+    )
+    from .app.services.conflicts import conflict_index
+    from .app.services.freebusy import busy_cache
+    from .app.services.ical import MEDIA_TYPE as ICAL_MEDIA_TYPE
+    from .app.services.ical import calendar_chunks, event_fields, read_vevents
+    from .app.services.local_time import today_bounds, user_timezones
+    from .app.services.recurrence import (
+        OVERRIDABLE_FIELDS,
+        expand_documents,
+        expand_series,
+        is_occurrence,
+        merge_expanded,
+        occurrence_key,
+        parse_rrule,
+        series_end,
     )
     from .app.utils.broadcast import broadcast_event
     from .app.utils.object_ids import resolve_object_id
+    from .app.utils.responses import (
+        NDJSON_BATCH_SIZE,
+        model_response,
+        ndjson_response,
+        trusted_list_response,
+        wants_ndjson,
+    )
+    from .app.changes import record_change, record_changes
+    from .app.writes import delete_and_return, insert_and_return, update_and_return
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
     from app.db import get_db
-    from app.schemas.common import ListResponse
+    from app.migrations import schema_state
+    from app.schemas.common import ListResponse, select_fields, stamp_schema
     from app.schemas.schedule_event import (
+        MAX_EVENT_DURATION,
+        ScheduleConflict,
         ScheduleEvent,
+        ScheduleEventConflicts,
         ScheduleEventCreate,
+        ScheduleEventCreated,
         ScheduleEventUpdate,
+        ScheduleOccurrenceUpdate,
+    )
+    from app.services.conflicts import conflict_index
+    from app.services.freebusy import busy_cache
+    from app.services.ical import MEDIA_TYPE as ICAL_MEDIA_TYPE
+    from app.services.ical import calendar_chunks, event_fields, read_vevents
+    from app.services.local_time import today_bounds, user_timezones
+    from app.services.recurrence import (
+        OVERRIDABLE_FIELDS,
+        expand_documents,
+        expand_series,
+        is_occurrence,
+        merge_expanded,
+        occurrence_key,
+        parse_rrule,
+        series_end,
     )
     from app.utils.broadcast import broadcast_event
     from app.utils.object_ids import resolve_object_id
+    from app.utils.responses import (
+        NDJSON_BATCH_SIZE,
+        model_response,
+        ndjson_response,
+        trusted_list_response,
+        wants_ndjson,
+    )
+    from app.changes import record_change, record_changes
+    from app.writes import delete_and_return, insert_and_return, update_and_return
 
 
 router = APIRouter(prefix="/schedule-events", tags=["schedule"])
@@ -44,6 +108,15 @@ def _normalize_datetime(value: datetime) -> datetime:
     return value
 
 
+_TOO_LONG = f"Events cannot run longer than {MAX_EVENT_DURATION.days} days"
+
+
+def _check_duration(start_time: datetime, end_time: datetime) -> None:
+    # Free/busy bounds its index scan by MAX_EVENT_DURATION, so longer events would go unseen.
+    if end_time - start_time > MAX_EVENT_DURATION:
+        raise HTTPException(status_code=400, detail=_TOO_LONG)
+
+
 class CreateScheduleRequest(BaseModel):
     user_id: str = Field(..., description="User identifier or alias")
     summary: str = Field(..., min_length=1, description="Event summary")
@@ -54,6 +127,72 @@ class CreateScheduleRequest(BaseModel):
         None, description="ISO8601 end time (defaults to start + 1 hour)"
     )
     location: Optional[str] = Field(None, description="Event location")
+    rrule: Optional[str] = Field(
+        None, description="RFC 5545 recurrence rule, e.g. FREQ=WEEKLY;BYDAY=MO,WE"
+    )
+
+
+MAX_CONFLICT_WINDOW = timedelta(days=92)
+# How far ahead a new series is checked for conflicts.
+SERIES_CONFLICT_HORIZON = timedelta(days=28)
+# Default expansion window for listings that give no upper bound.
+RECURRENCE_HORIZON = timedelta(days=366)
+# Documents per insert_many during .ics imports; bounds import memory.
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_IMPORT_ERRORS = 50
+
+
+def _conflict_refs(intervals) -> List[ScheduleConflict]:
+    refs = []
+    for interval in intervals:
+        event_id, original_start = (
+            interval.key if isinstance(interval.key, tuple) else (interval.key, None)
+        )
+        refs.append(
+            ScheduleConflict(
+                id=event_id,
+                title=interval.value,
+                start_time=interval.start,
+                end_time=interval.end,
+                original_start_time=original_start,
+            )
+        )
+    return refs
+
+
+def _apply_recurrence(doc: dict, rrule: str) -> dict:
+    try:
+        rule = parse_rrule(rrule)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    doc["start_time"] = _normalize_datetime(doc["start_time"])
+    doc["end_time"] = _normalize_datetime(doc["end_time"])
+    doc["rrule"] = rrule.strip()
+    doc["series_end"] = series_end(rule, doc["start_time"], doc["end_time"])
+    return doc
+
+
+async def _created_with_conflicts(db, saved: dict) -> ScheduleEventCreated:
+    event = ScheduleEventCreated.from_mongo(saved)
+    busy_cache.invalidate(saved["user_id"])
+    if not saved.get("rrule"):
+        found = await conflict_index.register(db, saved["user_id"], [saved])
+        event.conflicts = _conflict_refs(found.get(saved["_id"], []))
+        return event
+
+    conflict_index.invalidate(saved["user_id"])
+    occurrences = list(
+        expand_series(saved, saved["start_time"], saved["start_time"] + SERIES_CONFLICT_HORIZON)
+    )
+    found = await conflict_index.register(db, saved["user_id"], occurrences)
+    seen = {}
+    for intervals in found.values():
+        for interval in intervals:
+            owner = interval.key[0] if isinstance(interval.key, tuple) else interval.key
+            if owner != saved["_id"]:
+                seen.setdefault(interval.key, interval)
+    event.conflicts = _conflict_refs(sorted(seen.values(), key=lambda interval: interval.start))
+    return event
 
 
 def _parse_object_id(value: str, field: str) -> ObjectId:
@@ -85,15 +224,40 @@ class ScheduleBlockIn(BaseModel):
 class BulkBlocksIn(BaseModel):
     user_id: str
     blocks: List[ScheduleBlockIn]
+    allow_overlap: bool = Field(False, description="Accept blocks that overlap each other")
 
 
 class BulkBlocksOut(BaseModel):
     inserted: int
-    items: List[ScheduleEvent]
+    items: List[ScheduleEventCreated]
+    failed: List[int] = Field(
+        default_factory=list, description="Indexes of blocks the database rejected"
+    )
+
+
+class ConflictsOut(BaseModel):
+    items: List[ScheduleEventConflicts]
+    total: int
+
+
+class ImportIssue(BaseModel):
+    line: int
+    error: str
+
 
+class ImportReport(BaseModel):
+    imported: int = 0
+    overrides: int = 0
+    skipped: int = 0
+    batches: int = 0
+    elapsed_ms: float = 0.0
+    events_per_second: float = 0.0
+    complete: bool = True
+    errors: List[ImportIssue] = Field(default_factory=list)
 
-@router.post("", response_model=ScheduleEvent, status_code=201)
-async def create_event(payload: ScheduleEventCreate) -> ScheduleEvent:
+
+@router.post("", response_model=ScheduleEventCreated, status_code=201)
+async def create_event(payload: ScheduleEventCreate) -> ScheduleEventCreated:
     db = get_db()
     events = db.schedule_events
 
@@ -102,13 +266,16 @@ async def create_event(payload: ScheduleEventCreate) -> ScheduleEvent:
     start_time = doc.get("start_time") or now
     doc["start_time"] = start_time
     doc["end_time"] = doc.get("end_time") or (start_time + timedelta(hours=1))
+    _check_duration(_normalize_datetime(doc["start_time"]), _normalize_datetime(doc["end_time"]))
     doc.setdefault("summary", doc.get("title"))
     doc.update({"created_at": now, "updated_at": now})
+    if doc.get("rrule"):
+        _apply_recurrence(doc, doc["rrule"])
+    stamp_schema("schedule_events", doc)
 
-    res = await events.insert_one(doc)
-    saved = await events.find_one({"_id": res.inserted_id})
-    assert saved is not None
-    event = ScheduleEvent.from_mongo(saved)
+    saved = await insert_and_return(events, doc)
+    await record_change(db, saved["user_id"], "schedule_events", "create", saved["_id"])
+    event = await _created_with_conflicts(db, saved)
     await broadcast_event("schedule_created", {"event_id": str(event.id)})
     return event
 
@@ -124,18 +291,23 @@ async def create_blocks_bulk(payload: BulkBlocksIn) -> BulkBlocksOut:
     now = datetime.utcnow()
     user_id = _parse_object_id(payload.user_id, "user_id")
 
+    # Validate the whole batch before writing anything, so one bad block
+    # reports every problem instead of the first.
+    errors: List[dict] = []
     documents: List[dict] = []
-    for block in payload.blocks:
+    for index, block in enumerate(payload.blocks):
         summary = block.summary.strip()
-        if not summary:
-            raise HTTPException(status_code=400, detail="Block summary is required")
-
         start_time = _normalize_datetime(block.start_time)
         end_time = _normalize_datetime(block.end_time)
+        if not summary:
+            errors.append({"index": index, "error": "Block summary is required"})
         if end_time <= start_time:
-            raise HTTPException(status_code=400, detail="Block end time must be after start time")
+            errors.append({"index": index, "error": "Block end time must be after start time"})
+        elif end_time - start_time > MAX_EVENT_DURATION:
+            errors.append({"index": index, "error": _TOO_LONG})
 
         doc = {
+            "_id": ObjectId(),
             "user_id": user_id,
             "title": summary,
             "summary": summary,
@@ -148,26 +320,46 @@ async def create_blocks_bulk(payload: BulkBlocksIn) -> BulkBlocksOut:
         }
         if block.task_id:
             doc["task_id"] = block.task_id
-        documents.append(doc)
-
-    result = await events.insert_many(documents)
-
-    inserted_ids = list(result.inserted_ids)
-    cursor = events.find({"_id": {"$in": inserted_ids}})
-    saved: List[ScheduleEvent] = []
-    async for doc in cursor:
-        saved.append(ScheduleEvent.from_mongo(doc))
-
-    saved.sort(key=lambda item: item.start_time)
-
-    for event in saved:
-        await broadcast_event("schedule_created", {"event_id": str(event.id)})
-
-    return BulkBlocksOut(inserted=len(saved), items=saved)
-
-
-@alias_router.post("", response_model=ScheduleEvent, status_code=201)
-async def create_schedule_item(payload: CreateScheduleRequest) -> ScheduleEvent:
+        documents.append(stamp_schema("schedule_events", doc))
+
+    order = sorted(range(len(documents)), key=lambda index: documents[index]["start_time"])
+    if not errors and not payload.allow_overlap:
+        latest = order[0]
+        for index in order[1:]:
+            if documents[index]["start_time"] < documents[latest]["end_time"]:
+                errors.append({"index": index, "error": f"Block overlaps block {latest}"})
+            if documents[index]["end_time"] > documents[latest]["end_time"]:
+                latest = index
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+
+    failed: set[int] = set()
+    try:
+        await events.insert_many(documents, ordered=False)
+    except BulkWriteError as exc:
+        failed = {error["index"] for error in (exc.details or {}).get("writeErrors", [])}
+
+    # Build the response from the documents we sent instead of reading them back.
+    docs = [documents[index] for index in order if index not in failed]
+    await record_changes(db, user_id, "schedule_events", [("create", doc["_id"]) for doc in docs])
+    busy_cache.invalidate(user_id)
+    found = await conflict_index.register(db, user_id, docs)
+    saved: List[ScheduleEventCreated] = []
+    for doc in docs:
+        event = ScheduleEventCreated.from_mongo(doc)
+        event.conflicts = _conflict_refs(found.get(doc["_id"], []))
+        saved.append(event)
+
+    if saved:
+        await broadcast_event(
+            "schedule_bulk_created", {"event_ids": [str(event.id) for event in saved]}
+        )
+
+    return BulkBlocksOut(inserted=len(saved), items=saved, failed=sorted(failed))
+
+
+@alias_router.post("", response_model=ScheduleEventCreated, status_code=201)
+async def create_schedule_item(payload: CreateScheduleRequest) -> ScheduleEventCreated:
     db = get_db()
     events = db.schedule_events
 
@@ -177,6 +369,7 @@ async def create_schedule_item(payload: CreateScheduleRequest) -> ScheduleEvent:
         today = now.astimezone(timezone.utc) if now.tzinfo else now
         start_time = today.replace(hour=9, minute=0, second=0, microsecond=0)
     end_time = _normalize_datetime(payload.end) if payload.end else start_time + timedelta(hours=1)
+    _check_duration(start_time, end_time)
 
     summary = payload.summary.strip()
     if not summary:
@@ -192,38 +385,265 @@ async def create_schedule_item(payload: CreateScheduleRequest) -> ScheduleEvent:
         "created_at": now,
         "updated_at": now,
     }
+    if payload.rrule:
+        _apply_recurrence(doc, payload.rrule)
+    stamp_schema("schedule_events", doc)
 
-    res = await events.insert_one(doc)
-    saved = await events.find_one({"_id": res.inserted_id})
-    assert saved is not None
-    event = ScheduleEvent.from_mongo(saved)
+    saved = await insert_and_return(events, doc)
+    await record_change(db, saved["user_id"], "schedule_events", "create", saved["_id"])
+    event = await _created_with_conflicts(db, saved)
     await broadcast_event("schedule_created", {"event_id": str(event.id)})
     return event
 
 
-@router.get("", response_model=ListResponse[ScheduleEvent])
-async def list_events(
-    user_id: str = Query(..., description="User ID"),
-    start_after: Optional[datetime] = Query(None, description="Return events starting on/after this time"),
-    start_before: Optional[datetime] = Query(None, description="Return events starting on/before this time"),
-) -> ListResponse[ScheduleEvent]:
-    db = get_db()
-    events = db.schedule_events
+def _events_query(
+    user_id: ObjectId, start_after: Optional[datetime], start_before: Optional[datetime]
+) -> dict:
+    """One-off events starting in the range, plus series with an occurrence that may."""
 
-    query: dict[str, object] = {"user_id": _parse_object_id(user_id, "user_id")}
+    one_off: dict[str, object] = {"rrule": {"$exists": False}}
+    series: dict[str, object] = {"rrule": {"$exists": True}}
     if start_after or start_before:
         range_filter: dict[str, datetime] = {}
         if start_after:
             range_filter["$gte"] = start_after
+            series["series_end"] = {"$gt": start_after}
         if start_before:
             range_filter["$lte"] = start_before
-        query["start_time"] = range_filter
+            series["start_time"] = {"$lte": start_before}
+        one_off["start_time"] = range_filter
+    return {"user_id": user_id, "$or": [one_off, series]}
 
-    cursor = events.find(query).sort("start_time", 1)
-    items: list[ScheduleEvent] = []
-    async for doc in cursor:
-        items.append(ScheduleEvent.from_mongo(doc))
-    return ListResponse[ScheduleEvent](items=items, total=len(items))
+
+@router.get("", response_model=ListResponse[ScheduleEvent])
+async def list_events(
+    user_id: str = Query(..., description="User ID"),
+    start_after: Optional[datetime] = Query(None, description="Return events starting on/after this time"),
+    start_before: Optional[datetime] = Query(
+        None,
+        description=(
+            "Return events starting on/before this time "
+            "(recurring events are expanded up to a year ahead when omitted)"
+        ),
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated event fields to return"),
+    accept: Annotated[
+        Optional[str], Header(description="Send application/x-ndjson to stream one event per line")
+    ] = None,
+) -> ListResponse[ScheduleEvent] | Response:
+    db = get_db()
+    events = db.schedule_events
+
+    item_model = ScheduleEvent
+    projection: Optional[dict[str, int]] = None
+    migrated = schema_state.is_ready("schedule_events")
+    if fields:
+        always = ("start_time", "end_time", "rrule", "exceptions")
+        if not migrated:
+            # from_mongo derives missing start/end times from these legacy keys.
+            always += ("date", "timestamp", "created_at", "updated_at")
+        try:
+            item_model, projection = select_fields(ScheduleEvent, fields, always=always)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    validate = item_model.model_validate if migrated else item_model.from_mongo
+
+    query = _events_query(_parse_object_id(user_id, "user_id"), start_after, start_before)
+
+    window_start = _normalize_datetime(start_after) if start_after else None
+    window_end = (
+        _normalize_datetime(start_before) + timedelta(microseconds=1)
+        if start_before
+        else (window_start or datetime.utcnow()) + RECURRENCE_HORIZON
+    )
+    cursor = events.find(query, projection).sort("start_time", 1)
+    if wants_ndjson(accept):
+        return ndjson_response(
+            item_model,
+            merge_expanded(
+                cursor.batch_size(NDJSON_BATCH_SIZE), window_start, window_end, overlapping=False
+            ),
+            "schedule_events",
+            validate=validate,
+            trusted=not fields,
+        )
+
+    docs = [doc async for doc in cursor]
+    if any(doc.get("rrule") for doc in docs):
+        docs = sorted(
+            expand_documents(docs, window_start, window_end, overlapping=False),
+            key=lambda doc: doc.get("start_time") or datetime.min,
+        )
+    if not fields and schema_state.all_trusted("schedule_events", docs):
+        return trusted_list_response(ScheduleEvent, docs)
+
+    items = [validate(doc) for doc in docs]
+    response = ListResponse[item_model](items=items, total=len(items))
+    return model_response(response) if fields else response
+
+
+@router.get("/conflicts", response_model=ConflictsOut)
+async def list_conflicts(
+    user_id: str = Query(..., description="User ID"),
+    start: Optional[datetime] = Query(None, description="Window start (defaults to today at 00:00 UTC)"),
+    end: Optional[datetime] = Query(None, description="Window end (defaults to start + 7 days)"),
+) -> ConflictsOut:
+    """Return every event in ``[start, end)`` that overlaps another event."""
+
+    db = get_db()
+    start_time = (
+        _normalize_datetime(start)
+        if start
+        else datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    )
+    end_time = _normalize_datetime(end) if end else start_time + timedelta(days=7)
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end_time - start_time > MAX_CONFLICT_WINDOW:
+        raise HTTPException(status_code=400, detail="Conflict window is limited to 92 days")
+
+    pairs = await conflict_index.conflicts_in(
+        db, _parse_object_id(user_id, "user_id"), start_time, end_time
+    )
+    items = [
+        ScheduleEventConflicts(event=_conflict_refs([event])[0], conflicts=_conflict_refs(others))
+        for event, others in pairs
+    ]
+    return ConflictsOut(items=items, total=len(items))
+
+
+@router.get(".ics", response_class=StreamingResponse)
+async def export_calendar(
+    user_id: str = Query(..., description="User ID"),
+    start_after: Optional[datetime] = Query(None, description="Export events starting on/after this time"),
+    start_before: Optional[datetime] = Query(None, description="Export events starting on/before this time"),
+) -> StreamingResponse:
+    """Stream the user's events as an iCalendar file; series keep their RRULE."""
+
+    db = get_db()
+    query = _events_query(_parse_object_id(user_id, "user_id"), start_after, start_before)
+    cursor = db.schedule_events.find(query).sort("start_time", 1).batch_size(NDJSON_BATCH_SIZE)
+    return StreamingResponse(
+        calendar_chunks(cursor),
+        media_type=ICAL_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="schedule.ics"'},
+    )
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_calendar(
+    request: Request,
+    user_id: str = Query(..., description="User ID"),
+) -> ImportReport:
+    """Import a raw ``text/calendar`` request body.
+
+    The body is parsed as it arrives and written in unordered batches of
+    ``IMPORT_BATCH_SIZE``, so memory stays flat apart from a UID-to-id map
+    for recurring series, which later RECURRENCE-ID overrides attach to.
+    """
+
+    db = get_db()
+    events = db.schedule_events
+    user_oid = _parse_object_id(user_id, "user_id")
+
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    report = ImportReport()
+    series: dict[str, ObjectId] = {}
+    inserts: List[dict] = []
+    insert_lines: List[int] = []
+    overrides: List[UpdateOne] = []
+    overridden: set[ObjectId] = set()
+
+    def skip(line: int, error: str) -> None:
+        report.skipped += 1
+        if len(report.errors) < MAX_REPORTED_IMPORT_ERRORS:
+            report.errors.append(ImportIssue(line=line, error=error))
+
+    async def flush() -> None:
+        if not inserts and not overrides:
+            return
+        report.batches += 1
+        if inserts:
+            failed: set[int] = set()
+            try:
+                await events.insert_many(inserts, ordered=False)
+            except BulkWriteError as exc:
+                for error in (exc.details or {}).get("writeErrors", []):
+                    failed.add(error["index"])
+                    skip(insert_lines[error["index"]], error.get("errmsg") or "Write failed")
+            applied = [doc["_id"] for index, doc in enumerate(inserts) if index not in failed]
+            report.imported += len(applied)
+            await record_changes(db, user_oid, "schedule_events", [("create", oid) for oid in applied])
+        if overrides:
+            try:
+                result = await events.bulk_write(overrides, ordered=False)
+                report.overrides += result.modified_count
+            except BulkWriteError as exc:
+                report.overrides += (exc.details or {}).get("nModified", 0)
+            await record_changes(db, user_oid, "schedule_events", [("update", oid) for oid in overridden])
+        inserts.clear()
+        insert_lines.clear()
+        overrides.clear()
+        overridden.clear()
+
+    try:
+        async for line, props in read_vevents(request.stream()):
+            try:
+                fields = event_fields(props)
+            except ValueError as exc:
+                skip(line, str(exc))
+                continue
+
+            recurrence_id = fields.pop("recurrence_id", None)
+            if recurrence_id is not None:
+                series_id = series.get(fields.get("ical_uid", ""))
+                if series_id is None:
+                    skip(line, "RECURRENCE-ID does not follow a recurring event with the same UID")
+                    continue
+                override = {key: fields[key] for key in OVERRIDABLE_FIELDS if key in fields}
+                override.update(original_start_time=recurrence_id, updated_at=now)
+                overrides.append(
+                    UpdateOne(
+                        {"_id": series_id},
+                        {
+                            "$set": {f"exceptions.{occurrence_key(recurrence_id)}": override},
+                            "$max": {"series_end": fields["end_time"]},
+                        },
+                    )
+                )
+                overridden.add(series_id)
+            elif fields["end_time"] - fields["start_time"] > MAX_EVENT_DURATION:
+                skip(line, _TOO_LONG)
+            else:
+                doc = {"_id": ObjectId(), "user_id": user_oid, **fields, "created_at": now, "updated_at": now}
+                if doc.get("rrule"):
+                    rule = parse_rrule(doc["rrule"])
+                    doc["series_end"] = series_end(rule, doc["start_time"], doc["end_time"])
+                    if doc.get("ical_uid"):
+                        series[doc["ical_uid"]] = doc["_id"]
+                inserts.append(stamp_schema("schedule_events", doc))
+                insert_lines.append(line)
+
+            if len(inserts) + len(overrides) >= IMPORT_BATCH_SIZE:
+                await flush()
+    except ValueError as exc:
+        # The stream itself is unreadable past this point; keep what was parsed.
+        report.complete = False
+        skip(0, str(exc))
+    await flush()
+
+    if report.imported or report.overrides:
+        conflict_index.invalidate(user_oid)
+        busy_cache.invalidate(user_oid)
+        await broadcast_event(
+            "schedule_imported", {"imported": report.imported, "overrides": report.overrides}
+        )
+
+    elapsed = time.perf_counter() - started
+    report.elapsed_ms = round(elapsed * 1000, 3)
+    report.events_per_second = round((report.imported + report.overrides) / elapsed, 1) if elapsed else 0.0
+    return report
 
 
 @alias_router.get("", response_model=ListResponse[ScheduleEvent])
@@ -233,18 +653,27 @@ async def list_schedule(
     db = get_db()
     events = db.schedule_events
 
-    start_of_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    end_of_day = start_of_day + timedelta(days=1)
+    user_oid = _parse_object_id(user_id, "user_id")
+    start_of_day, end_of_day = today_bounds(await user_timezones.get(db, user_oid))
 
     query: dict[str, object] = {
-        "user_id": _parse_object_id(user_id, "user_id"),
-        "start_time": {"$gte": start_of_day, "$lt": end_of_day},
+        "user_id": user_oid,
+        "$or": [
+            {"rrule": {"$exists": False}, "start_time": {"$gte": start_of_day, "$lt": end_of_day}},
+            {
+                "rrule": {"$exists": True},
+                "start_time": {"$lt": end_of_day},
+                "series_end": {"$gt": start_of_day},
+            },
+        ],
     }
 
-    cursor = events.find(query).sort("start_time", 1)
-    items: list[ScheduleEvent] = []
-    async for doc in cursor:
-        items.append(ScheduleEvent.from_mongo(doc))
+    docs = [doc async for doc in events.find(query).sort("start_time", 1)]
+    occurrences = expand_documents(docs, start_of_day, end_of_day, overlapping=False)
+    items = [
+        ScheduleEvent.from_mongo(doc)
+        for doc in sorted(occurrences, key=lambda doc: doc.get("start_time") or datetime.min)
+    ]
     return ListResponse[ScheduleEvent](items=items, total=len(items))
 
 
@@ -254,9 +683,15 @@ async def delete_event(event_id: str) -> None:
     events = db.schedule_events
 
     oid = _parse_object_id(event_id, "event_id")
-    res = await events.delete_one({"_id": oid})
-    if res.deleted_count == 0:
+    removed = await delete_and_return(events, {"_id": oid}, projection={"user_id": 1, "rrule": 1})
+    if removed is None:
         raise HTTPException(status_code=404, detail="Event not found")
+    await record_change(db, removed["user_id"], "schedule_events", "delete", oid)
+    busy_cache.invalidate(removed["user_id"])
+    if removed.get("rrule"):
+        conflict_index.invalidate(removed["user_id"])
+    else:
+        conflict_index.forget(removed["user_id"], oid)
 
 
 @router.patch("/{event_id}", response_model=ScheduleEvent)
@@ -274,15 +709,143 @@ async def update_event(event_id: str, payload: ScheduleEventUpdate) -> ScheduleE
     if "end_time" in update_data:
         update_data["end_time"] = _normalize_datetime(update_data["end_time"])
 
+    update: dict[str, dict] = {"$set": update_data}
+    was_series = False
+    if {"start_time", "end_time", "rrule"} & update_data.keys():
+        # Series bounds depend on the stored times and rule, so read them first.
+        current = await events.find_one(
+            {"_id": oid}, {"start_time": 1, "end_time": 1, "rrule": 1}
+        )
+        if current is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        was_series = bool(current.get("rrule"))
+        new_start = update_data.get("start_time", current.get("start_time"))
+        new_end = update_data.get("end_time", current.get("end_time"))
+        if new_start and new_end:
+            _check_duration(new_start, new_end)
+        rrule = update_data.pop("rrule", current.get("rrule"))
+        if rrule:
+            bounds = {"start_time": new_start, "end_time": new_end}
+            _apply_recurrence(bounds, rrule)
+            update_data.update(rrule=bounds["rrule"], series_end=bounds["series_end"])
+            if was_series and ("start_time" in update_data or "rrule" in payload.model_fields_set):
+                # Exceptions are keyed by original start, which the new rule moves.
+                update["$unset"] = {"exceptions": ""}
+        elif was_series:
+            update["$unset"] = {"rrule": "", "series_end": "", "exceptions": ""}
+
     update_data["updated_at"] = datetime.utcnow()
-    res = await events.update_one({"_id": oid}, {"$set": update_data})
-    if res.matched_count == 0:
+    saved = await update_and_return(events, {"_id": oid}, update)
+    if saved is None:
         raise HTTPException(status_code=404, detail="Event not found")
+    await record_change(db, saved["user_id"], "schedule_events", "update", oid)
+    busy_cache.invalidate(saved["user_id"])
+    if was_series or saved.get("rrule"):
+        conflict_index.invalidate(saved["user_id"])
+    else:
+        conflict_index.record(saved["user_id"], saved)
+    return ScheduleEvent.from_mongo(saved)
+
 
-    saved = await events.find_one({"_id": oid})
-    if not saved:
+async def _load_series(events, oid: ObjectId) -> dict:
+    master = await events.find_one(
+        {"_id": oid},
+        {"user_id": 1, "rrule": 1, "start_time": 1, "end_time": 1, "title": 1, "summary": 1},
+    )
+    if master is None:
         raise HTTPException(status_code=404, detail="Event not found")
-    return ScheduleEvent.from_mongo(saved)
+    if not master.get("rrule"):
+        raise HTTPException(status_code=400, detail="Event is not recurring")
+    return master
+
+
+@router.patch("/{event_id}/occurrences", response_model=ScheduleEvent)
+async def update_occurrence(event_id: str, payload: ScheduleOccurrenceUpdate) -> ScheduleEvent:
+    """Override one occurrence of a recurring event, identified by its original start."""
+
+    db = get_db()
+    events = db.schedule_events
+
+    oid = _parse_object_id(event_id, "event_id")
+    master = await _load_series(events, oid)
+    original_start = _normalize_datetime(payload.original_start_time)
+    if not is_occurrence(master, original_start):
+        raise HTTPException(status_code=404, detail="Occurrence not found")
+
+    changes = payload.model_dump(include=set(OVERRIDABLE_FIELDS), exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    duration = master["end_time"] - master["start_time"]
+    start_time = _normalize_datetime(changes.get("start_time", original_start))
+    end_time = _normalize_datetime(changes.get("end_time", start_time + duration))
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="Occurrence end time must be after start time")
+
+    now = datetime.utcnow()
+    override = {
+        **changes,
+        "original_start_time": original_start,
+        "start_time": start_time,
+        "end_time": end_time,
+        "updated_at": now,
+    }
+    saved = await update_and_return(
+        events,
+        {"_id": oid},
+        {
+            "$set": {f"exceptions.{occurrence_key(original_start)}": override, "updated_at": now},
+            "$max": {"series_end": end_time},
+        },
+    )
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    await record_change(db, saved["user_id"], "schedule_events", "update", oid)
+    conflict_index.invalidate(saved["user_id"])
+    busy_cache.invalidate(saved["user_id"])
+
+    occurrence = next(
+        doc
+        for doc in expand_series(saved, start_time, end_time)
+        if doc["original_start_time"] == original_start
+    )
+    return ScheduleEvent.from_mongo(occurrence)
+
+
+@router.delete("/{event_id}/occurrences", status_code=204)
+async def cancel_occurrence(
+    event_id: str,
+    original_start_time: datetime = Query(..., description="Original start of the occurrence to cancel"),
+) -> None:
+    db = get_db()
+    events = db.schedule_events
+
+    oid = _parse_object_id(event_id, "event_id")
+    master = await _load_series(events, oid)
+    original_start = _normalize_datetime(original_start_time)
+    if not is_occurrence(master, original_start):
+        raise HTTPException(status_code=404, detail="Occurrence not found")
+
+    now = datetime.utcnow()
+    saved = await update_and_return(
+        events,
+        {"_id": oid},
+        {
+            "$set": {
+                f"exceptions.{occurrence_key(original_start)}": {
+                    "original_start_time": original_start,
+                    "cancelled": True,
+                    "updated_at": now,
+                },
+                "updated_at": now,
+            }
+        },
+        projection={"user_id": 1},
+    )
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    await record_change(db, saved["user_id"], "schedule_events", "update", oid)
+    conflict_index.invalidate(saved["user_id"])
+    busy_cache.invalidate(saved["user_id"])
 
 
 __all__ = ["router", "alias_router"]
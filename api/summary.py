@@ -1,13 +1,18 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
+
+from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Query
 
 if __package__:
     from .app.db import get_db
+    from .app.services.local_time import today_bounds, user_timezones
+    from .app.services.recurrence import expand_documents, window_filter
     from .app.utils.object_ids import resolve_object_id
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
     from app.db import get_db
+    from app.services.local_time import today_bounds, user_timezones
+    from app.services.recurrence import expand_documents, window_filter
     from app.utils.object_ids import resolve_object_id
 
 router = APIRouter(prefix="/summary", tags=["summary"])
@@ -32,20 +37,22 @@ async def summary(user_id: str = Query(..., description="User ID")) -> dict[str,
     async for doc in tasks_cursor:
         tasks.append(doc)
 
-    now = datetime.utcnow()
-    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    end_of_day = start_of_day + timedelta(days=1)
-
-    events_cursor = (
-        db.schedule_events.find(
-            {"user_id": user_oid, "start_time": {"$gte": start_of_day, "$lt": end_of_day}}
-        )
-        .sort("start_time", 1)
-        .limit(5)
-    )
-    events: list[dict] = []
-    async for doc in events_cursor:
-        events.append(doc)
+    start_of_day, end_of_day = today_bounds(await user_timezones.get(db, user_oid))
+
+    # Series masters may start before today, so read everything that can
+    # overlap the day and keep the one-off events and occurrences starting in it.
+    events_cursor = db.schedule_events.find(
+        {"user_id": user_oid, **window_filter(start_of_day, end_of_day)}
+    ).sort("start_time", 1)
+    docs = [doc async for doc in events_cursor]
+    events = sorted(
+        (
+            doc
+            for doc in expand_documents(docs, start_of_day, end_of_day, overlapping=False)
+            if (doc.get("start_time") or datetime.min) >= start_of_day
+        ),
+        key=lambda doc: doc.get("start_time") or datetime.min,
+    )[:5]
 
     logs_count = await db.habit_logs.count_documents(
         {"user_id": user_oid, "date": {"$gte": start_of_day, "$lt": end_of_day}}
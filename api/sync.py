@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, TypeVar
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+if __package__:
+    from .app.changes import CHANGE_RETENTION, SYNC_COLLECTIONS, collapse_changes
+    from .app.db import get_db
+    from .app.schemas.habit import Habit
+    from .app.schemas.habit_log import HabitLog
+    from .app.schemas.schedule_event import ScheduleEvent
+    from .app.schemas.task import Task
+    from .app.utils.object_ids import resolve_object_id
+else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
+    from app.changes import CHANGE_RETENTION, SYNC_COLLECTIONS, collapse_changes
+    from app.db import get_db
+    from app.schemas.habit import Habit
+    from app.schemas.habit_log import HabitLog
+    from app.schemas.schedule_event import ScheduleEvent
+    from app.schemas.task import Task
+    from app.utils.object_ids import resolve_object_id
+
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+# Change-log ids are minted by the app servers before the insert lands, so an
+# entry can commit slightly after a later id has been read. Tokens never move
+# past ``now - _SETTLE_WINDOW``, which leaves time for in-flight writes.
+_SETTLE_WINDOW = timedelta(seconds=5)
+_DEFAULT_LIMIT = 500
+_MAX_LIMIT = 5000
+
+_PROJECTIONS: Dict[str, Optional[dict]] = {"tasks": {"search_grams": 0}}
+_PARSERS: Dict[str, Callable[[dict], BaseModel]] = {
+    "tasks": Task.model_validate,
+    "habits": Habit.model_validate,
+    "habit_logs": HabitLog.model_validate,
+    "schedule_events": ScheduleEvent.from_mongo,
+}
+
+T = TypeVar("T")
+
+
+def _parse_object_id(value: str, field: str) -> ObjectId:
+    try:
+        return resolve_object_id(value, field)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid {field}") from exc
+
+
+class SyncDelta(BaseModel, Generic[T]):
+    created: List[T] = Field(default_factory=list)
+    updated: List[T] = Field(default_factory=list)
+    deleted: List[str] = Field(default_factory=list, description="Ids of removed documents (tombstones)")
+
+
+class SyncResponse(BaseModel):
+    token: str = Field(..., description="Pass back as ``since`` on the next sync")
+    has_more: bool = False
+    reset: bool = Field(False, description="True when the client must replace its local copy")
+    tasks: SyncDelta[Task] = Field(default_factory=SyncDelta[Task])
+    habits: SyncDelta[Habit] = Field(default_factory=SyncDelta[Habit])
+    habit_logs: SyncDelta[HabitLog] = Field(default_factory=SyncDelta[HabitLog])
+    schedule_events: SyncDelta[ScheduleEvent] = Field(default_factory=SyncDelta[ScheduleEvent])
+
+
+async def _snapshot(db, user_oid: ObjectId, token: ObjectId) -> SyncResponse:
+    response = SyncResponse(token=str(token), reset=True)
+    for name in SYNC_COLLECTIONS:
+        parse = _PARSERS[name]
+        delta: SyncDelta = getattr(response, name)
+        async for doc in db[name].find({"user_id": user_oid}, _PROJECTIONS.get(name)):
+            delta.created.append(parse(doc))
+    return response
+
+
+async def _fetch(db, name: str, user_oid: ObjectId, ids: Iterable[ObjectId]) -> Dict[ObjectId, dict]:
+    ids = list(ids)
+    if not ids:
+        return {}
+    found: Dict[ObjectId, dict] = {}
+    query: Dict[str, Any] = {"_id": {"$in": ids}, "user_id": user_oid}
+    async for doc in db[name].find(query, _PROJECTIONS.get(name)):
+        found[doc["_id"]] = doc
+    return found
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(
+    user_id: str = Query(..., description="User identifier or alias"),
+    since: Optional[str] = Query(None, description="Token from the previous sync; omit for a full snapshot"),
+    limit: int = Query(_DEFAULT_LIMIT, ge=1, le=_MAX_LIMIT, description="Maximum change-log entries to replay"),
+) -> SyncResponse:
+    """Return everything that changed for ``user_id`` after ``since``.
+
+    Changes are collapsed to one net op per document, and the current
+    documents are fetched with a single ``$in`` query per collection. Without
+    a token, or with one older than the change-log retention, the response is
+    a full snapshot with ``reset`` set.
+    """
+
+    db = get_db()
+    user_oid = _parse_object_id(user_id, "user_id")
+
+    now = datetime.utcnow()
+    horizon = ObjectId.from_datetime(now - _SETTLE_WINDOW)
+
+    if since is None:
+        return await _snapshot(db, user_oid, horizon)
+    try:
+        since_oid = ObjectId(since)
+    except (InvalidId, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid since token") from exc
+    if since_oid.generation_time.replace(tzinfo=None) < now - CHANGE_RETENTION:
+        return await _snapshot(db, user_oid, horizon)
+
+    upper = max(since_oid, horizon)
+    cursor = (
+        db.changes.find({"user_id": user_oid, "_id": {"$gt": since_oid, "$lt": upper}})
+        .sort("_id", 1)
+        .limit(limit + 1)
+    )
+    entries = [entry async for entry in cursor]
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    token = entries[-1]["_id"] if has_more else upper
+
+    response = SyncResponse(token=str(token), has_more=has_more)
+    for name, ops in collapse_changes(entries).items():
+        if name not in _PARSERS:
+            continue
+        parse = _PARSERS[name]
+        delta: SyncDelta = getattr(response, name)
+        live = [doc_id for doc_id, op in ops.items() if op != "delete"]
+        docs = await _fetch(db, name, user_oid, live)
+        for doc_id, op in ops.items():
+            doc = docs.get(doc_id)
+            if op == "delete" or doc is None:
+                # Missing documents were deleted after this window; a tombstone
+                # for an id the client never saw is harmless.
+                delta.deleted.append(str(doc_id))
+                continue
+            (delta.created if op == "create" else delta.updated).append(parse(doc))
+    return response
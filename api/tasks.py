@@ -1,37 +1,140 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Literal, Optional
+from typing import Annotated, List, Literal, Optional, Union
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 from pydantic import BaseModel, Field
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
 
 if __package__:
     from .app.db import get_db
-    from .app.schemas.common import ListResponse
-    from .app.schemas.task import Task, TaskCreate, TaskUpdate
+    from .app.migrations import schema_state
+    from .app.schemas.common import ListResponse, select_fields, stamp_schema
+    from .app.schemas.task import Priority, Task, TaskCreate, TaskUpdate
+    from .app.services.due_tasks import open_due_query
+    from .app.services.task_search import rank_open_tasks, search_fields
+    from .app.changes import record_change, record_changes
+    from .app.writes import delete_and_return, insert_and_return, update_and_return
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
     from app.db import get_db
-    from app.schemas.common import ListResponse
-    from app.schemas.task import Task, TaskCreate, TaskUpdate
+    from app.migrations import schema_state
+    from app.schemas.common import ListResponse, select_fields, stamp_schema
+    from app.schemas.task import Priority, Task, TaskCreate, TaskUpdate
+    from app.services.due_tasks import open_due_query
+    from app.services.task_search import rank_open_tasks, search_fields
+    from app.changes import record_change, record_changes
+    from app.writes import delete_and_return, insert_and_return, update_and_return
 
 if __package__:
     from .app.utils.broadcast import broadcast_event
     from .app.utils.object_ids import resolve_object_id
+    from .app.utils.pagination import InvalidCursor, encode_cursor, keyset_filter
+    from .app.utils.responses import (
+        NDJSON_BATCH_SIZE,
+        model_response,
+        ndjson_response,
+        trusted_list_response,
+        wants_ndjson,
+    )
 else:  # pragma: no cover
     from app.utils.broadcast import broadcast_event
     from app.utils.object_ids import resolve_object_id
+    from app.utils.pagination import InvalidCursor, encode_cursor, keyset_filter
+    from app.utils.responses import (
+        NDJSON_BATCH_SIZE,
+        model_response,
+        ndjson_response,
+        trusted_list_response,
+        wants_ndjson,
+    )
 
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+_DEFAULT_PAGE_SIZE = 100
+_MAX_BATCH_SIZE = 1000
+_BATCH_CHANGE_OPS = {
+    "create": "create",
+    "update": "update",
+    "complete": "update",
+    "delete": "delete",
+}
+_BATCH_EVENT_KEYS = {
+    "create": "created",
+    "update": "updated",
+    "complete": "completed",
+    "delete": "deleted",
+}
+
 
 class CompleteByNameRequest(BaseModel):
     user_id: str = Field(..., description="User identifier or alias")
     name: str = Field(..., min_length=1, description="Task description fragment")
 
 
+class TaskMatchCandidate(BaseModel):
+    id: str
+    description: str
+    score: float
+
+
+class CompleteByNameResponse(Task):
+    match_score: float
+    candidates: List[TaskMatchCandidate] = Field(
+        default_factory=list, description="Ranked matches, best first, including the completed task"
+    )
+
+
+class BatchCreateOp(BaseModel):
+    op: Literal["create"]
+    description: str = Field(..., min_length=1)
+    due_date: Optional[datetime] = None
+    priority: Priority = "medium"
+
+
+class BatchUpdateOp(BaseModel):
+    op: Literal["update"]
+    task_id: str
+    changes: TaskUpdate
+
+
+class BatchCompleteOp(BaseModel):
+    op: Literal["complete"]
+    task_id: str
+
+
+class BatchDeleteOp(BaseModel):
+    op: Literal["delete"]
+    task_id: str
+
+
+TaskBatchOp = Annotated[
+    Union[BatchCreateOp, BatchUpdateOp, BatchCompleteOp, BatchDeleteOp],
+    Field(discriminator="op"),
+]
+
+
+class TaskBatchRequest(BaseModel):
+    user_id: str = Field(..., description="User identifier or alias")
+    operations: List[TaskBatchOp] = Field(default_factory=list, max_length=_MAX_BATCH_SIZE)
+
+
+class TaskBatchResult(BaseModel):
+    index: int
+    op: Literal["create", "update", "complete", "delete"]
+    status: Literal["ok", "not_found", "error"]
+    task_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TaskBatchResponse(BaseModel):
+    results: List[TaskBatchResult]
+    inserted: int = 0
+    modified: int = 0
+    deleted: int = 0
 
 
 def _parse_object_id(value: str, field: str) -> ObjectId:
@@ -54,11 +157,12 @@ async def create_task(payload: TaskCreate) -> Task:
         "updated_at": now,
     })
     doc.setdefault("subtasks", [])
+    doc.update(search_fields(doc.get("description", "")))
+    stamp_schema("tasks", doc)
 
-    res = await tasks.insert_one(doc)
-    saved = await tasks.find_one({"_id": res.inserted_id})
-    assert saved is not None
-    await broadcast_event("task_created", {"task_id": str(res.inserted_id)})
+    saved = await insert_and_return(tasks, doc)
+    await record_change(db, saved["user_id"], "tasks", "create", saved["_id"])
+    await broadcast_event("task_created", {"task_id": str(saved["_id"])})
     return Task.model_validate(saved)
 
 
@@ -66,53 +170,227 @@ async def create_task(payload: TaskCreate) -> Task:
 async def list_tasks(
     user_id: str = Query(..., description="User ID"),
     is_completed: Optional[bool] = Query(None, description="Filter by completion status"),
-) -> ListResponse[Task]:
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=500,
+        description="Page size; enables cursor pagination when set (`total` is then the page length)",
+    ),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated task fields to return"),
+    accept: Annotated[
+        Optional[str], Header(description="Send application/x-ndjson to stream one task per line")
+    ] = None,
+) -> ListResponse[Task] | Response:
     db = get_db()
     query: dict[str, object] = {"user_id": _parse_object_id(user_id, "user_id")}
     if is_completed is not None:
         query["is_completed"] = is_completed
 
-    cursor = db.tasks.find(query).sort("created_at", -1)
-    items: list[Task] = []
-    async for doc in cursor:
-        items.append(Task.model_validate(doc))
-    return ListResponse[Task](items=items, total=len(items))
+    item_model = Task
+    projection: dict[str, int] = {"search_grams": 0}
+    if fields:
+        try:
+            item_model, projection = select_fields(Task, fields, always=("created_at",))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    if cursor:
+        try:
+            query.update(keyset_filter("created_at", cursor))
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+        if limit is None:
+            limit = _DEFAULT_PAGE_SIZE
+
+    # ``_id`` breaks ties between tasks created in the same millisecond so the
+    # keyset position is unique and pages never skip or repeat items.
+    find = db.tasks.find(query, projection).sort([("created_at", -1), ("_id", -1)])
+    if wants_ndjson(accept):
+        # Streamed pages carry no envelope, so there is no next_cursor to fill.
+        if limit is not None:
+            find = find.limit(limit)
+        return ndjson_response(
+            item_model, find.batch_size(NDJSON_BATCH_SIZE), "tasks", trusted=not fields
+        )
+    if limit is not None:
+        find = find.limit(limit + 1)
+
+    docs = [doc async for doc in find]
+
+    next_cursor: Optional[str] = None
+    if limit is not None and len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+
+    if not fields and schema_state.all_trusted("tasks", docs):
+        return trusted_list_response(Task, docs, page_size=limit, next_cursor=next_cursor)
+
+    items = [item_model.model_validate(doc) for doc in docs]
+    response = ListResponse[item_model](
+        items=items,
+        total=len(items),
+        page_size=limit,
+        next_cursor=next_cursor,
+    )
+    return model_response(response) if fields else response
+
+
+@router.get("/due", response_model=ListResponse[Task])
+async def list_due_tasks(
+    user_id: str = Query(..., description="User ID"),
+    after: Optional[datetime] = Query(None, description="Only tasks due at or after this time"),
+    before: Optional[datetime] = Query(None, description="Only tasks due before this time"),
+    limit: int = Query(_DEFAULT_PAGE_SIZE, ge=1, le=500),
+) -> ListResponse[Task] | Response:
+    """List open tasks with a due date in ``[after, before)``, soonest first.
 
+    ``before=<now>`` alone gives overdue tasks; ``after=<now>&before=<now+N h>``
+    gives what is due in the next N hours.
+    """
 
-@router.patch("/{task_id}", response_model=Task)
-async def update_task(task_id: str, payload: TaskUpdate) -> Task:
     db = get_db()
-    tasks = db.tasks
+    user_oid = _parse_object_id(user_id, "user_id")
+    try:
+        query = open_due_query(user_oid, after=after, before=before)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    oid = _parse_object_id(task_id, "task_id")
-    update_data = payload.model_dump(exclude_none=True, exclude_unset=True)
-    if not update_data:
-        raise HTTPException(status_code=400, detail="No fields to update")
-    update_data["updated_at"] = datetime.utcnow()
+    find = db.tasks.find(query, {"search_grams": 0}).sort("due_date", 1).limit(limit)
+    docs = [doc async for doc in find]
+    if schema_state.all_trusted("tasks", docs):
+        return trusted_list_response(Task, docs, page_size=limit)
 
-    res = await tasks.update_one({"_id": oid}, {"$set": update_data})
-    if res.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Task not found")
+    items = [Task.model_validate(doc) for doc in docs]
+    return ListResponse[Task](items=items, total=len(items), page_size=limit)
 
-    saved = await tasks.find_one({"_id": oid})
-    assert saved is not None
-    await broadcast_event("task_updated", {"task_id": str(oid)})
-    return Task.model_validate(saved)
 
+@router.post("/batch", response_model=TaskBatchResponse)
+async def batch_tasks(payload: TaskBatchRequest) -> TaskBatchResponse:
+    """Apply a mixed list of task mutations with a single unordered ``bulk_write``.
+
+    Operations are independent: a failing item does not stop the others, and
+    because the write is unordered a batch should not touch the same task
+    twice. Targets are checked with one ``$in`` lookup so missing tasks are
+    reported per item as ``not_found``.
+    """
+
+    if not payload.operations:
+        return TaskBatchResponse(results=[])
 
-@router.delete("/{task_id}", status_code=204)
-async def delete_task(task_id: str) -> None:
     db = get_db()
     tasks = db.tasks
 
-    oid = _parse_object_id(task_id, "task_id")
-    res = await tasks.delete_one({"_id": oid})
-    if res.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Task not found")
-
+    user_oid = _parse_object_id(payload.user_id, "user_id")
+    now = datetime.utcnow()
 
-@router.patch("/complete-by-name", response_model=Task)
-async def complete_by_name(payload: CompleteByNameRequest) -> Task:
+    results: List[TaskBatchResult] = []
+    targets: dict[int, ObjectId] = {}
+    for index, item in enumerate(payload.operations):
+        result = TaskBatchResult(index=index, op=item.op, status="ok")
+        results.append(result)
+        if isinstance(item, BatchCreateOp):
+            continue
+        result.task_id = item.task_id
+        try:
+            targets[index] = resolve_object_id(item.task_id, "task_id")
+        except ValueError:
+            result.status = "error"
+            result.error = "Invalid task_id"
+
+    existing: set[ObjectId] = set()
+    if targets:
+        cursor = tasks.find(
+            {"_id": {"$in": list(set(targets.values()))}, "user_id": user_oid}, {"_id": 1}
+        )
+        async for doc in cursor:
+            existing.add(doc["_id"])
+
+    requests: list = []
+    request_index: list[int] = []
+    for index, item in enumerate(payload.operations):
+        result = results[index]
+        if result.status != "ok":
+            continue
+
+        if isinstance(item, BatchCreateOp):
+            doc = item.model_dump(exclude={"op"}, exclude_none=True)
+            doc.update(
+                {
+                    "_id": ObjectId(),
+                    "user_id": user_oid,
+                    "is_completed": False,
+                    "created_at": now,
+                    "updated_at": now,
+                    "subtasks": [],
+                }
+            )
+            doc.update(search_fields(doc["description"]))
+            stamp_schema("tasks", doc)
+            result.task_id = str(doc["_id"])
+            requests.append(InsertOne(doc))
+            request_index.append(index)
+            continue
+
+        oid = targets[index]
+        if oid not in existing:
+            result.status = "not_found"
+            continue
+
+        selector = {"_id": oid, "user_id": user_oid}
+        if isinstance(item, BatchUpdateOp):
+            changes = item.changes.model_dump(exclude_none=True, exclude_unset=True)
+            if not changes:
+                result.status = "error"
+                result.error = "No fields to update"
+                continue
+            changes["updated_at"] = now
+            if "description" in changes:
+                changes.update(search_fields(changes["description"]))
+            requests.append(UpdateOne(selector, {"$set": changes}))
+        elif isinstance(item, BatchCompleteOp):
+            requests.append(UpdateOne(selector, {"$set": {"is_completed": True, "updated_at": now}}))
+        else:
+            requests.append(DeleteOne(selector))
+        request_index.append(index)
+
+    inserted = modified = deleted = 0
+    if requests:
+        try:
+            outcome = await tasks.bulk_write(requests, ordered=False)
+            inserted = outcome.inserted_count
+            modified = outcome.modified_count
+            deleted = outcome.deleted_count
+        except BulkWriteError as exc:
+            details = exc.details or {}
+            inserted = details.get("nInserted", 0)
+            modified = details.get("nModified", 0)
+            deleted = details.get("nRemoved", 0)
+            for error in details.get("writeErrors", []):
+                result = results[request_index[error["index"]]]
+                result.status = "error"
+                result.error = error.get("errmsg") or "Write failed"
+
+    applied = [
+        (_BATCH_CHANGE_OPS[result.op], ObjectId(result.task_id))
+        for result in results
+        if result.status == "ok" and result.task_id
+    ]
+    await record_changes(db, user_oid, "tasks", applied)
+
+    changed: dict[str, list[str]] = {}
+    for result in results:
+        if result.status == "ok" and result.task_id:
+            changed.setdefault(_BATCH_EVENT_KEYS[result.op], []).append(result.task_id)
+    if changed:
+        await broadcast_event("tasks_batch", changed)
+
+    return TaskBatchResponse(results=results, inserted=inserted, modified=modified, deleted=deleted)
+
+
+# Registered before ``/{task_id}`` so the literal path is not captured as an id.
+@router.patch("/complete-by-name", response_model=CompleteByNameResponse)
+async def complete_by_name(payload: CompleteByNameRequest) -> CompleteByNameResponse:
     if not payload.name.strip():
         raise HTTPException(status_code=400, detail="Task name is required")
 
@@ -120,24 +398,64 @@ async def complete_by_name(payload: CompleteByNameRequest) -> Task:
     tasks = db.tasks
 
     user_oid = _parse_object_id(payload.user_id, "user_id")
-    search = payload.name.strip().lower()
-
-    cursor = tasks.find({"user_id": user_oid, "is_completed": False}).sort("created_at", -1)
-    match_id: ObjectId | None = None
-    async for doc in cursor:
-        description = (doc.get("description") or "").lower()
-        if description.startswith(search) or search in description:
-            match_id = doc["_id"]
+    ranked = await rank_open_tasks(tasks, user_oid, payload.name.strip())
+
+    for candidate in ranked:
+        saved = await update_and_return(
+            tasks,
+            {"_id": candidate["_id"], "is_completed": False},
+            {"$set": {"is_completed": True, "updated_at": datetime.utcnow()}},
+        )
+        # Another request may have completed the best match in the meantime.
+        if saved is not None:
+            match = candidate
             break
+    else:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    await record_change(db, user_oid, "tasks", "update", match["_id"])
+    await broadcast_event("task_completed", {"task_id": str(match["_id"])})
+    return CompleteByNameResponse.model_validate(
+        {
+            **saved,
+            "match_score": match["score"],
+            "candidates": [
+                {"id": str(item["_id"]), "description": item["description"], "score": item["score"]}
+                for item in ranked
+            ],
+        }
+    )
+
+
+@router.patch("/{task_id}", response_model=Task)
+async def update_task(task_id: str, payload: TaskUpdate) -> Task:
+    db = get_db()
+    tasks = db.tasks
+
+    oid = _parse_object_id(task_id, "task_id")
+    update_data = payload.model_dump(exclude_none=True, exclude_unset=True)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    update_data["updated_at"] = datetime.utcnow()
+    if "description" in update_data:
+        update_data.update(search_fields(update_data["description"]))
 
-    if match_id is None:
+    saved = await update_and_return(tasks, {"_id": oid}, {"$set": update_data})
+    if saved is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    now = datetime.utcnow()
-    await tasks.update_one({"_id": match_id}, {"$set": {"is_completed": True, "updated_at": now}})
-    saved = await tasks.find_one({"_id": match_id})
-    assert saved is not None
-    await broadcast_event("task_completed", {"task_id": str(match_id)})
+    await record_change(db, saved["user_id"], "tasks", "update", oid)
+    await broadcast_event("task_updated", {"task_id": str(oid)})
     return Task.model_validate(saved)
 
 
+@router.delete("/{task_id}", status_code=204)
+async def delete_task(task_id: str) -> None:
+    db = get_db()
+    tasks = db.tasks
+
+    oid = _parse_object_id(task_id, "task_id")
+    removed = await delete_and_return(tasks, {"_id": oid}, projection={"user_id": 1})
+    if removed is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    await record_change(db, removed["user_id"], "tasks", "delete", oid)
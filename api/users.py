@@ -4,18 +4,25 @@ from datetime import datetime
 
 from bson import ObjectId
 from fastapi import APIRouter, HTTPException
+from pymongo.errors import DuplicateKeyError
 
 if __package__:
     from .app.db import get_db
-    from .app.schemas.user import User, UserCreate
+    from .app.migrations import schema_state
+    from .app.schemas.user import User, UserCreate, UserUpdate
 else:  # pragma: no cover - handles ``uvicorn main:app`` when cwd==api/
     from app.db import get_db
-    from app.schemas.user import User, UserCreate
+    from app.migrations import schema_state
+    from app.schemas.user import User, UserCreate, UserUpdate
 
 if __package__:
+    from .app.services.local_time import user_timezones
     from .app.utils.object_ids import resolve_object_id
+    from .app.writes import insert_and_return, update_and_return
 else:  # pragma: no cover
+    from app.services.local_time import user_timezones
     from app.utils.object_ids import resolve_object_id
+    from app.writes import insert_and_return, update_and_return
 
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -33,17 +40,15 @@ async def create_user(payload: UserCreate) -> User:
     db = get_db()
     users = db.users
 
-    existing = await users.find_one({"email": payload.email})
-    if existing:
-        raise HTTPException(status_code=409, detail="User already exists")
-
     now = datetime.utcnow()
     doc = payload.model_dump(exclude_none=True)
     doc.update({"created_at": now})
 
-    res = await users.insert_one(doc)
-    saved = await users.find_one({"_id": res.inserted_id})
-    assert saved is not None
+    # The unique email index rejects duplicates, so no existence check is needed.
+    try:
+        saved = await insert_and_return(users, doc)
+    except DuplicateKeyError as exc:
+        raise HTTPException(status_code=409, detail="User already exists") from exc
     return User.model_validate(saved)
 
 
@@ -52,6 +57,13 @@ async def get_user(user_id: str) -> User:
     db = get_db()
     users = db.users
 
+    if schema_state.is_ready("users"):
+        # Every _id is an ObjectId once the users migration has completed.
+        user = await users.find_one({"_id": ObjectId(user_id)}) if ObjectId.is_valid(user_id) else None
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return User.model_validate(user)
+
     # 1) Try string _id (your current DB has _id stored as a string)
     user = await users.find_one({"_id": user_id})
 
@@ -62,4 +74,23 @@ async def get_user(user_id: str) -> User:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return User.model_validate(user)
\ No newline at end of file
+    return User.model_validate(user)
+
+
+@router.patch("/{user_id}", response_model=User)
+async def update_user(user_id: str, payload: UserUpdate) -> User:
+    db = get_db()
+    users = db.users
+
+    oid = _parse_object_id(user_id, "user_id")
+    update_data = payload.model_dump(exclude_none=True, exclude_unset=True)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    # Older user documents may still be keyed by the id's string form.
+    saved = await update_and_return(users, {"_id": {"$in": [oid, user_id]}}, {"$set": update_data})
+    if saved is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if "timezone" in update_data:
+        user_timezones.set(oid, update_data["timezone"])
+    return User.model_validate(saved)
@@ -0,0 +1,83 @@
+"""Compare the interval sweep and the slot bitmap over long planning windows.
+
+Run from the repository root::
+
+    python -m benchmarks.freebusy_bitmap [--days 90] [--per-day 12] [--block 5] [--repeat 5]
+
+One calendar of short, unaligned meetings is merged once, then both engines
+cut it into ``--block``-minute slots; they must return the same list. The
+bitmap uses NumPy when it is installed and a ``bytearray`` otherwise, and the
+header says which one ran. Both engines still build one dict per free slot,
+so the gap narrows as the calendar gets sparser.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+import api.app.services.freebusy as freebusy
+from api.app.services.freebusy import _aligned_free, _bitmap_free, _merge_ranges
+
+
+def make_busy(days: int, per_day: int, seed: int = 1) -> List[tuple[datetime, datetime]]:
+    rng = random.Random(seed)
+    start = datetime(2030, 1, 7)
+    busy = []
+    for day in range(days):
+        opening = start + timedelta(days=day, hours=7)
+        for _ in range(per_day):
+            begin = opening + timedelta(seconds=rng.randrange(0, 12 * 3600, 60))
+            busy.append((begin, begin + timedelta(minutes=rng.choice((10, 20, 25, 45, 50)))))
+    return _merge_ranges(sorted(busy))
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--per-day", type=int, default=12)
+    parser.add_argument("--block", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    window_start = datetime(2030, 1, 7, 0, 2, 30)
+    window_end = window_start + timedelta(days=args.days)
+    backend = "numpy" if freebusy.np is not None else "bytearray"
+    print(
+        f"{args.days}-day window, {args.block}-minute blocks, bitmap backend: {backend}, best of {args.repeat}"
+    )
+    print(f"  {'events/day':>10} {'busy':>7} {'slots':>7} {'intervals':>12} {'bitmap':>12}")
+    for per_day in sorted({0, 4, args.per_day}):
+        busy = make_busy(args.days, per_day)
+
+        def sweep() -> object:
+            return _aligned_free(busy, window_start, window_end, args.block)
+
+        def bitmap() -> object:
+            return _bitmap_free(busy, window_start, window_end, args.block)
+
+        slots = sweep()
+        if slots != bitmap():
+            raise SystemExit(f"{per_day} events/day: the engines disagree")
+        sweep_time = _best(sweep, args.repeat)
+        bitmap_time = _best(bitmap, args.repeat)
+        print(
+            f"  {per_day:>10} {len(busy):>7} {len(slots):>7}"
+            f" {sweep_time * 1000:>9.2f} ms {bitmap_time * 1000:>9.2f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
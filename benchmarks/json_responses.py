@@ -0,0 +1,72 @@
+"""Compare JSON encoders on a large ``ListResponse[Task]`` payload.
+
+Run from the repository root::
+
+    python -m benchmarks.json_responses [--count 10000] [--repeat 5]
+
+``jsonable_encoder`` is what FastAPI releases without the ``dump_json`` fast
+path (and routes without a ``response_model``) run before ``JSONResponse``;
+``MongoJSONResponse`` is the app's default response class.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from api.app.schemas.common import ListResponse
+from api.app.schemas.task import Task
+from api.app.utils.responses import MongoJSONResponse, trusted_list_response
+
+from .trusted_reads import make_documents
+
+
+def _best(fn: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    docs = make_documents(args.count)
+    payload = ListResponse[Task](items=[Task.model_validate(doc) for doc in docs], total=len(docs))
+    adapter = TypeAdapter(ListResponse[Task])
+
+    paths = {
+        "jsonable_encoder + JSONResponse": lambda: JSONResponse(jsonable_encoder(payload)).body,
+        "model_dump + MongoJSONResponse": lambda: MongoJSONResponse(
+            adapter.dump_python(payload, by_alias=True)
+        ).body,
+        "TypeAdapter.dump_json": lambda: adapter.dump_json(payload, by_alias=True),
+        "trusted_list_response (raw docs)": lambda: trusted_list_response(Task, docs).body,
+    }
+
+    reference = json.loads(adapter.dump_json(payload, by_alias=True))
+    for name, render in paths.items():
+        if json.loads(render()) != reference:
+            raise SystemExit(f"{name} produced a different payload")
+
+    print(f"ListResponse[Task] with {args.count} items, best of {args.repeat}")
+    baseline = None
+    for name, render in paths.items():
+        elapsed = _best(render, args.repeat)
+        baseline = baseline or elapsed
+        print(f"  {name:<34} {elapsed * 1000:8.1f} ms  ({baseline / elapsed:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+"""Compare the /scheduler/plan strategies on speed and plan quality.
+
+Run from the repository root::
+
+    python -m benchmarks.plan_strategies [--intervals 5000] [--tasks 2000] [--repeat 3]
+
+The free intervals are 15-minute-aligned gaps of 15 minutes to 4 hours with
+busy time between them. Each task asks for 15 minutes to 4 hours, and four
+in five carry a due date inside the horizon plus a priority. Raise
+``--tasks`` past the free hours to compare how many tasks each strategy fits. For each
+strategy the table reports its best time, how many tasks and hours it placed,
+and how many placements end after the task's due date ("late"), with their
+total lateness in hours.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from api.app.services.planner import STRATEGIES, PlanItem, plan
+
+PRIORITIES = ("high", "medium", "low")
+
+
+def make_intervals(count: int, seed: int = 1) -> List[Dict[str, datetime]]:
+    rng = random.Random(seed)
+    cursor = datetime(2030, 1, 7, 8)
+    intervals = []
+    for _ in range(count):
+        cursor += timedelta(minutes=15 * rng.randrange(1, 12))
+        end = cursor + timedelta(minutes=15 * rng.choice((1, 2, 2, 3, 4, 6, 8, 12, 16)))
+        intervals.append({"start": cursor, "end": end})
+        cursor = end
+    return intervals
+
+
+def make_tasks(count: int, horizon: timedelta, seed: int = 2) -> List[PlanItem]:
+    rng = random.Random(seed)
+    start = datetime(2030, 1, 7, 8)
+    tasks = []
+    for n in range(count):
+        due = start + horizon * rng.random() if rng.random() < 0.8 else None
+        tasks.append(
+            PlanItem(
+                f"task-{n}",
+                timedelta(minutes=15 * rng.choice((1, 2, 4, 6, 8, 16))),
+                due,
+                rng.choice(PRIORITIES),
+            )
+        )
+    return tasks
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--intervals", type=int, default=5000)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    intervals = make_intervals(args.intervals)
+    tasks = make_tasks(args.tasks, intervals[-1]["end"] - intervals[0]["start"])
+    due = {task.task_id: task.due_date for task in tasks}
+    free_hours = sum((i["end"] - i["start"]).total_seconds() for i in intervals) / 3600
+    asked_hours = sum(task.duration.total_seconds() for task in tasks) / 3600
+
+    print(
+        f"{len(intervals)} free intervals ({free_hours:.0f} h), {len(tasks)} tasks ({asked_hours:.0f} h),"
+        f" best of {args.repeat}"
+    )
+    print(f"  {'strategy':<10} {'time':>10} {'placed':>7} {'hours':>7} {'late':>6} {'late h':>8}")
+    for strategy in STRATEGIES:
+        placements, _ = plan(strategy, intervals, tasks)
+        elapsed = _best(lambda: plan(strategy, intervals, tasks), args.repeat)
+        hours = sum((p.end - p.start).total_seconds() for p in placements) / 3600
+        late = [
+            (p.end - due[p.task_id]).total_seconds() / 3600
+            for p in placements
+            if due[p.task_id] is not None and p.end > due[p.task_id]
+        ]
+        print(
+            f"  {strategy:<10} {elapsed * 1000:>7.1f} ms {len(placements):>7} {hours:>7.0f}"
+            f" {len(late):>6} {sum(late):>8.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
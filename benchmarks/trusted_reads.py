@@ -0,0 +1,90 @@
+"""Compare the validated and trusted paths that render ``GET /tasks`` bodies.
+
+Run from the repository root::
+
+    python -m benchmarks.trusted_reads [--count 10000] [--repeat 5]
+
+The validated path builds a ``Task`` per document and serialises a
+``ListResponse[Task]``; the trusted path encodes stamped documents directly
+with ``trusted_list_response``. Both must produce the same bytes.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from bson import ObjectId
+
+from api.app.schemas.common import ListResponse, stamp_schema
+from api.app.schemas.task import Task
+from api.app.utils.responses import trusted_list_response
+
+
+def make_documents(count: int) -> List[dict]:
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    docs = []
+    for n in range(count):
+        created = now - timedelta(minutes=n)
+        docs.append(
+            stamp_schema(
+                "tasks",
+                {
+                    "_id": ObjectId(),
+                    "user_id": user_id,
+                    "description": f"Task number {n}",
+                    "is_completed": n % 3 == 0,
+                    "due_date": created + timedelta(days=2),
+                    "priority": ("high", "medium", "low")[n % 3],
+                    "created_at": created,
+                    "updated_at": created,
+                    "subtasks": [
+                        {"_id": ObjectId(), "description": f"Step {k}", "is_completed": False}
+                        for k in range(3)
+                    ],
+                }
+            )
+        )
+    return docs
+
+
+def render_validated(docs: List[dict]) -> bytes:
+    items = [Task.model_validate(doc) for doc in docs]
+    return ListResponse[Task](items=items, total=len(items)).model_dump_json(by_alias=True).encode()
+
+
+def render_trusted(docs: List[dict]) -> bytes:
+    return trusted_list_response(Task, docs).body
+
+
+def _best(fn: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    docs = make_documents(args.count)
+    if render_validated(docs) != render_trusted(docs):
+        raise SystemExit("trusted path produced a different payload")
+
+    slow = _best(lambda: render_validated(docs), args.repeat)
+    fast = _best(lambda: render_trusted(docs), args.repeat)
+    print(f"{args.count} documents, best of {args.repeat}")
+    print(f"  validated : {slow * 1000:8.1f} ms")
+    print(f"  trusted   : {fast * 1000:8.1f} ms  ({slow / fast:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
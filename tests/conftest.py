@@ -6,16 +6,40 @@ import pytest
 
 from tests.fakes import FakeDB
 
+import api.habit_logs as habit_logs_module
+import api.habits as habits_module
+import api.routes.scheduler as scheduler_module
+import api.routes.tasks_split as tasks_split_module
 import api.schedule as schedule_module
 import api.summary as summary_module
+import api.sync as sync_module
 import api.tasks as tasks_module
+import api.users as users_module
+from api.app.migrations import schema_state
+from api.app.services.conflicts import conflict_index
+from api.app.services.freebusy import busy_cache
+from api.app.services.local_time import user_timezones
 
 
 @pytest.fixture
 def fake_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeDB]:
     db = FakeDB()
-    for module in (tasks_module, schedule_module, summary_module):
+    for module in (
+        tasks_module,
+        tasks_split_module,
+        scheduler_module,
+        schedule_module,
+        summary_module,
+        sync_module,
+        habits_module,
+        habit_logs_module,
+        users_module,
+    ):
         monkeypatch.setattr(module, "get_db", lambda db=db: db)
+    conflict_index.clear()
+    busy_cache.clear()
+    schema_state.clear()
+    user_timezones.clear()
     yield db
 
 
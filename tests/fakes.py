@@ -1,23 +1,32 @@
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from bson import ObjectId
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 
 class FakeCursor:
     def __init__(self, docs: Iterable[dict]) -> None:
         self._base_docs = list(docs)
-        self._sort_key: Optional[str] = None
-        self._sort_direction: int = 1
+        self._sort_spec: List[tuple[str, int]] = []
         self._limit: Optional[int] = None
+        self._batch_size: Optional[int] = None
         self._iter: Optional[Iterator[dict]] = None
 
-    def sort(self, key: str, direction: int) -> "FakeCursor":
-        self._sort_key = key
-        self._sort_direction = direction
+    def sort(self, key: Any, direction: int = 1) -> "FakeCursor":
+        if isinstance(key, list):
+            self._sort_spec = list(key)
+        else:
+            self._sort_spec = [(key, direction)]
+        return self
+
+    def batch_size(self, value: int) -> "FakeCursor":
+        self._batch_size = value
         return self
 
     def limit(self, value: int) -> "FakeCursor":
@@ -26,13 +35,17 @@ class FakeCursor:
 
     def _prepare(self) -> List[dict]:
         docs = list(self._base_docs)
-        if self._sort_key is not None:
-            reverse = self._sort_direction < 0
-            docs.sort(key=lambda doc: doc.get(self._sort_key), reverse=reverse)
+        # Stable sorts applied from the least significant key mimic a compound sort.
+        for key, direction in reversed(self._sort_spec):
+            docs.sort(key=lambda doc: doc.get(key), reverse=direction < 0)
         if self._limit is not None:
             docs = docs[: self._limit]
         return [dict(doc) for doc in docs]
 
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        docs = self._prepare()
+        return docs if length is None else docs[:length]
+
     def __aiter__(self) -> "FakeCursor":
         self._iter = iter(self._prepare())
         return self
@@ -50,6 +63,11 @@ class FakeInsertOneResult:
     inserted_id: ObjectId
 
 
+@dataclass
+class FakeInsertManyResult:
+    inserted_ids: List[ObjectId]
+
+
 @dataclass
 class FakeUpdateResult:
     matched_count: int
@@ -61,58 +79,322 @@ class FakeDeleteResult:
     deleted_count: int
 
 
+@dataclass
+class FakeBulkWriteResult:
+    inserted_count: int = 0
+    matched_count: int = 0
+    modified_count: int = 0
+    deleted_count: int = 0
+
+
 class FakeCollection:
     def __init__(self, docs: Optional[List[dict]] = None) -> None:
         self.docs: List[dict] = docs or []
+        # Every call that would hit the server counts once, so tests can pin
+        # the number of Mongo round trips a handler makes.
+        self.round_trips = 0
+        # Fields with a unique index, enforced on insert alongside ``_id``.
+        self.unique_keys: List[str] = []
 
     async def insert_one(self, doc: dict) -> FakeInsertOneResult:
-        payload = dict(doc)
-        payload.setdefault("_id", ObjectId())
-        self.docs.append(payload)
-        return FakeInsertOneResult(inserted_id=payload["_id"])
+        self.round_trips += 1
+        return FakeInsertOneResult(inserted_id=self._insert(doc))
 
-    async def find_one(self, query: Dict[str, Any]) -> Optional[dict]:
-        for doc in self.docs:
-            if self._matches(doc, query):
-                return dict(doc)
-        return None
+    async def insert_many(self, docs: Iterable[dict], ordered: bool = True) -> FakeInsertManyResult:
+        self.round_trips += 1
+        return FakeInsertManyResult(inserted_ids=[self._insert(doc) for doc in docs])
 
-    def find(self, query: Dict[str, Any]) -> FakeCursor:
+    async def find_one(
+        self, query: Dict[str, Any], projection: Optional[dict] = None, sort: Optional[list] = None
+    ) -> Optional[dict]:
+        self.round_trips += 1
+        matches = [doc for doc in self.docs if self._matches(doc, query)]
+        if sort:
+            matches = FakeCursor(matches).sort(sort)._prepare()
+        return self._project(matches[0], projection) if matches else None
+
+    def aggregate(self, pipeline: List[dict]) -> FakeCursor:
+        # Supports the stages the handlers use: $match, $project (inclusions
+        # plus $size/$setIntersection), $sort and $limit.
+        self.round_trips += 1
+        docs = [copy.deepcopy(doc) for doc in self.docs]
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$match":
+                docs = [doc for doc in docs if self._matches(doc, spec)]
+            elif op == "$project":
+                docs = [
+                    {
+                        "_id": doc["_id"],
+                        **{
+                            key: self._evaluate(doc, value) if isinstance(value, dict) else doc.get(key)
+                            for key, value in spec.items()
+                            if value
+                        },
+                    }
+                    for doc in docs
+                ]
+            elif op == "$sort":
+                for key, direction in reversed(list(spec.items())):
+                    docs.sort(key=lambda doc: (doc.get(key) is not None, doc.get(key)), reverse=direction < 0)
+            elif op == "$limit":
+                docs = docs[:spec]
+            else:  # pragma: no cover - unsupported in the fake
+                raise NotImplementedError(op)
+        return FakeCursor(docs)
+
+    def _evaluate(self, doc: dict, expression: Any, variables: Optional[dict] = None) -> Any:
+        variables = variables or {}
+        if isinstance(expression, str) and expression.startswith("$"):
+            if expression.startswith("$$"):
+                name, _, path = expression[2:].partition(".")
+                value = variables.get(name)
+            else:
+                value, path = doc, expression[1:]
+            for key in path.split(".") if path else []:
+                value = value.get(key) if isinstance(value, dict) else None
+            return value
+        if isinstance(expression, list):
+            return [self._evaluate(doc, item, variables) for item in expression]
+        if isinstance(expression, dict):
+            (op, operand), = expression.items()
+            if op == "$filter":
+                return [
+                    item
+                    for item in self._evaluate(doc, operand["input"], variables) or []
+                    if self._evaluate(doc, operand["cond"], {**variables, "this": item})
+                ]
+            args = self._evaluate(doc, operand, variables)
+            if op == "$size":
+                return len(args or [])
+            if op == "$ifNull":
+                return args[0] if args[0] is not None else args[1]
+            if op == "$eq":
+                return args[0] == args[1]
+            if op == "$ne":
+                return args[0] != args[1]
+            if op == "$slice":
+                if len(args) == 2:
+                    return args[0][: args[1]]
+                return args[0][args[1] : args[1] + args[2]]
+            if op == "$concatArrays":
+                return [item for part in args for item in part]
+            if op == "$setIntersection":
+                first, *rest = [set(part or []) for part in args]
+                return sorted(first.intersection(*rest))
+            raise NotImplementedError(op)  # pragma: no cover - unsupported in the fake
+        return expression
+
+    def find(self, query: Dict[str, Any], projection: Optional[dict] = None) -> FakeCursor:
+        self.round_trips += 1
         filtered = [doc for doc in self.docs if self._matches(doc, query)]
         return FakeCursor(filtered)
 
-    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any]) -> FakeUpdateResult:
-        matched = 0
+    async def find_one_and_update(
+        self,
+        query: Dict[str, Any],
+        update: Dict[str, Any],
+        projection: Optional[dict] = None,
+        return_document: bool = False,
+        array_filters: Optional[List[dict]] = None,
+    ) -> Optional[dict]:
+        self.round_trips += 1
         for doc in self.docs:
             if self._matches(doc, query):
-                matched += 1
-                for op, changes in update.items():
-                    if op == "$set":
-                        doc.update(changes)
-        return FakeUpdateResult(matched_count=matched, modified_count=matched)
+                before = copy.deepcopy(doc)
+                self._apply_update(doc, update, array_filters)
+                return self._project(doc if return_document else before, projection)
+        return None
+
+    async def find_one_and_delete(
+        self, query: Dict[str, Any], projection: Optional[dict] = None
+    ) -> Optional[dict]:
+        self.round_trips += 1
+        for idx, doc in enumerate(self.docs):
+            if self._matches(doc, query):
+                return self.docs.pop(idx)
+        return None
+
+    async def update_one(
+        self,
+        query: Dict[str, Any],
+        update: Dict[str, Any],
+        upsert: bool = False,
+        array_filters: Optional[List[dict]] = None,
+    ) -> FakeUpdateResult:
+        self.round_trips += 1
+        result = self._update(query, update, array_filters)
+        if not result.matched_count and upsert:
+            seed = {key: value for key, value in query.items() if not isinstance(value, dict)}
+            self._apply_update(seed, update)
+            self._insert(seed)
+        return result
 
     async def delete_one(self, query: Dict[str, Any]) -> FakeDeleteResult:
+        self.round_trips += 1
+        return self._delete(query)
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True) -> FakeBulkWriteResult:
+        self.round_trips += 1
+        result = FakeBulkWriteResult()
+        for request in requests:
+            if isinstance(request, InsertOne):
+                self._insert(request._doc)
+                result.inserted_count += 1
+            elif isinstance(request, UpdateOne):
+                updated = self._update(request._filter, request._doc)
+                result.matched_count += updated.matched_count
+                result.modified_count += updated.modified_count
+            elif isinstance(request, DeleteOne):
+                result.deleted_count += self._delete(request._filter).deleted_count
+        return result
+
+    async def count_documents(self, query: Dict[str, Any], **kwargs: Any) -> int:
+        self.round_trips += 1
+        return sum(1 for doc in self.docs if self._matches(doc, query))
+
+    def _insert(self, doc: dict) -> ObjectId:
+        payload = dict(doc)
+        payload.setdefault("_id", ObjectId())
+        for key in ("_id", *self.unique_keys):
+            if key in payload and any(other.get(key) == payload[key] for other in self.docs):
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error: {key}_1", 11000, {"keyPattern": {key: 1}}
+                )
+        self.docs.append(payload)
+        return payload["_id"]
+
+    def _update(
+        self, query: Dict[str, Any], update: Dict[str, Any], array_filters: Optional[List[dict]] = None
+    ) -> FakeUpdateResult:
+        for doc in self.docs:
+            if self._matches(doc, query):
+                self._apply_update(doc, update, array_filters)
+                return FakeUpdateResult(matched_count=1, modified_count=1)
+        return FakeUpdateResult(matched_count=0, modified_count=0)
+
+    def _delete(self, query: Dict[str, Any]) -> FakeDeleteResult:
         for idx, doc in enumerate(self.docs):
             if self._matches(doc, query):
                 del self.docs[idx]
                 return FakeDeleteResult(deleted_count=1)
         return FakeDeleteResult(deleted_count=0)
 
-    async def count_documents(self, query: Dict[str, Any]) -> int:
-        return sum(1 for doc in self.docs if self._matches(doc, query))
+    def _apply_update(
+        self, doc: dict, update: Any, array_filters: Optional[List[dict]] = None
+    ) -> None:
+        if isinstance(update, list):
+            # Pipeline-style update: only $set stages with expressions.
+            for stage in update:
+                (op, changes), = stage.items()
+                if op != "$set":  # pragma: no cover - unsupported in the fake
+                    raise NotImplementedError(op)
+                values = {key: self._evaluate(doc, value) for key, value in changes.items()}
+                doc.update(copy.deepcopy(values))
+            return
+        for op, changes in update.items():
+            if op == "$set":
+                for key, value in changes.items():
+                    self._set_path(doc, key.split("."), value, array_filters or [])
+            elif op == "$inc":
+                for key, amount in changes.items():
+                    doc[key] = doc.get(key, 0) + amount
+            elif op == "$unset":
+                for key in changes:
+                    doc.pop(key, None)
+            elif op == "$max":
+                for key, value in changes.items():
+                    if key not in doc or doc[key] < value:
+                        doc[key] = value
+            elif op == "$push":
+                for key, value in changes.items():
+                    items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                    target = doc.setdefault(key, [])
+                    position = value.get("$position", len(target)) if isinstance(value, dict) else len(target)
+                    target[position:position] = [copy.deepcopy(item) for item in items]
+            elif op == "$pull":
+                for key, condition in changes.items():
+                    doc[key] = [item for item in doc.get(key, []) if not self._matches(item, condition)]
+
+    def _set_path(self, target: Any, path: List[str], value: Any, array_filters: List[dict]) -> None:
+        head, rest = path[0], path[1:]
+        if head.startswith("$[") and head.endswith("]"):
+            name = head[2:-1]
+            prefix = f"{name}."
+            condition = {
+                key[len(prefix):]: expected
+                for spec in array_filters
+                for key, expected in spec.items()
+                if key.startswith(prefix)
+            }
+            for item in target:
+                if self._matches(item, condition):
+                    self._set_path(item, rest, value, array_filters)
+            return
+        if not rest:
+            target[head] = value
+            return
+        self._set_path(target.setdefault(head, {}), rest, value, array_filters)
+
+    def _project(self, doc: dict, projection: Optional[dict]) -> dict:
+        # Only the array operators and computed fields matter to the handlers;
+        # plain inclusions are ignored and the whole document comes back.
+        projected = copy.deepcopy(doc)
+        for key, spec in (projection or {}).items():
+            if not isinstance(spec, dict):
+                continue
+            if "$slice" not in spec and "$elemMatch" not in spec:
+                projected[key] = self._evaluate(doc, spec)
+                continue
+            if not isinstance(projected.get(key), list):
+                continue
+            if "$slice" in spec:
+                skip, count = spec["$slice"]
+                projected[key] = projected[key][skip : skip + count]
+            elif "$elemMatch" in spec:
+                matched = [item for item in projected[key] if self._matches(item, spec["$elemMatch"])]
+                projected[key] = matched[:1]
+        return projected
 
     def _matches(self, doc: dict, query: Dict[str, Any]) -> bool:
         for key, expected in query.items():
+            if key == "$or":
+                if not any(self._matches(doc, clause) for clause in expected):
+                    return False
+                continue
+            if "." in key:
+                head, rest = key.split(".", 1)
+                nested = doc.get(head)
+                items = nested if isinstance(nested, list) else [nested]
+                if not any(isinstance(item, dict) and self._matches(item, {rest: expected}) for item in items):
+                    return False
+                continue
             value = doc.get(key)
             if isinstance(expected, dict):
                 for op, operand in expected.items():
-                    if op == "$gte" and not (value >= operand):
+                    if op == "$exists":
+                        if (key in doc) != bool(operand):
+                            return False
+                    elif op == "$in":
+                        values = value if isinstance(value, list) else [value]
+                        if not any(item in operand for item in values):
+                            return False
+                    elif op == "$ne":
+                        if value == operand:
+                            return False
+                    elif op == "$type":
+                        if not isinstance(value, {"string": str, "objectId": ObjectId}[operand]):
+                            return False
+                    elif op in {"$gte", "$gt", "$lte", "$lt"} and value is None:
+                        # Mongo range operators never match a missing field.
                         return False
-                    if op == "$gt" and not (value > operand):
+                    elif op == "$gte" and not (value >= operand):
                         return False
-                    if op == "$lte" and not (value <= operand):
+                    elif op == "$gt" and not (value > operand):
                         return False
-                    if op == "$lt" and not (value < operand):
+                    elif op == "$lte" and not (value <= operand):
+                        return False
+                    elif op == "$lt" and not (value < operand):
                         return False
             else:
                 if value != expected:
@@ -122,9 +404,25 @@ class FakeCollection:
 
 class FakeDB:
     def __init__(self) -> None:
+        self.users = FakeCollection([])
         self.tasks = FakeCollection([])
-        self.schedule_events = FakeCollection([])
+        self.habits = FakeCollection([])
         self.habit_logs = FakeCollection([])
+        self.schedule_events = FakeCollection([])
+        self.collection_versions = FakeCollection([])
+        self.changes = FakeCollection([])
+        self.schema_migrations = FakeCollection([])
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return getattr(self, name)
+
+    @property
+    def round_trips(self) -> int:
+        return sum(
+            collection.round_trips
+            for collection in vars(self).values()
+            if isinstance(collection, FakeCollection)
+        )
 
 
 __all__ = ["FakeCollection", "FakeCursor", "FakeDB"]
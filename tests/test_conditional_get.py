@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+from bson import ObjectId
+from starlette.requests import Request
+from starlette.responses import Response
+
+import api.app.conditional as conditional_module
+import api.tasks as tasks_module
+from api.app.conditional import ConditionalGetMiddleware
+
+
+def _request(path: str, user_id: ObjectId, if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": f"user_id={user_id}".encode(),
+            "headers": headers,
+        }
+    )
+
+
+@pytest.mark.anyio("asyncio")
+async def test_etag_round_trip_and_invalidation(fake_db, monkeypatch):
+    monkeypatch.setattr(conditional_module, "get_db", lambda: fake_db)
+    middleware = ConditionalGetMiddleware(app=lambda scope, receive, send: None)
+    handler_calls = 0
+
+    async def call_next(request: Request) -> Response:
+        nonlocal handler_calls
+        handler_calls += 1
+        return Response("{}", media_type="application/json")
+
+    user_id = ObjectId()
+    first = await middleware.dispatch(_request("/v1/tasks", user_id), call_next)
+    etag = first.headers["etag"]
+    assert handler_calls == 1
+
+    cached = await middleware.dispatch(_request("/v1/tasks", user_id, etag), call_next)
+    assert cached.status_code == 304
+    assert handler_calls == 1
+
+    await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description="New"))
+
+    refreshed = await middleware.dispatch(_request("/v1/tasks", user_id, etag), call_next)
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert handler_calls == 2
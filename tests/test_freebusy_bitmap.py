@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import api.app.services.freebusy as freebusy_module
+import api.routes.scheduler as scheduler_module
+from api.app.services.freebusy import _aligned_free, _bitmap_free, _merge_ranges
+
+
+def _random_busy(rng: random.Random, start: datetime, days: int) -> list[tuple[datetime, datetime]]:
+    busy = []
+    for _ in range(days * 12):
+        begin = start + timedelta(seconds=rng.randrange(-3600, days * 86400), microseconds=rng.choice((0, 250)))
+        busy.append((begin, begin + timedelta(seconds=rng.randrange(60, 3 * 3600))))
+    return _merge_ranges(sorted(busy))
+
+
+@pytest.mark.parametrize("backend", ["bytes", "numpy"])
+def test_bitmap_matches_the_interval_sweep(backend, monkeypatch):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(freebusy_module, "np", None)
+
+    rng = random.Random(7)
+    for trial in range(40):
+        window_start = datetime(2030, 3, 1, 6, rng.randrange(60), rng.randrange(60), rng.choice((0, 500)))
+        window_end = window_start + timedelta(days=rng.randrange(1, 8), minutes=rng.randrange(600))
+        busy = _random_busy(rng, window_start, 8)
+        for block in (1, 5, 15, 30, 45, 60, 90):
+            expected = _aligned_free(busy, window_start, window_end, block)
+            assert _bitmap_free(busy, window_start, window_end, block) == expected, (trial, block)
+
+    # Windows shorter than one block, and calendars with nothing booked.
+    assert _bitmap_free([], datetime(2030, 1, 1, 9, 1), datetime(2030, 1, 1, 9, 29), 30) == []
+    assert _bitmap_free([], datetime(2030, 1, 1, 9, 1), datetime(2030, 1, 1, 11), 30) == [
+        {"start": datetime(2030, 1, 1, 9, 30), "end": datetime(2030, 1, 1, 11)}
+    ]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_planner_engine_is_selectable(fake_db):
+    user_id = ObjectId()
+    day = datetime(2030, 5, 6)
+    fake_db.schedule_events.docs.append(
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "title": "Standup",
+            "start_time": day + timedelta(hours=9, minutes=5),
+            "end_time": day + timedelta(hours=9, minutes=20),
+            "rrule": "FREQ=DAILY;COUNT=30",
+            "series_end": day + timedelta(days=29, hours=9, minutes=20),
+        }
+    )
+    plans = []
+    for engine in ("intervals", "bitmap"):
+        payload = scheduler_module.PlanIn(
+            user_id=str(user_id),
+            tasks=[{"_id": "a", "duration_minutes": 50}, {"_id": "b", "duration_minutes": 25}],
+            window={"start": day + timedelta(hours=8, minutes=30), "end": day + timedelta(days=20)},
+            block_minutes=5,
+            engine=engine,
+        )
+        plans.append(await scheduler_module.scheduler_plan(payload))
+
+    assert plans[0] == plans[1]
+    assert [block.start_time for block in plans[0].blocks] == [
+        day + timedelta(hours=9, minutes=20),
+        day + timedelta(hours=8, minutes=30),
+    ]
+    with pytest.raises(ValueError):
+        scheduler_module.PlanIn(user_id=str(user_id), window={"start": day, "end": day + timedelta(days=1)}, engine="gpu")
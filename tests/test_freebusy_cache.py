@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import api.routes.scheduler as scheduler_module
+import api.schedule as schedule_module
+from api.app.services.freebusy import BusyCache, busy_cache
+
+
+def _at(hour: int, minute: int = 0, day: int = 6) -> datetime:
+    return datetime(2030, 5, day, hour, minute)
+
+
+def _plan(user_id: ObjectId, start: datetime, end: datetime) -> scheduler_module.PlanIn:
+    return scheduler_module.PlanIn(
+        user_id=str(user_id),
+        tasks=[{"_id": "write", "duration_minutes": 60}],
+        window={"start": start, "end": end},
+    )
+
+
+@pytest.mark.anyio("asyncio")
+async def test_replanning_an_unchanged_calendar_skips_mongo(fake_db):
+    user_id = ObjectId()
+    fake_db.schedule_events.docs.append(
+        {"_id": ObjectId(), "user_id": user_id, "title": "Late", "start_time": _at(23), "end_time": _at(1, day=7)}
+    )
+
+    first = await scheduler_module.scheduler_plan(_plan(user_id, _at(22), _at(3, day=7)))
+    assert first.blocks[0].start_time == _at(22)
+    assert fake_db.schedule_events.round_trips == 1
+
+    fake_db.schedule_events.round_trips = 0
+    again = await scheduler_module.scheduler_plan(_plan(user_id, _at(22), _at(3, day=7)))
+    narrower = await scheduler_module.scheduler_plan(_plan(user_id, _at(23, 30), _at(3, day=7)))
+    assert again == first
+    # The busy range spanning midnight is stored per day and merged back together.
+    assert narrower.blocks[0].start_time == _at(1, day=7)
+    assert fake_db.schedule_events.round_trips == 0
+    assert (busy_cache.stats.hits, busy_cache.stats.misses) == (2, 1)
+
+    # Only the days not loaded yet are read.
+    await scheduler_module.scheduler_plan(_plan(user_id, _at(22), _at(3, day=8)))
+    assert fake_db.schedule_events.round_trips == 1
+    assert busy_cache.snapshot()["misses"] == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_schedule_writes_invalidate_the_cached_days(fake_db):
+    user_id = ObjectId()
+    window = (_at(9), _at(12))
+    assert (await scheduler_module.scheduler_plan(_plan(user_id, *window))).blocks[0].start_time == _at(9)
+
+    created = await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(user_id=user_id, title="Standup", start_time=_at(9), end_time=_at(10))
+    )
+    assert (await scheduler_module.scheduler_plan(_plan(user_id, *window))).blocks[0].start_time == _at(10)
+
+    await schedule_module.update_event(
+        str(created.id), schedule_module.ScheduleEventUpdate(end_time=_at(11))
+    )
+    assert (await scheduler_module.scheduler_plan(_plan(user_id, *window))).blocks[0].start_time == _at(11)
+
+    await schedule_module.delete_event(str(created.id))
+    assert (await scheduler_module.scheduler_plan(_plan(user_id, *window))).blocks[0].start_time == _at(9)
+    assert busy_cache.stats.hits == 0
+    assert busy_cache.stats.invalidations == 3
+
+
+@pytest.mark.anyio("asyncio")
+async def test_least_recently_used_users_are_evicted(fake_db):
+    cache = BusyCache(max_users=2)
+    first, second, third = ObjectId(), ObjectId(), ObjectId()
+    for user_id in (first, second, first, third):
+        await cache.busy(fake_db, user_id, _at(9), _at(17))
+
+    assert cache.snapshot() == {"hits": 1, "misses": 3, "evictions": 1, "invalidations": 0, "users": 2}
+    await cache.busy(fake_db, first, _at(9), _at(17))
+    await cache.busy(fake_db, second, _at(9), _at(17))
+    assert (cache.stats.hits, cache.stats.misses) == (2, 4)
+
+    stale = BusyCache(stale_after=timedelta(0))
+    await stale.busy(fake_db, first, _at(9), _at(17))
+    await stale.busy(fake_db, first, _at(9), _at(17))
+    assert stale.stats.misses == 2
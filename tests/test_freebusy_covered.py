@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import api.schedule as schedule_module
+from api.app.migrations import migrate_collection
+from api.app.schemas.common import schema_state
+from api.app.services.freebusy import busy_cache, get_free_intervals, get_group_free_intervals
+
+
+def _at(hour: int, minute: int = 0, day: int = 6) -> datetime:
+    return datetime(2030, 5, day, hour, minute)
+
+
+async def _calendar(user_id: ObjectId) -> None:
+    await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id, title="Standup", start_time=_at(9), end_time=_at(9, 30), rrule="FREQ=DAILY;COUNT=5"
+        )
+    )
+    series = await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id, title="Review", start_time=_at(14), end_time=_at(15), rrule="FREQ=DAILY;COUNT=3"
+        )
+    )
+    await schedule_module.cancel_occurrence(str(series.id), original_start_time=_at(14))
+    for title, start, end in (
+        ("Coincident", _at(14), _at(15)),  # same times as the cancelled first review
+        ("Offsite", _at(8, day=1), _at(12, day=6)),
+        ("Long ago", _at(9, day=1) - timedelta(days=60), _at(10, day=1) - timedelta(days=60)),
+    ):
+        await schedule_module.create_event(
+            schedule_module.ScheduleEventCreate(user_id=user_id, title=title, start_time=start, end_time=end)
+        )
+
+
+@pytest.mark.anyio("asyncio")
+async def test_covered_reads_match_the_window_query(fake_db):
+    alice, bob = ObjectId(), ObjectId()
+    await _calendar(alice)
+    await _calendar(bob)
+    window = (_at(7), _at(20, day=8))
+
+    unmigrated = await get_free_intervals(fake_db, str(alice), *window, block_minutes=15)
+    group_unmigrated = await get_group_free_intervals(fake_db, [str(alice), str(bob)], *window)
+    report = await migrate_collection(fake_db, "schedule_events")
+    assert report.complete and schema_state.is_ready("schedule_events")
+
+    busy_cache.clear()
+    fake_db.schedule_events.round_trips = 0
+    assert await get_free_intervals(fake_db, str(alice), *window, block_minutes=15) == unmigrated
+    # One index-only scan for one-off rows, one query for recurring masters.
+    assert fake_db.schedule_events.round_trips == 2
+    assert await get_group_free_intervals(fake_db, [str(alice), str(bob)], *window) == group_unmigrated
+    assert {"start": _at(14), "end": _at(15)} not in unmigrated
+
+
+@pytest.mark.anyio("asyncio")
+async def test_events_longer_than_the_bound_are_rejected(fake_db):
+    user_id = ObjectId()
+    with pytest.raises(HTTPException) as excinfo:
+        await schedule_module.create_event(
+            schedule_module.ScheduleEventCreate(
+                user_id=user_id, title="Sabbatical", start_time=_at(9), end_time=_at(9, day=25)
+            )
+        )
+    assert excinfo.value.status_code == 400
+
+    created = await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(user_id=user_id, title="Trip", start_time=_at(9), end_time=_at(9, day=19))
+    )
+    with pytest.raises(HTTPException):
+        await schedule_module.update_event(str(created.id), schedule_module.ScheduleEventUpdate(end_time=_at(9, day=21)))
+
+    with pytest.raises(HTTPException) as excinfo:
+        await schedule_module.create_blocks_bulk(
+            schedule_module.BulkBlocksIn(
+                user_id=str(user_id),
+                blocks=[{"summary": "Too long", "start_time": _at(9), "end_time": _at(9, day=30)}],
+            )
+        )
+    assert excinfo.value.detail == [{"index": 0, "error": "Events cannot run longer than 14 days"}]
+
+    # Legacy events over the bound keep the unbounded query on.
+    fake_db.schedule_events.docs.append(
+        {"_id": ObjectId(), "user_id": user_id, "title": "Old", "start_time": _at(9), "end_time": _at(9, day=28)}
+    )
+    report = await migrate_collection(fake_db, "schedule_events")
+    assert (report.skipped, report.complete) == (1, False)
+    assert not schema_state.is_ready("schedule_events")
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import api.routes.scheduler as scheduler_module
+import api.schedule as schedule_module
+from api.app.services.freebusy import common_free_intervals
+
+
+def _at(hour: int, minute: int = 0, day: int = 6) -> datetime:
+    return datetime(2030, 5, day, hour, minute)
+
+
+def _event(user_id: ObjectId, start: datetime, end: datetime, **extra) -> dict:
+    return {"_id": ObjectId(), "user_id": user_id, "title": "Busy", "start_time": start, "end_time": end, **extra}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_group_free_slots_are_common_to_everyone(fake_db):
+    alice, bob, carol = ObjectId(), ObjectId(), ObjectId()
+    fake_db.schedule_events.docs.extend(
+        [
+            _event(alice, _at(9), _at(10, 10)),
+            _event(bob, _at(9, 30), _at(11)),
+            _event(bob, _at(13), _at(13, 45)),
+            _event(ObjectId(), _at(14), _at(15)),  # not in the group
+        ]
+    )
+    await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=carol, title="Lunch", start_time=_at(12, 0, 1), end_time=_at(12, 30, 1), rrule="FREQ=DAILY"
+        )
+    )
+    fake_db.schedule_events.round_trips = 0
+
+    result = await scheduler_module.group_freebusy(
+        scheduler_module.GroupFreeBusyIn(
+            user_ids=[str(alice), str(bob), str(carol), str(alice)],
+            window={"start": _at(8), "end": _at(17)},
+            block_minutes=30,
+        )
+    )
+
+    assert [(slot.start, slot.end) for slot in result.free] == [
+        (_at(8), _at(9)),
+        (_at(11), _at(12)),
+        (_at(12, 30), _at(13)),
+        (_at(14), _at(17)),
+    ]
+    # Every calendar comes back from a single $in query.
+    assert fake_db.schedule_events.round_trips == 1
+
+
+def test_heap_merge_matches_a_minute_by_minute_check():
+    rng = random.Random(7)
+    start, end = _at(0), _at(0, day=8)
+    calendars = []
+    for _ in range(12):
+        busy = []
+        for _ in range(rng.randint(0, 25)):
+            begin = start + timedelta(minutes=rng.randrange(0, 48 * 60))
+            busy.append((begin, begin + timedelta(minutes=rng.randint(5, 180))))
+        calendars.append(sorted(busy))
+
+    free = common_free_intervals(calendars, start, end, block_minutes=15)
+
+    minute = timedelta(minutes=1)
+    expected = set()
+    moment = start
+    while moment < end:
+        taken = any(b <= moment < e for busy in calendars for b, e in busy)
+        if not taken:
+            expected.add(moment)
+        moment += minute
+    covered = {
+        slot["start"] + minute * n
+        for slot in free
+        for n in range(int((slot["end"] - slot["start"]) / minute))
+    }
+    assert covered <= expected
+    assert all(slot["start"].minute % 15 == 0 and slot["end"].minute % 15 == 0 for slot in free)
+    # Every fully free, aligned quarter hour is reported.
+    quarter = start
+    while quarter < end:
+        if all(quarter + minute * n in expected for n in range(15)):
+            assert quarter in covered
+        quarter += timedelta(minutes=15)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_group_freebusy_rejects_bad_input(fake_db):
+    for window, user_ids in (
+        ({"start": _at(8), "end": _at(8, day=20) + timedelta(days=30)}, [str(ObjectId())]),
+        ({"start": _at(8), "end": _at(9)}, ["not-an-id"]),
+    ):
+        with pytest.raises(HTTPException) as excinfo:
+            await scheduler_module.group_freebusy(
+                scheduler_module.GroupFreeBusyIn(user_ids=user_ids, window=window)
+            )
+        assert excinfo.value.status_code == 400
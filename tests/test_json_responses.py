@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from api.app.utils.responses import MongoJSONResponse
+
+
+def test_mongo_json_response_encodes_object_ids_and_naive_datetimes():
+    oid = ObjectId()
+    response = MongoJSONResponse({"_id": oid, "at": datetime(2024, 5, 1, 9, 30), "n": [1, None]})
+    assert response.body == (
+        b'{"_id":"' + str(oid).encode() + b'","at":"2024-05-01T09:30:00","n":[1,null]}'
+    )
+
+
+def test_mongo_json_response_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        MongoJSONResponse({"value": object()})
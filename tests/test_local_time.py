@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from starlette.requests import Request
+from starlette.responses import Response
+
+import api.app.conditional as conditional_module
+import api.schedule as schedule_module
+import api.summary as summary_module
+import api.users as users_module
+from api.app.conditional import ConditionalGetMiddleware
+from api.app.services.local_time import day_bounds, month_bounds, today_bounds, user_timezones
+
+CHICAGO = "America/Chicago"
+
+
+def test_day_bounds_follow_local_midnight_across_dst():
+    assert day_bounds(CHICAGO, date(2030, 1, 15)) == (datetime(2030, 1, 15, 6), datetime(2030, 1, 16, 6))
+    spring, autumn = day_bounds(CHICAGO, date(2030, 3, 10)), day_bounds(CHICAGO, date(2030, 11, 3))
+    assert spring[1] - spring[0] == timedelta(hours=23)
+    assert autumn[1] - autumn[0] == timedelta(hours=25)
+    assert month_bounds(CHICAGO, 2030, 12) == (datetime(2030, 12, 1, 6), datetime(2031, 1, 1, 6))
+    assert day_bounds("UTC", date(2030, 1, 15)) == (datetime(2030, 1, 15), datetime(2030, 1, 16))
+    assert day_bounds(CHICAGO, date(2030, 1, 15)) is day_bounds(CHICAGO, date(2030, 1, 15))
+
+
+async def _chicago_user(fake_db) -> ObjectId:
+    created = await users_module.create_user(
+        users_module.UserCreate(email="cdt@example.com", name="Chi", timezone=CHICAGO)
+    )
+    return ObjectId(created.id)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_today_views_use_the_users_zone(fake_db):
+    user_id = await _chicago_user(fake_db)
+    start, end = today_bounds(CHICAGO)
+    for title, at in (
+        ("Late yesterday", start - timedelta(minutes=30)),
+        ("Early today", start + timedelta(minutes=30)),
+        ("Late today", end - timedelta(minutes=30)),
+        ("Tomorrow", end + timedelta(minutes=10)),
+    ):
+        fake_db.schedule_events.docs.append(
+            {
+                "_id": ObjectId(),
+                "user_id": user_id,
+                "title": title,
+                "start_time": at,
+                "end_time": at + timedelta(minutes=15),
+            }
+        )
+    fake_db.habit_logs.docs.append({"_id": ObjectId(), "user_id": user_id, "date": end - timedelta(hours=1)})
+
+    listing = await schedule_module.list_schedule(user_id=str(user_id))
+    assert [item.title for item in listing.items] == ["Early today", "Late today"]
+
+    fake_db.users.round_trips = 0
+    result = await summary_module.summary(user_id=str(user_id))
+    assert (result["events_count"], result["habits_logged_today"]) == (2, 1)
+    # The zone comes from the per-process cache, not another users lookup.
+    assert fake_db.users.round_trips == 0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_changing_the_zone_changes_the_daily_etag(fake_db, monkeypatch):
+    monkeypatch.setattr(conditional_module, "get_db", lambda: fake_db)
+    middleware = ConditionalGetMiddleware(app=lambda scope, receive, send: None)
+    user_id = await _chicago_user(fake_db)
+
+    async def call_next(request: Request) -> Response:
+        return Response("{}", media_type="application/json")
+
+    def request() -> Request:
+        return Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "path": "/v1/summary",
+                "query_string": f"user_id={user_id}".encode(),
+                "headers": [],
+            }
+        )
+
+    before = (await middleware.dispatch(request(), call_next)).headers["etag"]
+    updated = await users_module.update_user(str(user_id), users_module.UserUpdate(timezone="Asia/Tokyo"))
+    assert updated.timezone == "Asia/Tokyo"
+    after = (await middleware.dispatch(request(), call_next)).headers["etag"]
+    assert after != before
+
+    with pytest.raises(ValueError):
+        users_module.UserUpdate(timezone="Mars/Olympus")
+    user_timezones.clear()
+    fake_db.users.docs[0]["timezone"] = "Not/AZone"
+    assert await user_timezones.get(fake_db, user_id) == "UTC"
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi.responses import StreamingResponse
+
+import api.habit_logs as habit_logs_module
+import api.habits as habits_module
+import api.schedule as schedule_module
+import api.tasks as tasks_module
+
+NDJSON = "application/x-ndjson"
+
+
+async def _chunks(response: StreamingResponse) -> list[bytes]:
+    assert response.media_type == NDJSON
+    return [chunk async for chunk in response.body_iterator]
+
+
+def _lines(chunks: list[bytes]) -> list[dict]:
+    return [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_tasks_stream_matches_the_json_listing(fake_db):
+    user_id = ObjectId()
+    for name in ("One", "Two", "Three"):
+        await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description=name))
+    fake_db.tasks.docs.append(
+        {"_id": ObjectId(), "user_id": user_id, "description": "Legacy", "created_at": datetime(2020, 1, 1)}
+    )
+    args = dict(user_id=str(user_id), is_completed=None, limit=None, cursor=None, fields=None)
+
+    listing = await tasks_module.list_tasks(**args)
+    expected = json.loads(listing.model_dump_json(by_alias=True))["items"]
+
+    chunks = await _chunks(await tasks_module.list_tasks(**args, accept=NDJSON))
+    # The first document goes out on its own so clients see bytes immediately.
+    assert len(_lines(chunks[:1])) == 1
+    assert _lines(chunks) == expected
+
+    sparse = await tasks_module.list_tasks(**{**args, "fields": "description", "limit": 2}, accept=NDJSON)
+    assert _lines(await _chunks(sparse)) == [
+        {"_id": item["_id"], "description": item["description"]} for item in expected[:2]
+    ]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_events_stream_interleaves_recurring_occurrences(fake_db):
+    user_id = ObjectId()
+    start = datetime(2030, 5, 6, 9)
+    await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id,
+            title="Standup",
+            start_time=start,
+            end_time=start + timedelta(minutes=15),
+            rrule="FREQ=DAILY;COUNT=3",
+        )
+    )
+    await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id,
+            title="Review",
+            start_time=start + timedelta(days=1, hours=3),
+            end_time=start + timedelta(days=1, hours=4),
+        )
+    )
+
+    response = await schedule_module.list_events(
+        user_id=str(user_id),
+        start_after=start - timedelta(days=1),
+        start_before=None,
+        fields=None,
+        accept=NDJSON,
+    )
+    lines = _lines(await _chunks(response))
+    assert [(line["title"], line["start_time"]) for line in lines] == [
+        ("Standup", "2030-05-06T09:00:00"),
+        ("Standup", "2030-05-07T09:00:00"),
+        ("Review", "2030-05-07T12:00:00"),
+        ("Standup", "2030-05-08T09:00:00"),
+    ]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_habit_logs_stream(fake_db):
+    user_id = ObjectId()
+    habit = await habits_module.create_habit(habits_module.HabitCreate(user_id=user_id, name="Read"))
+    for day in (1, 2):
+        await habit_logs_module.create_habit_log(
+            habit_logs_module.HabitLogCreate(
+                habit_id=habit.id, user_id=user_id, date=datetime(2030, 1, day)
+            )
+        )
+
+    response = await habit_logs_module.list_habit_logs(
+        user_id=str(user_id), habit_id=None, date=None, fields=None, accept=NDJSON
+    )
+    assert [line["date"] for line in _lines(await _chunks(response))] == [
+        "2030-01-02T00:00:00",
+        "2030-01-01T00:00:00",
+    ]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from bson import ObjectId
+
+from api.app.query_plans import PlanReport, QueryShape, build_catalog, collect_stages, propose_index
+
+
+def test_collect_stages_walks_classic_and_sbe_plans():
+    classic = {
+        "stage": "LIMIT",
+        "inputStage": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}},
+    }
+    sbe = {"queryPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "x"}}}
+
+    assert collect_stages(classic) == ["LIMIT", "SORT", "COLLSCAN"]
+    assert collect_stages(sbe) == ["FETCH", "IXSCAN"]
+
+    report = PlanReport(shape=build_catalog()[0], stages=collect_stages(classic))
+    assert report.flagged == ["SORT", "COLLSCAN"]
+    assert not report.ok
+
+
+def test_propose_index_orders_equality_sort_range():
+    shape = QueryShape(
+        "example",
+        "tasks",
+        {"user_id": ObjectId(), "updated_at": {"$gte": 1, "$lt": 2}, "is_completed": True},
+        [("priority", 1)],
+    )
+    assert propose_index(shape) == [
+        ("user_id", 1),
+        ("is_completed", 1),
+        ("priority", 1),
+        ("updated_at", 1),
+    ]
+
+
+def test_catalog_names_are_unique():
+    names = [shape.name for shape in build_catalog()]
+    assert len(names) == len(set(names))
+
+
+def test_covered_shapes_flag_fetch_stages():
+    catalog = {shape.name: shape for shape in build_catalog()}
+    covered = catalog["freebusy.busy"]
+    fetched = {"stage": "PROJECTION_DEFAULT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}
+    index_only = {"stage": "PROJECTION_COVERED", "inputStage": {"stage": "IXSCAN"}}
+
+    assert covered.covered and catalog["freebusy.group_busy"].covered
+    assert PlanReport(shape=covered, stages=collect_stages(fetched)).flagged == ["FETCH"]
+    assert PlanReport(shape=covered, stages=collect_stages(index_only)).ok
+    assert PlanReport(shape=catalog["freebusy.series"], stages=collect_stages(fetched)).ok
+    # The overlap filter bounds start_time on both sides, then checks end_time in the index.
+    assert propose_index(covered) == [("user_id", 1), ("start_time", 1), ("end_time", 1)]
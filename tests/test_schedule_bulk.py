@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import api.schedule as schedule_module
+
+
+def _block(summary: str, start: datetime, minutes: int) -> schedule_module.ScheduleBlockIn:
+    return schedule_module.ScheduleBlockIn(
+        summary=summary, start_time=start, end_time=start + timedelta(minutes=minutes)
+    )
+
+
+@pytest.fixture
+def broadcasts(monkeypatch):
+    sent = []
+
+    async def record(event_type, payload=None):
+        sent.append((event_type, payload))
+
+    monkeypatch.setattr(schedule_module, "broadcast_event", record)
+    return sent
+
+
+@pytest.mark.anyio("asyncio")
+async def test_bulk_insert_skips_read_back_and_broadcasts_once(fake_db, broadcasts):
+    user_id = ObjectId()
+    start = datetime(2030, 3, 4, 8)
+    blocks = [_block(f"Block {n}", start + timedelta(hours=n), 45) for n in reversed(range(200))]
+
+    created = await schedule_module.create_blocks_bulk(
+        schedule_module.BulkBlocksIn(user_id=str(user_id), blocks=blocks)
+    )
+
+    assert created.inserted == 200
+    assert [item.title for item in created.items[:2]] == ["Block 0", "Block 1"]
+    assert [doc["_id"] for doc in fake_db.schedule_events.docs] == [
+        item.id for item in reversed(created.items)
+    ]
+    # The unordered insert plus one conflict-index load for the covered days.
+    assert fake_db.schedule_events.round_trips == 2
+    assert broadcasts == [
+        ("schedule_bulk_created", {"event_ids": [str(item.id) for item in created.items]})
+    ]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_bulk_validates_the_whole_batch_first(fake_db, broadcasts):
+    start = datetime(2030, 3, 4, 8)
+    payload = schedule_module.BulkBlocksIn(
+        user_id=str(ObjectId()),
+        blocks=[
+            _block("Write", start, 60),
+            _block("Review", start + timedelta(minutes=30), 60),
+            _block("Lunch", start + timedelta(hours=4), 60),
+            _block("Call", start + timedelta(hours=4, minutes=15), 15),
+        ],
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await schedule_module.create_blocks_bulk(payload)
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail == [
+        {"index": 1, "error": "Block overlaps block 0"},
+        {"index": 3, "error": "Block overlaps block 2"},
+    ]
+    assert fake_db.schedule_events.docs == []
+    assert broadcasts == []
+
+    payload.allow_overlap = True
+    created = await schedule_module.create_blocks_bulk(payload)
+    assert created.inserted == 4
+    assert [c.title for c in created.items[0].conflicts] == ["Review"]
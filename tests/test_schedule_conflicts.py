@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import api.schedule as schedule_module
+from api.app.services.conflicts import ConflictIndex
+from api.app.services.interval_tree import IntervalTree
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(7)
+    tree: IntervalTree[None] = IntervalTree()
+    stored: dict[int, tuple[int, int]] = {}
+    for _ in range(500):
+        key = rng.randrange(60)
+        if stored and rng.random() < 0.3:
+            tree.remove(key)
+            stored.pop(key, None)
+            continue
+        start = rng.randrange(200)
+        end = start + rng.randrange(1, 30)
+        tree.insert(start, end, key)
+        stored[key] = (start, end)
+
+        query_start = rng.randrange(-10, 210)
+        query_end = query_start + rng.randrange(1, 40)
+        found = sorted(interval.key for interval in tree.overlapping(query_start, query_end))
+        expected = sorted(k for k, (s, e) in stored.items() if s < query_end and query_start < e)
+        assert found == expected
+    assert len(tree) == len(stored)
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2030, 5, 6, hour, minute)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_creates_report_conflicts_and_index_tracks_writes(fake_db):
+    user_id = ObjectId()
+    standup = await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id, title="Standup", start_time=_at(9), end_time=_at(9, 30)
+        )
+    )
+    assert standup.conflicts == []
+
+    bulk = await schedule_module.create_blocks_bulk(
+        schedule_module.BulkBlocksIn(
+            user_id=str(user_id),
+            blocks=[
+                schedule_module.ScheduleBlockIn(summary="Focus", start_time=_at(9, 15), end_time=_at(10, 30)),
+                schedule_module.ScheduleBlockIn(summary="Lunch", start_time=_at(12), end_time=_at(13)),
+            ],
+        )
+    )
+    focus, lunch = bulk.items
+    assert [c.id for c in focus.conflicts] == [standup.id]
+    assert lunch.conflicts == []
+
+    # Back-to-back events share an endpoint but do not overlap.
+    review = await schedule_module.create_schedule_item(
+        schedule_module.CreateScheduleRequest(
+            user_id=str(user_id), summary="Review", start=_at(10, 30), end=_at(12, 15)
+        )
+    )
+    assert [c.title for c in review.conflicts] == ["Lunch"]
+
+    report = await schedule_module.list_conflicts(user_id=str(user_id), start=_at(0), end=_at(23))
+    assert [(item.event.title, [c.title for c in item.conflicts]) for item in report.items] == [
+        ("Standup", ["Focus"]),
+        ("Focus", ["Standup"]),
+        ("Review", ["Lunch"]),
+        ("Lunch", ["Review"]),
+    ]
+
+    await schedule_module.update_event(
+        str(review.id), schedule_module.ScheduleEventUpdate(start_time=_at(14), end_time=_at(15))
+    )
+    await schedule_module.delete_event(str(standup.id))
+    report = await schedule_module.list_conflicts(user_id=str(user_id), start=_at(0), end=_at(23))
+    assert report.total == 0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_delete_during_a_day_load_is_not_undone(fake_db, monkeypatch):
+    user_id = ObjectId()
+    index = ConflictIndex()
+    # Loading an empty day creates the user's calendar.
+    assert await index.overlapping(fake_db, user_id, _at(9), _at(10)) == []
+
+    event_id = ObjectId()
+    next_day = datetime(2030, 5, 7, 9)
+    fake_db.schedule_events.docs.append(
+        {
+            "_id": event_id,
+            "user_id": user_id,
+            "title": "Review",
+            "start_time": next_day,
+            "end_time": datetime(2030, 5, 7, 10),
+        }
+    )
+    find = fake_db.schedule_events.find
+
+    def find_then_delete(query, projection=None):
+        cursor = find(query, projection)
+        # The delete handler finishes while the load is still reading the old result.
+        fake_db.schedule_events.docs.clear()
+        index.forget(user_id, event_id)
+        return cursor
+
+    monkeypatch.setattr(fake_db.schedule_events, "find", find_then_delete)
+    assert await index.overlapping(fake_db, user_id, next_day, datetime(2030, 5, 7, 10)) == []
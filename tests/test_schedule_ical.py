@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from starlette.requests import Request
+
+import api.schedule as schedule_module
+from api.app.services.ical import _fold, event_fields, read_vevents
+
+
+def _upload(body: bytes, chunk_size: int = 37) -> Request:
+    chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {"type": "http", "method": "POST", "path": "/schedule-events/import", "headers": []}
+    return Request(scope, receive)
+
+
+async def _export(user_id: ObjectId, **window) -> bytes:
+    response = await schedule_module.export_calendar(
+        user_id=str(user_id), start_after=window.get("start_after"), start_before=window.get("start_before")
+    )
+    assert response.media_type.startswith("text/calendar")
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def _items(response) -> list[dict]:
+    return json.loads(response.body)["items"]
+
+
+async def _aiter(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_long_lines_fold_at_75_octets():
+    line = "DESCRIPTION:" + "é" * 60
+    folded = _fold(line)
+    physical = folded.split("\r\n")[:-1]
+    assert all(len(part.encode("utf-8")) <= 75 for part in physical)
+    assert "".join(part[1:] if n else part for n, part in enumerate(physical)) == line
+
+
+@pytest.mark.anyio("asyncio")
+async def test_export_round_trips_through_import(fake_db):
+    user_id = ObjectId()
+    start = datetime(2030, 5, 6, 9)
+    standup = await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id,
+            title="Standup; daily, short",
+            description="Line one\nLine two " + "x" * 120,
+            start_time=start,
+            end_time=start + timedelta(minutes=15),
+            rrule="FREQ=DAILY;COUNT=5",
+        )
+    )
+    await schedule_module.update_occurrence(
+        str(standup.id),
+        schedule_module.ScheduleOccurrenceUpdate(
+            original_start_time=start + timedelta(days=1), start_time=start + timedelta(days=1, hours=1)
+        ),
+    )
+    await schedule_module.cancel_occurrence(str(standup.id), original_start_time=start + timedelta(days=2))
+    await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id, title="Review", start_time=start + timedelta(hours=3), end_time=start + timedelta(hours=4)
+        )
+    )
+
+    body = await _export(user_id, start_after=start - timedelta(days=1))
+    text = body.decode("utf-8")
+    assert text.startswith("BEGIN:VCALENDAR\r\n") and text.endswith("END:VCALENDAR\r\n")
+    assert r"SUMMARY:Standup\; daily\, short" in text
+    assert "EXDATE:20300508T090000Z" in text
+    assert "RECURRENCE-ID:20300507T090000Z" in text
+
+    other = ObjectId()
+    report = await schedule_module.import_calendar(_upload(body), user_id=str(other))
+    assert (report.imported, report.overrides, report.skipped, report.complete) == (2, 1, 0, True)
+    assert report.batches == 1
+
+    def listing(owner):
+        return schedule_module.list_events(
+            user_id=str(owner), start_after=start - timedelta(days=1), start_before=start + timedelta(days=7), fields=None
+        )
+
+    original = [(i["title"], i["start_time"], i.get("description")) for i in _items(await listing(user_id))]
+    imported = [(i["title"], i["start_time"], i.get("description")) for i in _items(await listing(other))]
+    assert imported == original
+    assert len(original) == 5
+
+
+@pytest.mark.anyio("asyncio")
+async def test_import_reports_bad_events_and_writes_in_batches(fake_db, monkeypatch):
+    monkeypatch.setattr(schedule_module, "IMPORT_BATCH_SIZE", 2)
+    events = "".join(
+        f"BEGIN:VEVENT\r\nUID:e{n}\r\nDTSTART:2030060{n}T100000Z\r\nDURATION:PT30M\r\nSUMMARY:Event {n}\r\n"
+        "BEGIN:VALARM\r\nTRIGGER:-PT5M\r\nEND:VALARM\r\nEND:VEVENT\r\n"
+        for n in range(1, 6)
+    )
+    body = (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        + events
+        + "BEGIN:VEVENT\r\nUID:broken\r\nSUMMARY:No start\r\nEND:VEVENT\r\n"
+        + "BEGIN:VEVENT\r\nUID:orphan\r\nRECURRENCE-ID:20300601T100000Z\r\nDTSTART:20300601T110000Z\r\nEND:VEVENT\r\n"
+        + "END:VCALENDAR\r\n"
+    ).encode("utf-8")
+
+    report = await schedule_module.import_calendar(_upload(body, chunk_size=11), user_id=str(ObjectId()))
+    assert (report.imported, report.skipped, report.batches) == (5, 2, 3)
+    assert [(issue.line, issue.error) for issue in report.errors] == [
+        (48, "VEVENT has no DTSTART"),
+        (52, "RECURRENCE-ID does not follow a recurring event with the same UID"),
+    ]
+    assert fake_db.schedule_events.round_trips == 3
+    assert report.events_per_second > 0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_parser_unfolds_lines_and_converts_zones():
+    body = (
+        b"\xef\xbb\xbfBEGIN:VCALENDAR\nBEGIN:VEVENT\nDTSTART;TZID=\"Europe/Berlin\":20300701T090000\n"
+        b"DTEND;VALUE=DATE:20300702\nSUMMARY:Folded\n  title\nRRULE:FREQ=WEEKLY;COUNT=3\n"
+        b"EXDATE:20300708T070000Z,20300715T070000Z\nEND:VEVENT\nEND:VCALENDAR"
+    )
+    parsed = [item async for item in read_vevents(_aiter(body[:20], body[20:61], body[61:]))]
+    assert [line for line, _ in parsed] == [2]
+    fields = event_fields(parsed[0][1])
+    assert fields["title"] == "Folded title"
+    assert fields["start_time"] == datetime(2030, 7, 1, 7)
+    assert fields["rrule"] == "FREQ=WEEKLY;COUNT=3"
+    assert sorted(fields["exceptions"]) == ["20300708T070000", "20300715T070000"]
+
+    with pytest.raises(ValueError):
+        [item async for item in read_vevents(_aiter(b"BEGIN:VCALENDAR\nnot a content line\n"))]
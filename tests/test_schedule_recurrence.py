@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import api.schedule as schedule_module
+from api.app.services.freebusy import get_free_intervals
+from api.app.services.recurrence import occurrences, parse_rrule
+
+
+def test_rules_expand_lazily_within_the_window():
+    weekly = parse_rrule("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;UNTIL=20300215")
+    assert list(occurrences(weekly, datetime(2030, 1, 2, 9))) == [
+        datetime(2030, 1, 2, 9),
+        datetime(2030, 1, 14, 9),
+        datetime(2030, 1, 16, 9),
+        datetime(2030, 1, 28, 9),
+        datetime(2030, 1, 30, 9),
+        datetime(2030, 2, 11, 9),
+        datetime(2030, 2, 13, 9),
+    ]
+
+    month_ends = parse_rrule("FREQ=MONTHLY;BYMONTHDAY=-1")
+    assert list(occurrences(month_ends, datetime(2030, 1, 31), before=datetime(2030, 4, 1))) == [
+        datetime(2030, 1, 31),
+        datetime(2030, 2, 28),
+        datetime(2030, 3, 31),
+    ]
+
+    # An open-ended rule jumps straight to the requested window.
+    daily = occurrences(parse_rrule("FREQ=DAILY"), datetime(2000, 1, 1, 9), after=datetime(2030, 6, 1))
+    assert next(daily) == datetime(2030, 6, 1, 9)
+
+    for bad in ("FREQ=HOURLY", "FREQ=WEEKLY;BYDAY=1MO", "FREQ=DAILY;COUNT=2;UNTIL=20300101"):
+        with pytest.raises(ValueError):
+            parse_rrule(bad)
+
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2030, 5, day, hour, minute)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_series_is_stored_once_and_expanded_on_read(fake_db):
+    user_id = ObjectId()
+    standup = await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id,
+            title="Standup",
+            start_time=_at(6, 9),
+            end_time=_at(6, 9, 15),
+            rrule="FREQ=DAILY;COUNT=30",
+        )
+    )
+    assert len(fake_db.schedule_events.docs) == 1
+
+    moved = await schedule_module.update_occurrence(
+        str(standup.id),
+        schedule_module.ScheduleOccurrenceUpdate(
+            original_start_time=_at(8, 9), start_time=_at(8, 10), title="Late standup"
+        ),
+    )
+    assert (moved.start_time, moved.end_time) == (_at(8, 10), _at(8, 10, 15))
+    await schedule_module.cancel_occurrence(str(standup.id), original_start_time=_at(9, 9))
+
+    with pytest.raises(HTTPException) as excinfo:
+        await schedule_module.cancel_occurrence(str(standup.id), original_start_time=_at(9, 11))
+    assert excinfo.value.status_code == 404
+
+    listing = await schedule_module.list_events(
+        user_id=str(user_id), start_after=_at(7, 0), start_before=_at(10, 23), fields=None
+    )
+    items = json.loads(listing.body)["items"]
+    assert [(item["title"], item["start_time"]) for item in items] == [
+        ("Standup", "2030-05-07T09:00:00"),
+        ("Late standup", "2030-05-08T10:00:00"),
+        ("Standup", "2030-05-10T09:00:00"),
+    ]
+    assert {item["recurring_event_id"] for item in items} == {str(standup.id)}
+
+    free = await get_free_intervals(fake_db, str(user_id), _at(8, 9), _at(8, 11), block_minutes=15)
+    assert free == [
+        {"start": _at(8, 9), "end": _at(8, 10)},
+        {"start": _at(8, 10, 15), "end": _at(8, 11)},
+    ]
+
+    clash = await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id, title="1:1", start_time=_at(12, 9, 10), end_time=_at(12, 9, 40)
+        )
+    )
+    assert [(c.id, c.original_start_time) for c in clash.conflicts] == [(standup.id, _at(12, 9))]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_invalid_rule_is_rejected(fake_db):
+    with pytest.raises(HTTPException) as excinfo:
+        await schedule_module.create_event(
+            schedule_module.ScheduleEventCreate(
+                user_id=ObjectId(),
+                title="Gym",
+                start_time=_at(6, 7),
+                end_time=_at(6, 8),
+                rrule="FREQ=SOMETIMES",
+            )
+        )
+    assert excinfo.value.status_code == 400
+    assert fake_db.schedule_events.docs == []
+
+
+@pytest.mark.anyio("asyncio")
+async def test_cancel_occurrence_of_a_series_deleted_mid_request_returns_404(fake_db, monkeypatch):
+    standup = await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=ObjectId(),
+            title="Standup",
+            start_time=_at(6, 9),
+            end_time=_at(6, 9, 15),
+            rrule="FREQ=DAILY;COUNT=30",
+        )
+    )
+    load_series = schedule_module._load_series
+
+    async def load_then_delete(events, oid):
+        master = await load_series(events, oid)
+        await events.delete_one({"_id": oid})
+        return master
+
+    monkeypatch.setattr(schedule_module, "_load_series", load_then_delete)
+    with pytest.raises(HTTPException) as excinfo:
+        await schedule_module.cancel_occurrence(str(standup.id), original_start_time=_at(9, 9))
+    assert excinfo.value.status_code == 404
+    assert [doc["op"] for doc in fake_db.changes.docs] == ["create"]
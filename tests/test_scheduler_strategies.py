@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import api.routes.scheduler as scheduler_module
+from api.app.services.planner import PlanItem, chunked, deadline_order, plan
+
+
+def _at(hour: int, minute: int = 0, day: int = 6) -> datetime:
+    return datetime(2030, 5, day, hour, minute)
+
+
+def _free(*spans: tuple[datetime, datetime]) -> list[dict[str, datetime]]:
+    return [{"start": start, "end": end} for start, end in spans]
+
+
+def test_best_fit_uses_the_tightest_interval():
+    intervals = _free((_at(8), _at(10)), (_at(11), _at(11, 30)), (_at(13), _at(14)))
+    items = [PlanItem("short", timedelta(minutes=30)), PlanItem("long", timedelta(hours=2))]
+
+    first, overflow = plan("first_fit", intervals, items)
+    assert ([p.start for p in first], overflow) == ([_at(8)], ["long"])
+
+    best, overflow = plan("best_fit", intervals, items)
+    assert [(p.task_id, p.start, p.end) for p in best] == [
+        ("short", _at(11), _at(11, 30)),
+        ("long", _at(8), _at(10)),
+    ]
+    assert overflow == []
+    # The leftover of a split interval goes back into the index.
+    best, _ = plan("best_fit", intervals, [PlanItem(str(n), timedelta(minutes=40)) for n in range(4)])
+    assert [p.start for p in best] == [_at(13), _at(8), _at(8, 40), _at(9, 20)]
+
+
+def test_best_fit_matches_a_scan_for_the_tightest_interval():
+    rng = random.Random(11)
+    intervals, cursor = [], _at(0)
+    for _ in range(200):
+        cursor += timedelta(minutes=rng.randrange(5, 60, 5))
+        end = cursor + timedelta(minutes=rng.randrange(15, 240, 15))
+        intervals.append({"start": cursor, "end": end})
+        cursor = end
+    items = [PlanItem(str(n), timedelta(minutes=rng.randrange(15, 180, 15))) for n in range(300)]
+
+    free = [dict(interval) for interval in intervals]
+    expected, missed = [], []
+    for item in items:
+        fits = [interval for interval in free if interval["end"] - interval["start"] >= item.duration]
+        if not fits:
+            missed.append(item.task_id)
+            continue
+        tightest = min(fits, key=lambda interval: (interval["end"] - interval["start"], interval["start"]))
+        expected.append((item.task_id, tightest["start"]))
+        tightest["start"] += item.duration
+
+    placements, overflow = plan("best_fit", intervals, items)
+    assert [(p.task_id, p.start) for p in placements] == expected
+    assert overflow == missed
+
+
+def test_edf_orders_by_deadline_then_priority():
+    items = [
+        PlanItem("undated", timedelta(minutes=30)),
+        PlanItem("friday-low", timedelta(minutes=30), _at(17, day=10), "low"),
+        PlanItem("friday-high", timedelta(minutes=30), _at(17, day=10), "high"),
+        PlanItem("today", timedelta(minutes=30), _at(17), 0),
+    ]
+    assert [item.task_id for item in deadline_order(items)] == ["today", "friday-high", "friday-low", "undated"]
+
+    placements, overflow = plan("edf", _free((_at(9), _at(10)), (_at(12), _at(13))), items)
+    assert [(p.task_id, p.start) for p in placements] == [
+        ("today", _at(9)),
+        ("friday-high", _at(9, 30)),
+        ("friday-low", _at(12)),
+        ("undated", _at(12, 30)),
+    ]
+    assert overflow == []
+    with pytest.raises(ValueError):
+        plan("random", [], items)
+
+
+def test_edf_without_deadlines_matches_first_fit():
+    rng = random.Random(3)
+    for _ in range(25):
+        cursor, intervals = _at(8), []
+        for _ in range(rng.randrange(1, 60)):
+            cursor += timedelta(minutes=15 * rng.randrange(1, 8))
+            end = cursor + timedelta(minutes=15 * rng.randrange(1, 12))
+            intervals.append({"start": cursor, "end": end})
+            cursor = end
+        items = [PlanItem(str(n), timedelta(minutes=15 * rng.randrange(1, 10))) for n in range(rng.randrange(80))]
+        assert plan("edf", intervals, items) == plan("first_fit", intervals, items)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_edf_plan_reads_stored_due_dates(fake_db):
+    user_id = ObjectId()
+    later, sooner = ObjectId(), ObjectId()
+    fake_db.tasks.docs.extend(
+        [
+            {"_id": later, "user_id": user_id, "description": "Later", "due_date": _at(9, day=20), "priority": "high"},
+            {"_id": sooner, "user_id": user_id, "description": "Sooner", "due_date": _at(9, day=8), "priority": "low"},
+        ]
+    )
+    payload = scheduler_module.PlanIn(
+        user_id=str(user_id),
+        tasks=[
+            {"_id": "adhoc", "duration_minutes": 30},
+            {"_id": str(later), "duration_minutes": 60},
+            {"_id": str(sooner), "duration_minutes": 45},
+        ],
+        window={"start": _at(9), "end": _at(12)},
+        strategy="edf",
+    )
+
+    result = await scheduler_module.scheduler_plan(payload)
+    assert [(block.task_id, block.start_time) for block in result.blocks] == [
+        (str(sooner), _at(9)),
+        (str(later), _at(10)),
+        ("adhoc", _at(11)),
+    ]
+    assert fake_db.tasks.round_trips == 1
+
+
+def test_chunking_splits_tasks_across_intervals():
+    intervals = _free(
+        (_at(8), _at(9)),
+        (_at(10), _at(10, 15)),  # too short for a chunk
+        (_at(11), _at(12, 45)),
+        (_at(14), _at(16)),
+    )
+    items = [PlanItem("report", timedelta(hours=3)), PlanItem("memo", timedelta(hours=2, minutes=15))]
+    placements, overflow = chunked(intervals, items, timedelta(minutes=30))
+
+    assert [(p.task_id, p.start, p.end) for p in placements] == [
+        ("report", _at(8), _at(9)),
+        # 1h45 would leave a 15-minute tail, so a whole chunk is kept for later.
+        ("report", _at(11), _at(12, 30)),
+        ("report", _at(14), _at(14, 30)),
+    ]
+    # Only 1h30 of usable time is left.
+    assert overflow == ["memo"]
+
+    # Under two chunks left: the task ends in the first interval that holds the rest.
+    intervals = _free((_at(8), _at(9)), (_at(10), _at(10, 40)), (_at(11), _at(11, 50)))
+    placements, overflow = chunked(intervals, [PlanItem("essay", timedelta(minutes=110))], timedelta(minutes=30))
+    assert [(p.start, p.end) for p in placements] == [(_at(8), _at(9)), (_at(11), _at(11, 50))]
+    assert overflow == []
+
+
+def test_chunking_places_whole_tasks_first_including_short_gaps():
+    intervals = _free((_at(0), _at(0, 20)), (_at(1), _at(2)))
+    items = [PlanItem("hour", timedelta(hours=1)), PlanItem("quick", timedelta(minutes=15))]
+
+    placements, overflow = chunked(intervals, items, timedelta(minutes=30))
+    assert [(p.task_id, p.start, p.end) for p in placements] == [
+        ("hour", _at(1), _at(2)),
+        ("quick", _at(0), _at(0, 15)),
+    ]
+    assert overflow == []
+
+
+def test_chunking_overflows_tasks_that_cannot_finish_untouched():
+    intervals = _free((_at(8), _at(9)), (_at(10), _at(10, 20)), (_at(11), _at(11, 20)))
+    items = [
+        PlanItem("fragmented", timedelta(minutes=100)),
+        PlanItem("too-big", timedelta(hours=3)),
+        PlanItem("fits", timedelta(hours=1)),
+    ]
+    placements, overflow = chunked(intervals, items, timedelta(minutes=30))
+    assert [(p.task_id, p.start, p.end) for p in placements] == [("fits", _at(8), _at(9))]
+    assert overflow == ["fragmented", "too-big"]
+    assert chunked([], items, timedelta(minutes=30)) == ([], ["fragmented", "too-big", "fits"])
+
+
+def _random_plan(rng: random.Random, intervals: int, tasks: int):
+    free, cursor = [], _at(0)
+    for _ in range(intervals):
+        cursor += timedelta(minutes=rng.randrange(5, 60, 5))
+        end = cursor + timedelta(minutes=rng.randrange(5, 150, 5))
+        free.append({"start": cursor, "end": end})
+        cursor = end
+    items = [PlanItem(str(n), timedelta(minutes=rng.randrange(5, 300, 5))) for n in range(tasks)]
+    return free, items
+
+
+def test_chunking_never_places_fewer_tasks_than_first_fit():
+    rng = random.Random(5)
+    min_chunk = timedelta(minutes=30)
+    for _ in range(200):
+        intervals, items = _random_plan(rng, rng.randrange(1, 30), rng.randrange(1, 30))
+        whole, _ = plan("first_fit", intervals, items)
+        placements, overflow = chunked(intervals, items, min_chunk)
+
+        placed = {p.task_id for p in placements}
+        assert {p.task_id for p in whole} <= placed
+        assert placed.isdisjoint(overflow) and len(placed) + len(overflow) == len(items)
+        for item in items:
+            chunks = [p for p in placements if p.task_id == item.task_id]
+            if chunks:
+                assert sum((p.end - p.start for p in chunks), timedelta(0)) == item.duration
+                assert len(chunks) == 1 or all(p.end - p.start >= min_chunk for p in chunks)
+        spans = sorted((p.start, p.end) for p in placements)
+        assert all(end <= next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+        assert all(
+            any(i["start"] <= start and end <= i["end"] for i in intervals) for start, end in spans
+        )
+
+
+def test_chunking_scales_near_linearly():
+    def best_time(size: int) -> float:
+        # 40-minute intervals between 20-minute ones. 80-minute tasks split in
+        # two; 50-minute ones cannot finish, which used to rescan the rest.
+        intervals, cursor = [], _at(0)
+        for n in range(size):
+            end = cursor + timedelta(minutes=20 if n % 2 else 40)
+            intervals.append({"start": cursor, "end": end})
+            cursor = end + timedelta(minutes=10)
+        items = [PlanItem(str(n), timedelta(minutes=80 if n % 8 == 0 else 50)) for n in range(size)]
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            placements, _ = chunked(intervals, items, timedelta(minutes=30))
+            timings.append(time.perf_counter() - started)
+        assert len(placements) == 2 * len(range(0, size, 8))
+        return min(timings)
+
+    small, large = best_time(1_000), best_time(8_000)
+    # 8x the input; quadratic growth would be about 64x.
+    assert large < small * 24
+
+
+@pytest.mark.anyio("asyncio")
+async def test_plan_returns_several_blocks_per_chunked_task(fake_db):
+    user_id = ObjectId()
+    fake_db.schedule_events.docs.append(
+        {"_id": ObjectId(), "user_id": user_id, "title": "Lunch", "start_time": _at(12), "end_time": _at(13)}
+    )
+    window = {"start": _at(10), "end": _at(15)}
+    tasks = [{"_id": "deep-work", "duration_minutes": 200}]
+
+    whole = await scheduler_module.scheduler_plan(
+        scheduler_module.PlanIn(user_id=str(user_id), tasks=tasks, window=window)
+    )
+    assert whole.overflow == ["deep-work"]
+
+    split = await scheduler_module.scheduler_plan(
+        scheduler_module.PlanIn(user_id=str(user_id), tasks=tasks, window=window, min_chunk_minutes=45)
+    )
+    assert [(block.start_time, block.end_time) for block in split.blocks] == [
+        (_at(10), _at(12)),
+        (_at(13), _at(14, 30)),
+    ]
+    assert {block.task_id for block in split.blocks} == {"deep-work"}
+
+    with pytest.raises(HTTPException) as excinfo:
+        await scheduler_module.scheduler_plan(
+            scheduler_module.PlanIn(
+                user_id=str(user_id), tasks=tasks, window=window, strategy="best_fit", min_chunk_minutes=30
+            )
+        )
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import AutoReconnect
+
+import api.schedule as schedule_module
+import api.tasks as tasks_module
+import api.users as users_module
+from api.app.migrations import migrate, migrate_collection, schema_state
+from api.app.schemas.common import SCHEMA_VERSIONS, is_trusted
+
+
+def _legacy_tasks(user_id: ObjectId) -> list[dict]:
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "description": f"Legacy {n}",
+            "priority": n % 3,
+            "created_at": datetime(2024, 1, n + 1),
+            "subtasks": [{"_id": ObjectId(), "description": "Step", "duration_min": 10 + n}],
+        }
+        for n in range(5)
+    ]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_migration_normalises_and_stamps_legacy_documents(fake_db):
+    user_id = ObjectId()
+    fake_db.tasks.docs.extend(_legacy_tasks(user_id))
+    fake_db.schedule_events.docs.append(
+        {"_id": ObjectId(), "user_id": user_id, "title": "Old", "date": datetime(2024, 2, 1, 9)}
+    )
+    fake_db.habit_logs.docs.append(
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "habit_id": ObjectId(),
+            "date": datetime(2024, 2, 1),
+            "status": " Done",
+        }
+    )
+    args = dict(user_id=str(user_id), is_completed=None, limit=None, cursor=None, fields=None)
+    before = json.loads((await tasks_module.list_tasks(**args)).model_dump_json(by_alias=True))
+
+    reports = await migrate(fake_db, ("tasks", "schedule_events", "habit_logs"), batch_size=2)
+
+    assert [(r.collection, r.migrated, r.batches, r.complete) for r in reports] == [
+        ("tasks", 5, 3, True),
+        ("schedule_events", 1, 1, True),
+        ("habit_logs", 1, 1, True),
+    ]
+    task = fake_db.tasks.docs[1]
+    assert task["priority"] == "medium"
+    assert task["subtasks"][0]["duration_minutes"] == 11
+    assert "duration_min" not in task["subtasks"][0]
+    assert task["search_grams"]
+    event = fake_db.schedule_events.docs[0]
+    assert (event["start_time"], event["end_time"]) == (datetime(2024, 2, 1, 9), datetime(2024, 2, 1, 10))
+    assert fake_db.habit_logs.docs[0]["status"] == "completed"
+    assert all(is_trusted("tasks", doc) for doc in fake_db.tasks.docs)
+
+    # The fast path encodes the stamped documents to the same body as before.
+    after = json.loads((await tasks_module.list_tasks(**args)).body)
+    assert after == before
+    assert [item["subtasks"][0]["duration_minutes"] for item in after["items"]] == [14, 13, 12, 11, 10]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_interrupted_migration_resumes_from_its_checkpoint(fake_db, monkeypatch):
+    fake_db.tasks.docs.extend(_legacy_tasks(ObjectId()))
+    original = fake_db.tasks.bulk_write
+    calls = 0
+
+    async def flaky(requests, ordered=True):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise AutoReconnect("connection lost")
+        return await original(requests, ordered=ordered)
+
+    monkeypatch.setattr(fake_db.tasks, "bulk_write", flaky)
+    with pytest.raises(AutoReconnect):
+        await migrate_collection(fake_db, "tasks", batch_size=2)
+    checkpoint = fake_db.schema_migrations.docs[0]
+    assert checkpoint["last_id"] == fake_db.tasks.docs[1]["_id"]
+    assert not checkpoint["finished"]
+    assert not schema_state.is_ready("tasks")
+
+    report = await migrate_collection(fake_db, "tasks", batch_size=2)
+    assert (report.resumed, report.migrated, report.complete) == (True, 3, True)
+    assert all(doc["schema_version"] == SCHEMA_VERSIONS["tasks"] for doc in fake_db.tasks.docs)
+    assert schema_state.is_ready("tasks")
+
+    schema_state.clear()
+    await schema_state.load(fake_db)
+    assert schema_state.is_ready("tasks")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_invalid_documents_keep_the_legacy_path_on(fake_db):
+    user_id = ObjectId()
+    fake_db.schedule_events.docs.append({"_id": ObjectId(), "user_id": ObjectId(), "title": "No times"})
+    fake_db.schedule_events.docs.append(
+        {"_id": ObjectId(), "user_id": user_id, "title": "Ok", "timestamp": datetime(2024, 3, 1, 8)}
+    )
+
+    report = await migrate_collection(fake_db, "schedule_events")
+    assert (report.migrated, report.skipped, report.complete) == (1, 1, False)
+    assert not schema_state.is_ready("schedule_events")
+
+    listing = await schedule_module.list_events(
+        user_id=str(user_id), start_after=None, start_before=None, fields="title"
+    )
+    assert [item["title"] for item in json.loads(listing.body)["items"]] == ["Ok"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_users_are_rekeyed_and_looked_up_once(fake_db):
+    fake_db.users.unique_keys.append("email")
+    oid = ObjectId()
+    fake_db.users.docs.extend(
+        [
+            {"_id": str(oid), "email": "a@example.com", "name": "A", "created_at": datetime(2024, 1, 1)},
+            {"_id": ObjectId(), "email": "b@example.com", "name": "B", "created_at": datetime(2024, 1, 2)},
+        ]
+    )
+
+    report = await migrate_collection(fake_db, "users")
+    assert (report.migrated, report.complete) == (1, True)
+    assert [doc["_id"] for doc in fake_db.users.docs if doc["email"] == "a@example.com"] == [oid]
+
+    fake_db.users.round_trips = 0
+    user = await users_module.get_user(str(oid))
+    assert user.email == "a@example.com"
+    assert fake_db.users.round_trips == 1
+
+    with pytest.raises(HTTPException) as excinfo:
+        await users_module.get_user("not-an-id")
+    assert excinfo.value.status_code == 404
+
+
+@pytest.mark.anyio("asyncio")
+async def test_user_rekey_interrupted_after_the_delete_is_restored(fake_db, monkeypatch):
+    fake_db.users.unique_keys.append("email")
+    first, second = ObjectId(), ObjectId()
+    fake_db.users.docs.extend(
+        [
+            {"_id": str(first), "email": "a@example.com", "name": "A", "created_at": datetime(2024, 1, 1)},
+            {"_id": str(second), "email": "b@example.com", "name": "B", "created_at": datetime(2024, 1, 2)},
+        ]
+    )
+    original = fake_db.users.insert_one
+
+    async def lost_connection(doc):
+        if doc["_id"] == second:
+            raise AutoReconnect("connection lost")
+        return await original(doc)
+
+    monkeypatch.setattr(fake_db.users, "insert_one", lost_connection)
+    with pytest.raises(AutoReconnect):
+        await migrate_collection(fake_db, "users")
+    assert [doc["_id"] for doc in fake_db.users.docs] == [first]
+    assert fake_db.schema_migrations.docs[0]["pending"]["email"] == "b@example.com"
+
+    monkeypatch.setattr(fake_db.users, "insert_one", original)
+    report = await migrate_collection(fake_db, "users")
+    assert (report.resumed, report.complete) == (True, True)
+    assert sorted(doc["_id"] for doc in fake_db.users.docs) == sorted([first, second])
+    assert {doc["email"] for doc in fake_db.users.docs} == {"a@example.com", "b@example.com"}
+    assert fake_db.schema_migrations.docs[0]["pending"] is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_schema_versions_are_tracked_per_collection(fake_db):
+    # Records and stamps from before schedule events moved to version 2.
+    fake_db.schema_migrations.docs.extend(
+        [
+            {"_id": "tasks", "schema_version": 1, "finished": True, "complete": True},
+            {"_id": "schedule_events", "schema_version": 1, "finished": True, "complete": True},
+        ]
+    )
+    await schema_state.load(fake_db)
+    assert schema_state.is_ready("tasks")
+    assert not schema_state.is_ready("schedule_events")
+
+    assert is_trusted("tasks", {"schema_version": 1})
+    assert not is_trusted("schedule_events", {"schema_version": 1})
+    assert is_trusted("schedule_events", {"schema_version": SCHEMA_VERSIONS["schedule_events"]})
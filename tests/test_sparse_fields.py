@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import api.schedule as schedule_module
+import api.tasks as tasks_module
+
+
+@pytest.mark.anyio("asyncio")
+async def test_list_tasks_returns_only_requested_fields(fake_db):
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    fake_db.tasks.docs = [
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "description": "Plan trip",
+            "is_completed": False,
+            "priority": 2,
+            "created_at": now,
+            "subtasks": [{"_id": ObjectId(), "description": "Book flights"}],
+        }
+    ]
+
+    response = await tasks_module.list_tasks(
+        user_id=str(user_id), is_completed=None, limit=None, cursor=None, fields="description,is_completed"
+    )
+    body = json.loads(response.body)
+
+    assert body["total"] == 1
+    assert set(body["items"][0]) == {"_id", "description", "is_completed"}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_list_events_sparse_and_unknown_field(fake_db):
+    user_id = ObjectId()
+    start = datetime(2024, 5, 1, 9)
+    fake_db.schedule_events.docs = [
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "title": "Standup",
+            "start_time": start,
+            "end_time": start.replace(hour=10),
+        }
+    ]
+
+    response = await schedule_module.list_events(
+        user_id=str(user_id), start_after=None, start_before=None, fields="title"
+    )
+    assert json.loads(response.body)["items"] == [
+        {"_id": str(fake_db.schedule_events.docs[0]["_id"]), "title": "Standup"}
+    ]
+
+    with pytest.raises(HTTPException) as exc:
+        await schedule_module.list_events(
+            user_id=str(user_id), start_after=None, start_before=None, fields="title,colour"
+        )
+    assert exc.value.status_code == 400
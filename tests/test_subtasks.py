@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import api.routes.tasks_split as subtasks_module
+import api.tasks as tasks_module
+
+
+async def _task_with_subtasks(count: int):
+    task = await tasks_module.create_task(
+        tasks_module.TaskCreate(user_id=ObjectId(), description="Trip")
+    )
+    created = await subtasks_module.create_subtasks_bulk(
+        str(task.id),
+        subtasks_module.SubtaskBulkIn(
+            items=[subtasks_module.SubtaskItem(description=f"Step {n}") for n in range(count)]
+        ),
+    )
+    return task, created.items
+
+
+def _stored_descriptions(fake_db, task_id) -> list[str]:
+    doc = next(doc for doc in fake_db.tasks.docs if doc["_id"] == task_id)
+    return [item["description"] for item in doc["subtasks"]]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_patch_and_delete_touch_only_the_target_subtask(fake_db):
+    task, items = await _task_with_subtasks(3)
+
+    updated = await subtasks_module.update_subtask(
+        str(task.id), str(items[1].id), subtasks_module.SubtaskUpdate(is_completed=True)
+    )
+    assert updated.id == items[1].id
+    assert updated.is_completed
+
+    doc = next(doc for doc in fake_db.tasks.docs if doc["_id"] == task.id)
+    assert [item["is_completed"] for item in doc["subtasks"]] == [False, True, False]
+
+    removed = await subtasks_module.delete_subtask(str(task.id), str(items[0].id))
+    assert removed.description == "Step 0"
+    assert _stored_descriptions(fake_db, task.id) == ["Step 1", "Step 2"]
+
+    with pytest.raises(HTTPException) as excinfo:
+        await subtasks_module.delete_subtask(str(task.id), str(items[0].id))
+    assert excinfo.value.status_code == 404
+
+
+@pytest.mark.anyio("asyncio")
+async def test_reorder_and_paged_read(fake_db):
+    task, items = await _task_with_subtasks(4)
+
+    moved = await subtasks_module.reorder_subtask(
+        str(task.id), subtasks_module.SubtaskMoveIn(subtask_id=str(items[3].id), position=0)
+    )
+    assert moved.id == items[3].id
+    assert _stored_descriptions(fake_db, task.id) == ["Step 3", "Step 0", "Step 1", "Step 2"]
+
+    page = await subtasks_module.list_subtasks(str(task.id), offset=2, limit=2)
+    assert [item.description for item in page.items] == ["Step 1", "Step 2"]
+    assert page.total == 4
+    assert page.page is None
+
+    # Offsets that are not a multiple of the limit still report the full count.
+    page = await subtasks_module.list_subtasks(str(task.id), offset=3, limit=2)
+    assert [item.description for item in page.items] == ["Step 2"]
+    assert page.total == 4
+
+
+@pytest.mark.anyio("asyncio")
+async def test_reorder_is_one_write_and_clamps_past_the_end(fake_db):
+    task, items = await _task_with_subtasks(4)
+
+    fake_db.tasks.round_trips = 0
+    await subtasks_module.reorder_subtask(
+        str(task.id), subtasks_module.SubtaskMoveIn(subtask_id=str(items[0].id), position=2)
+    )
+    assert fake_db.tasks.round_trips == 1
+    assert _stored_descriptions(fake_db, task.id) == ["Step 1", "Step 2", "Step 0", "Step 3"]
+
+    await subtasks_module.reorder_subtask(
+        str(task.id), subtasks_module.SubtaskMoveIn(subtask_id=str(items[1].id), position=10)
+    )
+    assert _stored_descriptions(fake_db, task.id) == ["Step 2", "Step 0", "Step 3", "Step 1"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_reorder_unknown_subtask_returns_404(fake_db):
+    task, _ = await _task_with_subtasks(2)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await subtasks_module.reorder_subtask(
+            str(task.id), subtasks_module.SubtaskMoveIn(subtask_id=str(ObjectId()), position=0)
+        )
+    assert excinfo.value.status_code == 404
+    assert _stored_descriptions(fake_db, task.id) == ["Step 0", "Step 1"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_split_route_is_registered_next_to_the_subtask_routes():
+    routes = {(route.path, method) for route in subtasks_module.router.routes for method in route.methods}
+    assert {
+        ("/tasks/ai/split", "POST"),
+        ("/tasks/{task_id}/subtasks", "GET"),
+        ("/tasks/{task_id}/subtasks/reorder", "POST"),
+        ("/tasks/{task_id}/subtasks/{subtask_id}", "PATCH"),
+    } <= routes
+
+    result = await subtasks_module.split_text(subtasks_module.SplitIn(text="Pack bags. Book taxi."))
+    assert result.steps
@@ -5,7 +5,9 @@ from datetime import datetime, timedelta
 import pytest
 from bson import ObjectId
 
+import api.schedule as schedule_module
 import api.summary as summary_module
+from api.app.services.local_time import today_bounds
 
 
 @pytest.mark.anyio("asyncio")
@@ -62,3 +64,33 @@ async def test_summary_returns_counts(fake_db):
     assert result["habits_logged_today"] == 2
     assert "daily" not in result["speech"].lower()
     assert "You have 2 open tasks" in result["speech"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_summary_expands_recurring_events_for_today(fake_db):
+    user_id = ObjectId()
+    start, _ = today_bounds("UTC")
+    await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id,
+            title="Standup",
+            start_time=start - timedelta(days=3) + timedelta(hours=9),
+            end_time=start - timedelta(days=3) + timedelta(hours=9, minutes=15),
+            rrule="FREQ=DAILY",
+        )
+    )
+    for hour in range(10, 16):
+        fake_db.schedule_events.docs.append(
+            {
+                "_id": ObjectId(),
+                "user_id": user_id,
+                "title": f"Meeting {hour}",
+                "start_time": start + timedelta(hours=hour),
+                "end_time": start + timedelta(hours=hour, minutes=30),
+            }
+        )
+
+    result = await summary_module.summary(user_id=str(user_id))
+    # Today's standup occurrence sorts first; the list is capped at five.
+    assert result["events_count"] == 5
+    assert "Today's schedule includes Standup, Meeting 10, Meeting 11" in result["speech"]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import api.habits as habits_module
+import api.sync as sync_module
+import api.tasks as tasks_module
+
+
+@pytest.fixture
+def no_settle(monkeypatch):
+    # Let entries written a moment ago through the settle window.
+    monkeypatch.setattr(sync_module, "_SETTLE_WINDOW", timedelta(seconds=-5))
+
+
+def _token_before_now() -> str:
+    return str(ObjectId.from_datetime(datetime.utcnow() - timedelta(seconds=1)))
+
+
+@pytest.mark.anyio("asyncio")
+async def test_delta_collapses_ops_and_emits_tombstones(fake_db, no_settle):
+    user_id = ObjectId()
+    legacy_id = ObjectId()
+    fake_db.tasks.docs.append(
+        {"_id": legacy_id, "user_id": user_id, "description": "Old", "is_completed": False}
+    )
+    since = _token_before_now()
+
+    kept = await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description="Keep"))
+    await tasks_module.update_task(str(kept.id), tasks_module.TaskUpdate(priority="high"))
+    transient = await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description="Gone"))
+    await tasks_module.delete_task(str(transient.id))
+    await tasks_module.delete_task(str(legacy_id))
+    habit = await habits_module.create_habit(habits_module.HabitCreate(user_id=user_id, name="Read"))
+
+    delta = await sync_module.sync(user_id=str(user_id), since=since, limit=100)
+
+    assert not delta.reset and not delta.has_more
+    assert [task.id for task in delta.tasks.created] == [kept.id]
+    assert delta.tasks.created[0].priority == "high"
+    assert delta.tasks.updated == []
+    assert delta.tasks.deleted == [str(legacy_id)]
+    assert [item.id for item in delta.habits.created] == [habit.id]
+
+    # Replaying from the returned token yields nothing new.
+    again = await sync_module.sync(user_id=str(user_id), since=delta.token, limit=100)
+    assert again.tasks == sync_module.SyncDelta[tasks_module.Task]()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_delta_pages_through_the_log(fake_db, no_settle):
+    user_id = ObjectId()
+    since = _token_before_now()
+    first = await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description="One"))
+    second = await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description="Two"))
+
+    page = await sync_module.sync(user_id=str(user_id), since=since, limit=1)
+    assert page.has_more
+    assert [task.id for task in page.tasks.created] == [first.id]
+
+    rest = await sync_module.sync(user_id=str(user_id), since=page.token, limit=1)
+    assert not rest.has_more
+    assert [task.id for task in rest.tasks.created] == [second.id]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_missing_or_expired_token_returns_snapshot(fake_db):
+    user_id = ObjectId()
+    task = await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description="Snap"))
+
+    snapshot = await sync_module.sync(user_id=str(user_id), since=None, limit=100)
+    assert snapshot.reset
+    assert [item.id for item in snapshot.tasks.created] == [task.id]
+
+    expired = str(ObjectId.from_datetime(datetime.utcnow() - timedelta(days=60)))
+    stale = await sync_module.sync(user_id=str(user_id), since=expired, limit=100)
+    assert stale.reset
+    assert [item.id for item in stale.tasks.created] == [task.id]
+
+    with pytest.raises(HTTPException) as excinfo:
+        await sync_module.sync(user_id=str(user_id), since="not-a-token", limit=100)
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import api.tasks as tasks_module
+
+
+@pytest.mark.anyio("asyncio")
+async def test_batch_applies_mixed_operations(fake_db, monkeypatch):
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    keep_id, done_id, drop_id = ObjectId(), ObjectId(), ObjectId()
+    fake_db.tasks.docs = [
+        {"_id": oid, "user_id": user_id, "description": name, "is_completed": False, "created_at": now}
+        for oid, name in ((keep_id, "draft plan"), (done_id, "buy milk"), (drop_id, "old idea"))
+    ]
+
+    events: list[tuple[str, dict]] = []
+
+    async def _record(event_type, payload=None):
+        events.append((event_type, payload))
+
+    monkeypatch.setattr(tasks_module, "broadcast_event", _record)
+
+    payload = tasks_module.TaskBatchRequest.model_validate(
+        {
+            "user_id": str(user_id),
+            "operations": [
+                {"op": "create", "description": "new thing", "priority": "high"},
+                {"op": "update", "task_id": str(keep_id), "changes": {"description": "final plan"}},
+                {"op": "complete", "task_id": str(done_id)},
+                {"op": "delete", "task_id": str(drop_id)},
+                {"op": "delete", "task_id": str(ObjectId())},
+                {"op": "complete", "task_id": "nope"},
+            ],
+        }
+    )
+    response = await tasks_module.batch_tasks(payload)
+
+    statuses = [result.status for result in response.results]
+    assert statuses == ["ok", "ok", "ok", "ok", "not_found", "error"]
+    assert (response.inserted, response.modified, response.deleted) == (1, 2, 1)
+
+    by_id = {doc["_id"]: doc for doc in fake_db.tasks.docs}
+    assert drop_id not in by_id
+    assert by_id[keep_id]["description"] == "final plan"
+    assert by_id[done_id]["is_completed"] is True
+    created = by_id[ObjectId(response.results[0].task_id)]
+    assert created["user_id"] == user_id and created["search_grams"]
+
+    assert len(events) == 1
+    event_type, body = events[0]
+    assert event_type == "tasks_batch"
+    assert body["deleted"] == [str(drop_id)]
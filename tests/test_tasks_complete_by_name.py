@@ -6,7 +6,9 @@ import pytest
 from bson import ObjectId
 from fastapi import HTTPException
 
+import api.app.services.task_search as task_search_module
 import api.tasks as tasks_module
+from api.app.migrations import migrate_collection
 
 
 @pytest.mark.anyio("asyncio")
@@ -31,6 +33,8 @@ async def test_complete_by_name_updates_task(fake_db):
             "updated_at": now - timedelta(minutes=1),
         },
     ]
+    # Tasks written before search_grams existed are indexed by the migration.
+    await migrate_collection(fake_db, "tasks")
 
     payload = tasks_module.CompleteByNameRequest(user_id=str(user_id), name="buy")
     result = await tasks_module.complete_by_name(payload)
@@ -57,3 +61,42 @@ async def test_complete_by_name_missing_task(fake_db):
     with pytest.raises(HTTPException) as exc:
         await tasks_module.complete_by_name(payload)
     assert exc.value.status_code == 404
+
+
+@pytest.mark.anyio("asyncio")
+async def test_complete_by_name_tolerates_typos_and_ranks(fake_db):
+    user_id = ObjectId()
+
+    for description in ("Write quarterly report", "Call the dentist", "Buy milk and eggs"):
+        await tasks_module.create_task(
+            tasks_module.TaskCreate(user_id=user_id, description=description)
+        )
+    assert all(doc["search_grams"] for doc in fake_db.tasks.docs)
+
+    payload = tasks_module.CompleteByNameRequest(user_id=str(user_id), name="by mlk")
+    result = await tasks_module.complete_by_name(payload)
+
+    assert result.description == "Buy milk and eggs"
+    assert result.candidates[0].id == str(result.id)
+    assert result.match_score == result.candidates[0].score
+
+    # Completed tasks drop out of the index lookup.
+    with pytest.raises(HTTPException):
+        await tasks_module.complete_by_name(payload)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_candidates_are_capped_after_ranking_by_shared_grams(fake_db, monkeypatch):
+    monkeypatch.setattr(task_search_module, "MAX_CANDIDATES", 3)
+    user_id = ObjectId()
+    await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description="Tidy the garage"))
+    # Newer tasks that only share the common padded word-start grams.
+    for n in range(10):
+        await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description=f"Take the trash {n}"))
+
+    fake_db.tasks.round_trips = 0
+    payload = tasks_module.CompleteByNameRequest(user_id=str(user_id), name="tidy garage")
+    result = await tasks_module.complete_by_name(payload)
+    assert result.description == "Tidy the garage"
+    # One aggregation and one update; no per-request backfill scan.
+    assert fake_db.tasks.round_trips == 2
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import OperationFailure
+
+import api.tasks as tasks_module
+from api.app.services.insight_facts import build_daily_facts
+
+
+async def _create(user_id: ObjectId, description: str, due: datetime | None) -> None:
+    await tasks_module.create_task(
+        tasks_module.TaskCreate(user_id=user_id, description=description, due_date=due)
+    )
+
+
+def _descriptions(response) -> list[str]:
+    return [item["description"] for item in json.loads(response.body)["items"]]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_due_windows_return_open_dated_tasks_soonest_first(fake_db):
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    await _create(user_id, "later", now + timedelta(hours=30))
+    await _create(user_id, "soon", now + timedelta(hours=2))
+    await _create(user_id, "overdue", now - timedelta(hours=5))
+    await _create(user_id, "undated", None)
+    await _create(user_id, "finished", now + timedelta(hours=1))
+    fake_db.tasks.docs[-1]["is_completed"] = True
+
+    overdue = await tasks_module.list_due_tasks(user_id=str(user_id), after=None, before=now, limit=100)
+    assert _descriptions(overdue) == ["overdue"]
+
+    upcoming = await tasks_module.list_due_tasks(
+        user_id=str(user_id), after=now, before=now + timedelta(hours=24), limit=100
+    )
+    assert _descriptions(upcoming) == ["soon"]
+
+    everything = await tasks_module.list_due_tasks(user_id=str(user_id), after=None, before=None, limit=100)
+    assert _descriptions(everything) == ["overdue", "soon", "later"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_due_rejects_empty_window(fake_db):
+    now = datetime.utcnow()
+    with pytest.raises(HTTPException) as excinfo:
+        await tasks_module.list_due_tasks(
+            user_id=str(ObjectId()), after=now, before=now - timedelta(hours=1), limit=100
+        )
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.anyio("asyncio")
+async def test_due_queries_work_without_the_partial_index(fake_db, monkeypatch):
+    # Like a database where ensure_indexes never ran: any hint is rejected.
+    count_documents = fake_db.tasks.count_documents
+
+    async def no_hints(query, **kwargs):
+        if "hint" in kwargs:
+            raise OperationFailure("hint provided does not correspond to an existing index")
+        return await count_documents(query, **kwargs)
+
+    monkeypatch.setattr(fake_db.tasks, "count_documents", no_hints)
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    await _create(user_id, "overdue", now - timedelta(days=2))
+
+    due = await tasks_module.list_due_tasks(user_id=str(user_id), after=None, before=now, limit=100)
+    assert _descriptions(due) == ["overdue"]
+    facts = await build_daily_facts(fake_db, user_id, now)
+    assert facts["tasks"]["overdue_count"] == 1
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import api.tasks as tasks_module
+
+
+def _seed(fake_db, user_id: ObjectId, count: int) -> None:
+    base = datetime(2024, 1, 1, 9, 0, 0)
+    fake_db.tasks.docs = [
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "description": f"task {idx}",
+            "is_completed": False,
+            # Pairs share a timestamp so the _id tie-breaker is exercised.
+            "created_at": base + timedelta(minutes=idx // 2),
+            "updated_at": base,
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_list_tasks_pages_with_cursor(fake_db):
+    user_id = ObjectId()
+    _seed(fake_db, user_id, 7)
+
+    seen: list[str] = []
+    cursor = None
+    pages = 0
+    while True:
+        page = await tasks_module.list_tasks(
+            user_id=str(user_id), is_completed=None, limit=3, cursor=cursor, fields=None
+        )
+        pages += 1
+        seen.extend(item.description for item in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+    assert seen[0] == "task 6"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_list_tasks_without_limit_returns_everything(fake_db):
+    user_id = ObjectId()
+    _seed(fake_db, user_id, 4)
+
+    listing = await tasks_module.list_tasks(
+        user_id=str(user_id), is_completed=None, limit=None, cursor=None, fields=None
+    )
+    assert listing.total == 4
+    assert listing.next_cursor is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_list_tasks_rejects_garbage_cursor(fake_db):
+    with pytest.raises(HTTPException) as exc:
+        await tasks_module.list_tasks(
+            user_id=str(ObjectId()), is_completed=None, limit=3, cursor="not-a-cursor", fields=None
+        )
+    assert exc.value.status_code == 400
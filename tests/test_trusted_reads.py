@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import Response
+
+import api.routes.tasks_split as subtasks_module
+import api.tasks as tasks_module
+from api.app.schemas.common import ListResponse
+
+
+@pytest.mark.anyio("asyncio")
+async def test_stamped_tasks_skip_validation_with_identical_output(fake_db):
+    user_id = ObjectId()
+    task = await tasks_module.create_task(
+        tasks_module.TaskCreate(user_id=user_id, description="Pack", priority="high")
+    )
+    await subtasks_module.create_subtasks_bulk(
+        str(task.id),
+        subtasks_module.SubtaskBulkIn(items=[subtasks_module.SubtaskItem(description="Socks")]),
+    )
+
+    fast = await tasks_module.list_tasks(
+        user_id=str(user_id), is_completed=None, limit=None, cursor=None, fields=None
+    )
+    assert isinstance(fast, Response)
+
+    expected = ListResponse[tasks_module.Task](
+        items=[tasks_module.Task.model_validate(doc) for doc in fake_db.tasks.docs], total=1
+    ).model_dump_json(by_alias=True)
+    assert json.loads(fast.body) == json.loads(expected)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_legacy_documents_fall_back_to_validation(fake_db):
+    user_id = ObjectId()
+    await tasks_module.create_task(tasks_module.TaskCreate(user_id=user_id, description="New"))
+    fake_db.tasks.docs.append(
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "description": "Legacy",
+            "priority": 2,
+            "created_at": datetime(2020, 1, 1),
+        }
+    )
+
+    listing = await tasks_module.list_tasks(
+        user_id=str(user_id), is_completed=None, limit=None, cursor=None, fields=None
+    )
+    assert isinstance(listing, ListResponse)
+    assert [item.priority for item in listing.items] == ["medium", "high"]
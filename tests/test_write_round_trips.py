@@ -0,0 +1,98 @@
+"""Pin the number of Mongo round trips each write handler makes.
+
+Version-stamp bumps for conditional GETs (``app/versions.py``) and change-log
+appends for delta sync (``app/changes.py``) are counted separately from the
+document reads and writes. Schedule creates also read the user's events for
+that day into the conflict index the first time the day is touched.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import api.habit_logs as habit_logs_module
+import api.habits as habits_module
+import api.schedule as schedule_module
+import api.tasks as tasks_module
+import api.users as users_module
+from api.app.services.conflicts import conflict_index
+
+
+def _document_trips(fake_db) -> int:
+    return fake_db.round_trips - fake_db.collection_versions.round_trips - fake_db.changes.round_trips
+
+
+@pytest.mark.anyio("asyncio")
+async def test_task_writes_take_one_round_trip(fake_db):
+    user_id = ObjectId()
+
+    created = await tasks_module.create_task(
+        tasks_module.TaskCreate(user_id=user_id, description="Buy milk")
+    )
+    assert _document_trips(fake_db) == 1
+
+    await tasks_module.update_task(str(created.id), tasks_module.TaskUpdate(priority="high"))
+    assert _document_trips(fake_db) == 2
+
+    # Ranked candidate aggregation and the completing write.
+    await tasks_module.complete_by_name(
+        tasks_module.CompleteByNameRequest(user_id=str(user_id), name="milk")
+    )
+    assert _document_trips(fake_db) == 4
+    assert fake_db.collection_versions.round_trips == 3
+
+
+@pytest.mark.anyio("asyncio")
+async def test_habit_and_user_writes_take_one_round_trip(fake_db):
+    user = await users_module.create_user(
+        users_module.UserCreate(email="demo@example.com", name="Demo")
+    )
+    assert _document_trips(fake_db) == 1
+
+    habit = await habits_module.create_habit(
+        habits_module.HabitCreate(user_id=ObjectId(user.id), name="Stretch")
+    )
+    assert _document_trips(fake_db) == 2
+
+    await habits_module.update_habit(str(habit.id), habits_module.HabitUpdate(goal_repetitions=2))
+    assert _document_trips(fake_db) == 3
+    assert fake_db.collection_versions.round_trips == 2
+
+    # Habit ownership check plus the insert.
+    await habit_logs_module.create_habit_log(
+        habit_logs_module.HabitLogCreate(
+            habit_id=habit.id, user_id=habit.user_id, date=datetime.utcnow()
+        )
+    )
+    assert _document_trips(fake_db) == 5
+    assert fake_db.collection_versions.round_trips == 3
+
+
+@pytest.mark.anyio("asyncio")
+async def test_schedule_writes_take_one_round_trip(fake_db):
+    user_id = ObjectId()
+    start = datetime(2024, 5, 1, 9, 0)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    for day in (start.replace(hour=0), today):
+        await conflict_index.overlapping(fake_db, user_id, day, day.replace(hour=23))
+    assert _document_trips(fake_db) == 2
+
+    event = await schedule_module.create_event(
+        schedule_module.ScheduleEventCreate(
+            user_id=user_id, title="Standup", start_time=start, end_time=start.replace(hour=10)
+        )
+    )
+    assert _document_trips(fake_db) == 3
+
+    await schedule_module.create_schedule_item(
+        schedule_module.CreateScheduleRequest(user_id=str(user_id), summary="Dentist")
+    )
+    assert _document_trips(fake_db) == 4
+
+    await schedule_module.update_event(
+        str(event.id), schedule_module.ScheduleEventUpdate(title="Daily standup")
+    )
+    assert _document_trips(fake_db) == 5
+    assert fake_db.collection_versions.round_trips == 3